@@ -0,0 +1,237 @@
+"""
+Booking state machine with local slot filling
+Each user turn is run through cheap validators (appointment type, date/time,
+name, email, phone) and the filled slots move the booking through
+type -> datetime -> details -> confirm -> booked. The state is rebuilt by
+replaying the conversation, so it is shared by every worker that can read the
+conversation store.
+"""
+import re
+from typing import Dict, List, Optional
+from ..tools.date_resolver import resolve
+from ..models.records import format_time
+
+# Stages, in order
+STAGE_IDLE = "idle"
+STAGE_TYPE = "type"
+STAGE_DATETIME = "datetime"
+STAGE_DETAILS = "details"
+STAGE_CONFIRM = "confirm"
+STAGE_BOOKED = "booked"
+
+DETAIL_FIELDS = ("name", "email", "phone")
+
+# Phrases from the agent's own replies; the replay uses them to end a booking or drop a rejected time
+BOOKED_MARKER = "Your appointment is confirmed!"
+BOOKING_FAILED_MARKER = "there was an issue booking your appointment"
+CONFIRM_MARKER = "Please confirm your appointment"
+SLOT_TAKEN_MARKER = "isn't open for booking"
+
+_EMAIL = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
+_PHONE = re.compile(r"(?<![\w@])(\+?\d[\d\s().-]{7,}\d)(?![\w@])")
+_NAME_INTRO = re.compile(
+    r"(?i:\bmy name is|\bname is|\bname:|\bthis is|\bi am|\bi'm|\bcall me)\s+"
+    r"([A-Z][a-zA-Z'-]+(?:\s+[A-Z][a-zA-Z'-]+){0,3})"
+)
+_BARE_NAME = re.compile(r"^\s*([A-Z][a-zA-Z'-]+(?:\s+[A-Z][a-zA-Z'-]+){1,3})\s*[,.]?\s*$")
+_AFFIRMATION = (
+    r"(yes|yep|yeah|yup|sure|confirm(ed)?|correct|that's (right|correct)|please book( it)?|book it|"
+    r"sounds good|looks good|ok|okay|perfect|great)"
+)
+# The whole reply must be an affirmation ("Yes, please book it!"); "ok, do you
+# take insurance?" carries a question, so it doesn't confirm the booking
+_AFFIRMATIVE = re.compile(
+    rf"^\s*{_AFFIRMATION}(\s*[,.!]*\s*({_AFFIRMATION}|please|thanks|thank you))*\s*[.!]*\s*$",
+    re.IGNORECASE
+)
+_NEGATIVE = re.compile(r"^\s*(no|nope|wait|not quite|change|actually)\b", re.IGNORECASE)
+_SUMMARY_DATE = re.compile(r"^- Date: (\d{4}-\d{2}-\d{2})$", re.MULTILINE)
+_SUMMARY_TIME = re.compile(r"^- Time: (\d{2}:\d{2})$", re.MULTILINE)
+_BOOKING_WORDS = re.compile(r"\b(book|schedule|appointment|see (the )?doctor|visit|reserve)\b", re.IGNORECASE)
+
+APPOINTMENT_KEYWORDS = [
+    ("followup", re.compile(r"\bfollow[- ]?up\b", re.IGNORECASE)),
+    ("physical", re.compile(r"\b(physical|check[- ]?up|annual exam|wellness)\b", re.IGNORECASE)),
+    ("specialist", re.compile(r"\bspecialist\b", re.IGNORECASE)),
+    ("consultation", re.compile(r"\b(consultation|consult|new patient|sick visit)\b", re.IGNORECASE))
+]
+
+# Words that start sentences but aren't names
+_NOT_NAMES = {"Yes", "No", "Hi", "Hello", "Thanks", "Thank", "Sure", "Okay", "Ok", "Please", "Looking", "Just"}
+
+def extract_email(text: str) -> Optional[str]:
+    match = _EMAIL.search(text)
+    return match.group(0).lower() if match else None
+
+def extract_phone(text: str) -> Optional[str]:
+    """Phone number with 10-15 digits, digits and a leading + kept"""
+    for match in _PHONE.finditer(_EMAIL.sub(" ", text)):
+        candidate = match.group(1)
+        digits = re.sub(r"\D", "", candidate)
+        # Dates such as 2031-09-03 have the right shape but only 8 digits
+        if 10 <= len(digits) <= 15:
+            return ("+" if candidate.startswith("+") else "") + digits
+    return None
+
+def extract_name(text: str, expecting_name: bool = False) -> Optional[str]:
+    """A name introduced explicitly, or a bare 2-4 word name when we just asked for one"""
+    match = _NAME_INTRO.search(text)
+    if match:
+        words = match.group(1).split()
+        if words[0] not in _NOT_NAMES:
+            return " ".join(words)
+    if expecting_name:
+        remainder = _PHONE.sub(" ", _EMAIL.sub(" ", text))
+        match = _BARE_NAME.match(remainder.replace(",", " ").strip())
+        if match and match.group(1).split()[0] not in _NOT_NAMES:
+            return " ".join(match.group(1).split())
+    return None
+
+def extract_appointment_type(text: str) -> Optional[str]:
+    for appointment_type, pattern in APPOINTMENT_KEYWORDS:
+        if pattern.search(text):
+            return appointment_type
+    return None
+
+class BookingState:
+    """Slots collected so far for one conversation's booking"""
+
+    def __init__(self):
+        self.appointment_type: Optional[str] = None
+        self.date: Optional[str] = None
+        self.start_time: Optional[str] = None
+        self.name: Optional[str] = None
+        self.email: Optional[str] = None
+        self.phone: Optional[str] = None
+        self.reason: Optional[str] = None
+        self.active = False
+        self.confirmed = False
+        # Slots filled by the latest user turn
+        self.updated: List[str] = []
+
+    @property
+    def stage(self) -> str:
+        if not self.active:
+            return STAGE_IDLE
+        if self.confirmed:
+            return STAGE_BOOKED
+        if not self.appointment_type:
+            return STAGE_TYPE
+        if not (self.date and self.start_time):
+            return STAGE_DATETIME
+        if self.missing_details():
+            return STAGE_DETAILS
+        return STAGE_CONFIRM
+
+    def missing_details(self) -> List[str]:
+        return [field for field in DETAIL_FIELDS if not getattr(self, field)]
+
+    def requires_info(self) -> Optional[Dict]:
+        """Patient details still needed, for the chat response"""
+        if self.stage in (STAGE_IDLE, STAGE_BOOKED):
+            return None
+        missing = self.missing_details()
+        return {field: True for field in missing} if missing else None
+
+    def update(self, message: str, last_assistant: str = ""):
+        """Fill slots from one user turn"""
+        stage = self.stage
+        self.updated = []
+        affirmed = stage == STAGE_CONFIRM and _AFFIRMATIVE.match(message) and not _NEGATIVE.match(message)
+
+        appointment_type = extract_appointment_type(message)
+        if appointment_type:
+            self._set("appointment_type", appointment_type)
+
+        resolved = resolve(message)
+        if "start_date" in resolved and resolved["start_date"] == resolved["end_date"]:
+            self._set("date", resolved["start_date"])
+        window = resolved.get("time_window")
+        # Only a specific clock time pins the slot; "afternoon" is a preference
+        if window and window[1] - window[0] <= 60:
+            self._set("start_time", format_time(window[0]))
+
+        expecting_name = stage == STAGE_DETAILS and "name" in last_assistant.lower()
+        for field, value in (
+            ("email", extract_email(message)),
+            ("phone", extract_phone(message)),
+            ("name", extract_name(message, expecting_name))
+        ):
+            if value:
+                self._set(field, value)
+
+        if self.updated or _BOOKING_WORDS.search(message):
+            self.active = True
+        # "Yes, but make it 4pm" changes the booking; it is confirmed only as summarised
+        if affirmed and not self.updated:
+            self.confirmed = True
+
+    def release_time(self):
+        """The chosen slot could not be booked; ask for another"""
+        self.start_time = None
+        self.confirmed = False
+
+    def pin_summary(self, summary: str):
+        """
+        Take the date and time from a confirmation summary we sent; earlier
+        turns like "tomorrow" are replayed against today's date, which may
+        have moved on since
+        """
+        for field, pattern in (("date", _SUMMARY_DATE), ("start_time", _SUMMARY_TIME)):
+            match = pattern.search(summary)
+            if match:
+                setattr(self, field, match.group(1))
+
+    def summary(self) -> str:
+        """Prompt asking the patient to confirm the collected details"""
+        return (
+            f"{CONFIRM_MARKER}:\n"
+            f"- Appointment Type: {self.appointment_type}\n"
+            f"- Date: {self.date}\n"
+            f"- Time: {self.start_time}\n"
+            f"- Patient: {self.name}\n"
+            f"- Email: {self.email}\n"
+            f"- Phone: {self.phone}\n\n"
+            "Reply \"yes\" to book it, or tell me what to change."
+        )
+
+    def describe(self) -> str:
+        """Progress note for the model"""
+        filled = {
+            "appointment_type": self.appointment_type,
+            "date": self.date,
+            "start_time": self.start_time,
+            "name": self.name,
+            "email": self.email,
+            "phone": self.phone
+        }
+        known = ", ".join(f"{key}={value}" for key, value in filled.items() if value)
+        missing = [key for key, value in filled.items() if not value]
+        return (
+            f"Booking progress (stage: {self.stage}). Known: {known or 'nothing yet'}. "
+            f"Still needed: {', '.join(missing) if missing else 'confirmation'}. "
+            "Ask only for what is still needed."
+        )
+
+    def _set(self, field: str, value: str):
+        if getattr(self, field) != value:
+            setattr(self, field, value)
+            self.updated.append(field)
+
+    @classmethod
+    def from_history(cls, messages: List[Dict]) -> "BookingState":
+        """Replay a conversation; a completed booking starts a fresh state"""
+        state = cls()
+        last_assistant = ""
+        for message in messages:
+            if message["role"] == "user":
+                state.update(message["content"], last_assistant)
+            else:
+                last_assistant = message["content"]
+                if last_assistant.startswith(BOOKED_MARKER):
+                    state = cls()
+                elif BOOKING_FAILED_MARKER in last_assistant or SLOT_TAKEN_MARKER in last_assistant:
+                    state.release_time()
+                elif last_assistant.startswith(CONFIRM_MARKER):
+                    state.pin_summary(last_assistant)
+        return state
@@ -1,12 +1,16 @@
 """
 Prompts for the scheduling agent
+Static text is built once at import; only the date line changes from day to
+day, so the first system message is an identical prefix across all requests
+and can be served from the provider's prompt cache.
 """
 import os
-from datetime import datetime, date
+from datetime import date
+from functools import lru_cache
+from typing import Dict, List
+from ..clinic_clock import clinic_today
 
-def get_system_prompt() -> str:
-    """Get the main system prompt for the scheduling agent"""
-    return """You are a warm, empathetic, and professional medical appointment scheduling assistant for HealthCare Plus Clinic. 
+SYSTEM_PROMPT = """You are a warm, empathetic, and professional medical appointment scheduling assistant for HealthCare Plus Clinic. 
 Your role is to help patients schedule appointments naturally through conversation.
 
 Key Responsibilities:
@@ -38,22 +42,26 @@ Always confirm all details before booking.
 If asked a question you don't know, use the FAQ context provided.
 Be graceful when no slots are available - suggest alternatives."""
 
-def get_scheduling_prompt(conversation_history: str, available_tools: str, faq_context: str = "") -> str:
-    """Get prompt for scheduling conversation"""
-    current_date = date.today().strftime("%A, %B %d, %Y")
-    
-    return f"""Current Date: {current_date}
+TOOLS_INFO = """Available Functions:
 
-Conversation History:
-{conversation_history}
+1. check_availability(appointment_type, target_date, days_ahead)
+   - Check available time slots
+   - appointment_type: "consultation", "followup", "physical", or "specialist"
+   - target_date: "YYYY-MM-DD" format or None
+   - Returns: Dictionary with available slots
 
-Available Tools:
-{available_tools}
+2. suggest_slots(preferences, appointment_type, days_ahead)
+   - Intelligently suggest slots based on preferences
+   - preferences: Dict with "time_preference" (morning/afternoon/evening) and "date_preference" ("asap", YYYY-MM-DD or a phrase like "next tuesday afternoon")
+   - Returns: List of suggested slots
 
-FAQ Context (use if patient asks questions about clinic):
-{faq_context}
+3. book_appointment(appointment_type, date, start_time, patient_name, patient_email, patient_phone, reason)
+   - Book an appointment
+   - Returns: Booking confirmation or error
 
-Your task: Continue the conversation naturally. Determine if the patient wants to:
+Use these tools when needed to help the patient."""
+
+TASK_INSTRUCTIONS = """Your task: Continue the conversation naturally. Determine if the patient wants to:
 1. Schedule an appointment - Guide them through the process
 2. Ask a question - Answer using FAQ context if available, then return to scheduling if relevant
 3. Provide information - Collect needed details for booking
@@ -61,6 +69,48 @@ Your task: Continue the conversation naturally. Determine if the patient wants t
 Use available tools to check availability and book appointments.
 Be natural, empathetic, and helpful."""
 
+# Identical for every request: system prompt, tools and instructions
+STATIC_PREFIX = f"""{SYSTEM_PROMPT}
+
+Available Tools:
+{TOOLS_INFO}
+
+{TASK_INSTRUCTIONS}"""
+
+def get_system_prompt() -> str:
+    """Get the main system prompt for the scheduling agent"""
+    return SYSTEM_PROMPT
+
+@lru_cache(maxsize=4)
+def get_date_context(today: date) -> str:
+    """Date line for the prompt, built once per day"""
+    return f"Current Date: {today.strftime('%A, %B %d, %Y')}"
+
+def build_messages(history: List[Dict], faq_context: str = "", tool_results: str = "") -> List[Dict]:
+    """
+    Assemble chat messages from most to least stable:
+    static prefix, date, conversation turns, then per-turn context
+    
+    Args:
+        history: Conversation so far as {"role", "content"} dicts, ending with the user's message
+        faq_context: FAQ answer for this turn, if any
+        tool_results: Tool output for this turn, if any
+    """
+    messages = [
+        {"role": "system", "content": STATIC_PREFIX},
+        {"role": "system", "content": get_date_context(clinic_today())}
+    ]
+    messages.extend({"role": msg["role"], "content": msg["content"]} for msg in history)
+    
+    context = []
+    if faq_context:
+        context.append(f"FAQ Context (use if patient asks questions about clinic):\n{faq_context}")
+    if tool_results:
+        context.append(f"Tool Results:\n{tool_results}")
+    if context:
+        messages.append({"role": "system", "content": "\n\n".join(context)})
+    return messages
+
 def get_booking_confirmation_prompt(booking_details: dict) -> str:
     """Generate confirmation message after booking"""
     details = booking_details.get("details", {})
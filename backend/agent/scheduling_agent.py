@@ -3,36 +3,75 @@ Intelligent scheduling agent with natural conversation flow
 """
 import os
 import json
-from typing import Dict, Optional, List
-from openai import OpenAI
+import re
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, List, Set
 from ..tools.availability_tool import check_availability, suggest_slots
 from ..tools.booking_tool import book_appointment
-from ..rag.faq_rag import FAQRAG
-from .prompts import get_system_prompt, get_scheduling_prompt
+from ..tools.date_resolver import resolve as resolve_dates
+from ..notifications.queue import enqueue_booking_confirmation
+from ..llm.gateway import get_llm_gateway
+from ..llm.router import ModelRouter
+from ..state import get_conversation_store
+from ..features import is_enabled
+from ..monitoring.metrics import CONVERSATIONS, ERRORS, FAST_PATHS, INTENTS, stage_timer
+from .prompts import build_messages
+from .booking_state import (
+    BOOKED_MARKER,
+    BOOKING_FAILED_MARKER,
+    SLOT_TAKEN_MARKER,
+    STAGE_BOOKED,
+    STAGE_CONFIRM,
+    STAGE_DATETIME,
+    STAGE_DETAILS,
+    STAGE_IDLE,
+    STAGE_TYPE,
+    BookingState
+)
+
+# Concurrent stages of a chat turn (FAQ retrieval, availability prefetch)
+_stage_pool = ThreadPoolExecutor(max_workers=int(os.getenv("AGENT_STAGE_WORKERS", 8)), thread_name_prefix="agent-stage")
+
+def _run_stage(fn: Callable, *args) -> Future:
+    """Start a stage on the pool, keeping the request's context (request ID) for its metrics and logs"""
+    return _stage_pool.submit(contextvars.copy_context().run, fn, *args)
+
+_CLOCK_TIME = re.compile(r"\b(\d{1,2}):(\d{2})\s*(am|pm|a\.m\.|p\.m\.)?", re.IGNORECASE)
+
+def offers_only(times: Set[str]) -> Callable[[str], bool]:
+    """Reply check: every clock time mentioned is one of the offered HH:MM slots"""
+    def validate(text: str) -> bool:
+        for hour, minute, meridiem in _CLOCK_TIME.findall(text):
+            hour = int(hour)
+            if meridiem.lower().startswith("p") and hour < 12:
+                hour += 12
+            elif meridiem.lower().startswith("a") and hour == 12:
+                hour = 0
+            if f"{hour:02d}:{minute}" not in times:
+                return False
+        return True
+    return validate
 
 class SchedulingAgent:
     def __init__(self):
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError(
-                "OPENAI_API_KEY not set. Please set it in your .env file or environment variables."
-            )
-        self.client = OpenAI(api_key=api_key)
-        self.model = os.getenv("LLM_MODEL", "gpt-4-turbo-preview")
-        try:
-            self.faq_rag = FAQRAG()
-        except Exception as e:
-            print(f"⚠️ Warning: Could not initialize FAQ RAG: {e}")
-            self.faq_rag = None
-        self.conversations: Dict[str, List[Dict]] = {}
+        # Small model for FAQ answers and slot confirmations, large model for triage
+        self.llm = ModelRouter(get_llm_gateway())
+        self.faq_rag = None
+        if is_enabled("rag"):
+            try:
+                from ..rag.faq_rag import get_faq_rag
+                self.faq_rag = get_faq_rag()
+            except Exception as e:
+                print(f"⚠️ Warning: Could not initialize FAQ RAG: {e}")
+        # Shared across worker processes when STATE_BACKEND=sqlite
+        self.conversations = get_conversation_store()
+        CONVERSATIONS.set_function(lambda: len(self.conversations))
     
     def _get_conversation_history(self, conversation_id: str) -> str:
         """Get formatted conversation history"""
-        if conversation_id not in self.conversations:
-            return ""
-        
         history = []
-        for msg in self.conversations[conversation_id]:
+        for msg in self.conversations.get(conversation_id):
             role = msg["role"]
             content = msg["content"]
             history.append(f"{role.capitalize()}: {content}")
@@ -41,10 +80,7 @@ class SchedulingAgent:
     
     def _add_message(self, conversation_id: str, role: str, content: str):
         """Add message to conversation history"""
-        if conversation_id not in self.conversations:
-            self.conversations[conversation_id] = []
-        
-        self.conversations[conversation_id].append({"role": role, "content": content})
+        self.conversations.append(conversation_id, role, content)
     
     def _detect_intent(self, message: str) -> str:
         """Detect user intent (scheduling, FAQ, or both)"""
@@ -76,46 +112,66 @@ class SchedulingAgent:
     def _extract_preferences(self, message: str, conversation_history: str) -> Dict:
         """Extract preferences from user message"""
         preferences = {}
-        
-        message_lower = message.lower()
+        resolved = resolve_dates(message)
         
         # Time preference
-        if any(word in message_lower for word in ["morning", "am", "early"]):
-            preferences["time_preference"] = "morning"
-        elif any(word in message_lower for word in ["afternoon", "pm", "midday"]):
-            preferences["time_preference"] = "afternoon"
-        elif any(word in message_lower for word in ["evening", "late"]):
-            preferences["time_preference"] = "evening"
+        if "time_window" in resolved:
+            preferences["time_preference"] = resolved["time_preference"]
+            preferences["time_window"] = resolved["time_window"]
         
-        # Date preference
-        if any(word in message_lower for word in ["asap", "soon", "urgent", "today", "now"]):
+        # Date preference, resolved to concrete days in the clinic timezone
+        if "start_date" in resolved:
+            preferences["date_preference"] = resolved["date_label"]
+            preferences["start_date"] = resolved["start_date"]
+            preferences["end_date"] = resolved["end_date"]
+        elif resolved.get("asap"):
             preferences["date_preference"] = "asap"
-        elif any(word in message_lower for word in ["tomorrow", "next week", "this week"]):
-            # Will be parsed by availability tool
-            preferences["date_preference"] = message_lower
         
         return preferences
     
-    def _get_available_tools_info(self) -> str:
-        """Get information about available tools for the LLM"""
-        return """Available Functions:
-
-1. check_availability(appointment_type, target_date, days_ahead)
-   - Check available time slots
-   - appointment_type: "consultation", "followup", "physical", or "specialist"
-   - target_date: "YYYY-MM-DD" format or None
-   - Returns: Dictionary with available slots
-
-2. suggest_slots(preferences, appointment_type, days_ahead)
-   - Intelligently suggest slots based on preferences
-   - preferences: Dict with "time_preference" (morning/afternoon/evening) and "date_preference"
-   - Returns: List of suggested slots
-
-3. book_appointment(appointment_type, date, start_time, patient_name, patient_email, patient_phone, reason)
-   - Book an appointment
-   - Returns: Booking confirmation or error
-
-Use these tools when needed to help the patient."""
+    def booking_state(self, conversation_id: str) -> BookingState:
+        """Booking progress, rebuilt from the stored conversation"""
+        return BookingState.from_history(self.conversations.get(conversation_id))
+    
+    def is_mid_booking(self, conversation_id: str) -> bool:
+        """Whether the conversation is collecting details for or confirming a booking"""
+        return self.booking_state(conversation_id).stage in (STAGE_TYPE, STAGE_DATETIME, STAGE_DETAILS, STAGE_CONFIRM)
+    
+    def _check_requested_slot(self, booking: BookingState) -> Optional[str]:
+        """Note for the model when the requested time can't be booked (and forget that time)"""
+        if not (booking.appointment_type and booking.date and booking.start_time):
+            return None
+        if not ({"appointment_type", "date", "start_time"} & set(booking.updated)):
+            return None
+        with stage_timer("tool"):
+            available = check_availability(booking.appointment_type, booking.date)
+        if any(slot["time"] == booking.start_time for slot in available["available_slots"]):
+            return None
+        taken = f"Sorry, {booking.start_time} on {booking.date} {SLOT_TAKEN_MARKER}."
+        booking.release_time()
+        return taken
+    
+    def _retrieve_faq_context(self, message: str) -> str:
+        """Clinic information for the question, inlined into the main completion"""
+        try:
+            with stage_timer("faq"):
+                return self.faq_rag.retrieve_context(message)
+        except Exception:
+            ERRORS.inc(component="faq")
+            return ""
+    
+    def _prefetch_slots(self, message: str, booking: BookingState) -> List[Dict]:
+        """Speculative slot suggestions for the day or preferences mentioned so far"""
+        if booking.date:
+            preferences = {"start_date": booking.date}
+        else:
+            preferences = self._extract_preferences(message, "")
+        try:
+            with stage_timer("tool"):
+                return suggest_slots(preferences, booking.appointment_type or "consultation", days_ahead=7)
+        except Exception:
+            ERRORS.inc(component="tool")
+            return []
     
     def process_message(self, message: str, conversation_id: str = "default") -> Dict:
         """
@@ -126,80 +182,124 @@ Use these tools when needed to help the patient."""
         """
         self._add_message(conversation_id, "user", message)
         
-        intent = self._detect_intent(message)
+        with stage_timer("intent"):
+            intent = self._detect_intent(message)
+        INTENTS.inc(intent=intent)
+        booking = self.booking_state(conversation_id)
         
-        history = self._get_conversation_history(conversation_id)
+        if booking.stage == STAGE_BOOKED:
+            # The patient confirmed the summary: book without asking the model
+            FAST_PATHS.inc(path="booking_confirmed")
+            result = self.handle_booking(
+                booking.appointment_type,
+                booking.date,
+                booking.start_time,
+                booking.name,
+                booking.email,
+                booking.phone,
+                booking.reason,
+                conversation_id=conversation_id
+            )
+            return {
+                "response": result["response"],
+                "conversation_id": conversation_id,
+                "intent": "scheduling",
+                "requires_info": None,
+                "booking_details": result.get("booking_details")
+            }
+        
+        taken = self._check_requested_slot(booking)
         
-        faq_context = ""
+        if booking.stage == STAGE_CONFIRM and booking.updated:
+            # The last missing detail just arrived: the confirmation prompt is fixed text
+            FAST_PATHS.inc(path="booking_summary")
+            summary = booking.summary()
+            self._add_message(conversation_id, "assistant", summary)
+            return {
+                "response": summary,
+                "conversation_id": conversation_id,
+                "intent": "scheduling",
+                "requires_info": None
+            }
+        
+        # Retrieval and the availability lookup run on the stage pool while the prompt is assembled
+        retrieval = None
         if intent in ["faq", "both"] and self.faq_rag:
-            try:
-                faq_answer = self.faq_rag.answer_question(message)
-                faq_context = f"FAQ Answer: {faq_answer}\n(You can incorporate this into your response if relevant)"
-            except:
-                pass
+            retrieval = _run_stage(self._retrieve_faq_context, message)
+        prefetch = None
+        if (intent in ["scheduling", "both"] or booking.stage != STAGE_IDLE) and booking.stage in (
+            STAGE_IDLE, STAGE_TYPE, STAGE_DATETIME
+        ):
+            prefetch = _run_stage(self._prefetch_slots, message, booking)
+        
+        booking_notes = []
+        if booking.stage != STAGE_IDLE:
+            if taken:
+                booking_notes.append(f"{taken} Offer the alternatives below.")
+            booking_notes.append(booking.describe())
         
-        system_prompt = get_system_prompt()
-        available_tools = self._get_available_tools_info()
-        user_prompt = get_scheduling_prompt(history, available_tools, faq_context)
+        # Snapshot before the reply is appended so the follow-up call reuses the same turns
+        history = self.conversations.get(conversation_id)
+        
+        faq_context = retrieval.result() if retrieval else ""
+        validate = None
+        if prefetch:
+            suggestions = prefetch.result()
+            if suggestions:
+                booking_notes.append(f"Available slots found: {json.dumps(suggestions)}")
+                validate = offers_only({slot["time"] for slot in suggestions})
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.8,
+            response = self.llm.chat_completion(
+                call="main",
+                messages=build_messages(history, faq_context, "\n".join(booking_notes)),
+                validate=validate,
                 max_tokens=500
             )
             
             agent_response = response.choices[0].message.content.strip()
+            if taken:
+                # Keeps the replayed state from picking the rejected time up again
+                agent_response = f"{taken} {agent_response}"
             
             self._add_message(conversation_id, "assistant", agent_response)
             
            
             tool_results = []
             
-            if "check availability" in agent_response.lower() or "available" in agent_response.lower():
-                preferences = self._extract_preferences(message, history)
+            # Turns that weren't recognised as scheduling can still need a lookup after the fact
+            if prefetch is None and ("check availability" in agent_response.lower() or "available" in agent_response.lower()):
+                preferences = self._extract_preferences(message, self._get_conversation_history(conversation_id))
                 
                 if preferences:
-                    suggestions = suggest_slots(preferences, "consultation", days_ahead=7)
+                    with stage_timer("tool"):
+                        suggestions = suggest_slots(preferences, booking.appointment_type or "consultation", days_ahead=7)
                     if suggestions:
                         tool_results.append(f"Available slots found: {json.dumps(suggestions, indent=2)}")
             
             if tool_results:
-                enhanced_prompt = user_prompt + "\n\nTool Results:\n" + "\n".join(tool_results)
-                
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": enhanced_prompt}
-                    ],
-                    temperature=0.8,
+                response = self.llm.chat_completion(
+                    call="followup",
+                    messages=build_messages(history, faq_context, "\n".join(tool_results)),
                     max_tokens=500
                 )
                 
                 agent_response = response.choices[0].message.content.strip()
-                self.conversations[conversation_id][-1]["content"] = agent_response
+                self.conversations.replace_last(conversation_id, agent_response)
+            else:
+                FAST_PATHS.inc(path="single_completion")
             
-            requires_info = {}
-            if any(word in agent_response.lower() for word in ["name", "what's your name"]):
-                requires_info["name"] = True
-            if any(word in agent_response.lower() for word in ["email", "email address"]):
-                requires_info["email"] = True
-            if any(word in agent_response.lower() for word in ["phone", "phone number"]):
-                requires_info["phone"] = True
+            requires_info = booking.requires_info()
             
             return {
                 "response": agent_response,
                 "conversation_id": conversation_id,
                 "intent": intent,
-                "requires_info": requires_info if requires_info else None
+                "requires_info": requires_info
             }
             
         except Exception as e:
+            ERRORS.inc(component="agent")
             error_response = f"I apologize, but I'm experiencing some technical difficulties. Please try again or call our office at +1-555-123-4567."
             
             self._add_message(conversation_id, "assistant", error_response)
@@ -223,18 +323,25 @@ Use these tools when needed to help the patient."""
         conversation_id: str = "default"
     ) -> Dict:
         """Handle the actual booking"""
-        result = book_appointment(
-            appointment_type,
-            date,
-            start_time,
-            patient_name,
-            patient_email,
-            patient_phone,
-            reason
-        )
+        with stage_timer("booking"):
+            result = book_appointment(
+                appointment_type,
+                date,
+                start_time,
+                patient_name,
+                patient_email,
+                patient_phone,
+                reason
+            )
         
         if result["success"]:
-            confirmation = f"""Your appointment is confirmed!
+            # Delivery happens on the notification workers, off the booking path
+            try:
+                enqueue_booking_confirmation(result["details"])
+            except Exception as e:
+                print(f"⚠️ Warning: Could not queue confirmation for {result['booking_id']}: {e}")
+            
+            confirmation = f"""{BOOKED_MARKER}
 
 Booking Details:
 - Booking ID: {result['booking_id']}
@@ -255,7 +362,7 @@ You will receive a confirmation email. Is there anything else I can help you wit
                 "booking_details": result
             }
         else:
-            error_msg = f"I apologize, but there was an issue booking your appointment: {result.get('error')}. Please try again or call our office."
+            error_msg = f"I apologize, but {BOOKING_FAILED_MARKER}: {result.get('error')}. Please try again or call our office."
             self._add_message(conversation_id, "assistant", error_msg)
             
             return {
@@ -0,0 +1,181 @@
+"""
+Admission control for the chat endpoint
+Token buckets limit each client and conversation; a global cap bounds
+in-flight LLM work, with a bounded priority queue behind it. When the queue
+is full the lowest-priority waiter is shed with a fast 429 instead of letting
+every conversation slow down.
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import List, Optional, Tuple
+from ..monitoring.metrics import ADMISSIONS, CHAT_IN_FLIGHT, CHAT_QUEUE_DEPTH
+
+# Lower value is served first
+PRIORITY_MID_BOOKING = 0
+PRIORITY_DEFAULT = 1
+
+class AdmissionRejected(Exception):
+    """The request should be answered with 429 and a Retry-After header"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float, now: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic() if now is None else now
+
+    def try_acquire(self, now: Optional[float] = None) -> float:
+        """Take one token; returns 0 on success, else seconds until one is available"""
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+class RateLimiter:
+    """One token bucket per key; the least recently used keys are dropped past max_keys"""
+
+    def __init__(self, per_minute: float, burst: float, max_keys: int = 10000):
+        self.rate = per_minute / 60
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, key: str, now: Optional[float] = None) -> float:
+        """0 if the request may proceed, else seconds to wait"""
+        with self._lock:
+            bucket = self._buckets.pop(key, None) or TokenBucket(self.rate, self.burst, now)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return bucket.try_acquire(now)
+
+class AdmissionController:
+    def __init__(self, max_in_flight: int = 16, max_queue: int = 64, queue_timeout: float = 10.0):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        # Moving average of how long an admitted request holds its slot
+        self.service_time = 1.0
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_DEFAULT):
+        """Hold one unit of in-flight capacity for the duration of the block"""
+        await self.acquire(priority)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.service_time = 0.8 * self.service_time + 0.2 * (time.monotonic() - started)
+            self.release()
+
+    async def acquire(self, priority: int = PRIORITY_DEFAULT):
+        """
+        Wait for capacity
+
+        Raises:
+            AdmissionRejected: queue full (and nothing lower priority to shed) or timed out
+        """
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            ADMISSIONS.inc(outcome="admitted")
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            worst = max(self._waiters)
+            if worst[0] <= priority:
+                ADMISSIONS.inc(outcome="rejected_full")
+                raise AdmissionRejected("Server is busy", self._estimated_wait())
+            # Shed the lowest-priority, most recent waiter to make room
+            self._remove(worst[2])
+            worst[2].set_exception(AdmissionRejected("Server is busy", self._estimated_wait()))
+            ADMISSIONS.inc(outcome="shed")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                # release() handed us the slot in the same tick we gave up: pass it on
+                self.release()
+            else:
+                self._remove(future)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            ADMISSIONS.inc(outcome="rejected_timeout")
+            raise AdmissionRejected("Timed out waiting for capacity", self._estimated_wait())
+        ADMISSIONS.inc(outcome="queued")
+
+    def release(self):
+        """Hand the slot to the best waiter, or free it"""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(True)
+                return
+        self.in_flight -= 1
+
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def _remove(self, future: asyncio.Future):
+        self._waiters = [waiter for waiter in self._waiters if waiter[2] is not future]
+        heapq.heapify(self._waiters)
+
+    def _estimated_wait(self) -> float:
+        return self.service_time * (len(self._waiters) + 1) / self.max_in_flight
+
+client_limiter = RateLimiter(
+    per_minute=float(os.getenv("CHAT_RATE_PER_CLIENT", 30)),
+    burst=float(os.getenv("CHAT_BURST_PER_CLIENT", 10))
+)
+conversation_limiter = RateLimiter(
+    per_minute=float(os.getenv("CHAT_RATE_PER_CONVERSATION", 12)),
+    burst=float(os.getenv("CHAT_BURST_PER_CONVERSATION", 4))
+)
+chat_admission = AdmissionController(
+    max_in_flight=int(os.getenv("CHAT_MAX_IN_FLIGHT", 16)),
+    max_queue=int(os.getenv("CHAT_MAX_QUEUE", 64)),
+    queue_timeout=float(os.getenv("CHAT_QUEUE_TIMEOUT", 10))
+)
+CHAT_IN_FLIGHT.set_function(lambda: chat_admission.in_flight)
+CHAT_QUEUE_DEPTH.set_function(chat_admission.queue_depth)
+
+def check_client_rate(client_id: str):
+    """
+    Raises:
+        AdmissionRejected: the client is over its rate
+    """
+    _check_rate(client_limiter, client_id)
+
+def check_conversation_rate(conversation_key: str):
+    """
+    Raises:
+        AdmissionRejected: the conversation is over its rate
+    """
+    _check_rate(conversation_limiter, conversation_key)
+
+def _check_rate(limiter: RateLimiter, key: str):
+    wait = limiter.check(key)
+    if wait:
+        ADMISSIONS.inc(outcome="rate_limited")
+        raise AdmissionRejected("Too many requests", wait)
@@ -0,0 +1,40 @@
+"""
+Booking analytics endpoints
+NumPy is imported with the analytics tool on the first request, so it stays
+off the API's cold start.
+"""
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from ..models.schemas import AppointmentType
+
+router = APIRouter()
+
+START_DATE = Query(None, description="First date (YYYY-MM-DD), defaults to 90 days ago")
+END_DATE = Query(None, description="Last date (YYYY-MM-DD), defaults to 30 days ahead")
+
+def _report(metric: str, start_date: Optional[str], end_date: Optional[str], **options):
+    from ..tools.analytics_tool import report
+    try:
+        return report(metric, start_date, end_date, **options)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/heatmap")
+async def utilization_heatmap(start_date: Optional[str] = START_DATE, end_date: Optional[str] = END_DATE):
+    """Share of each resource in use by weekday and hour"""
+    return _report("heatmap", start_date, end_date)
+
+@router.get("/lead-times")
+async def lead_times(
+    start_date: Optional[str] = START_DATE,
+    end_date: Optional[str] = END_DATE,
+    appointment_type: Optional[AppointmentType] = Query(None, description="Only this appointment type")
+):
+    """Histogram of days between booking and appointment"""
+    return _report("lead-times", start_date, end_date, appointment_type=appointment_type)
+
+@router.get("/demand")
+async def demand(start_date: Optional[str] = START_DATE, end_date: Optional[str] = END_DATE):
+    """Booked demand, open capacity and waitlisted patients per appointment type"""
+    from ..tools.waitlist_tool import waitlist_manager
+    return _report("demand", start_date, end_date, waitlist=list(waitlist_manager.entries.values()))
@@ -0,0 +1,68 @@
+"""
+Bulk booking import/export endpoints
+"""
+import io
+from typing import Literal, Optional
+import anyio
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from ..tools.bulk_tool import DEFAULT_CHUNK_SIZE, import_bookings, iter_export, iter_rows
+
+router = APIRouter()
+
+class _BodyStream(io.RawIOBase):
+    """
+    The streamed request body as a blocking binary file, for use from a
+    worker thread; each chunk is pulled from the event loop as it is read
+    """
+
+    def __init__(self, request: Request):
+        self._chunks = request.stream().__aiter__()
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            chunk = anyio.from_thread.run(self._next_chunk)
+            if chunk is None:
+                return 0
+            self._pending = chunk
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    async def _next_chunk(self) -> Optional[bytes]:
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return None
+
+@router.post("/import")
+async def import_bookings_endpoint(
+    request: Request,
+    format: Literal["jsonl", "csv"] = Query("jsonl", description="Format of the request body"),
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=10000)
+):
+    """Import bookings streamed as JSONL or CSV, committing in chunks"""
+    def run_import():
+        # Parsed with the same reader as file imports, without buffering the body whole
+        body = io.TextIOWrapper(io.BufferedReader(_BodyStream(request)), encoding="utf-8", newline="")
+        with body:
+            return import_bookings(iter_rows(body, format), chunk_size)
+
+    # Booking blocks on the store, so keep it off the event loop
+    return await run_in_threadpool(run_import)
+
+@router.get("/export")
+async def export_bookings_endpoint(
+    format: Literal["jsonl", "csv"] = Query("jsonl", description="Export format"),
+    start_date: Optional[str] = Query(None, description="Earliest date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="Latest date (YYYY-MM-DD)")
+):
+    """Stream all bookings as JSONL or CSV"""
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(iter_export(format, start_date, end_date), media_type=media_type)
@@ -2,10 +2,20 @@
 Mock Calendly API Integration
 Handles availability checking and appointment booking
 """
-from typing import List, Dict, Optional
-from datetime import datetime, date, timedelta
+import asyncio
+import sys
+from collections.abc import Mapping
+from typing import List, Dict, Optional, Iterator, Callable, Tuple
+from datetime import datetime
 from fastapi import APIRouter, HTTPException, Query
+from ..clinic_clock import clinic_today
 from ..models.schemas import TimeSlot, AvailabilityResponse, BookingRequest, BookingResponse, AppointmentType
+from ..models.records import BookingRecord, format_date, format_time, minute_stamp, parse_date, parse_time
+from ..monitoring.metrics import ARCHIVED_BOOKINGS
+from ..state import BookingArchive, BookingStore, MemoryBookingStore, get_booking_archive, get_booking_store
+from .capacity import CapacityModel, Occupancy, load_capacity
+from .change_feed import OP_DELETE, OP_UPSERT, ChangeFeed, StoreChangeFeed
+from .next_available import ANY_TIME, TIME_BUCKETS, NextAvailableIndex
 import json
 import os
 
@@ -21,10 +31,225 @@ BUSINESS_HOURS = {
     "end": 17    # 5 PM
 }
 
+# Slots start every 30 minutes
+SLOT_INTERVAL_MINUTES = 30
+
+# Long-polls re-check the shared store this often when several workers write to it
+CHANGES_POLL_SECONDS = 1.0
+
+class BookingsView(Mapping):
+    """Read-only view of bookings keyed by booking ID, as public dicts"""
+
+    def __init__(self, api: "MockCalendlyAPI"):
+        self._api = api
+
+    def __getitem__(self, booking_id: str) -> Dict:
+        return self._api._records[booking_id].to_dict()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._api._records))
+
+    def __len__(self) -> int:
+        return len(self._api._records)
+
 class MockCalendlyAPI:
-    def __init__(self):
-        self.bookings: Dict[str, Dict] = {}
+    def __init__(
+        self,
+        store: Optional[BookingStore] = None,
+        capacity: Optional[CapacityModel] = None,
+        archive: Optional[BookingArchive] = None
+    ):
+        # Shared store when running several workers; the records below are this process's view
+        self.store = store or MemoryBookingStore()
+        # Cold tier for past bookings (archive_past); None keeps everything hot
+        self.archive = archive
+        self._store_version = 0
+        self.capacity = capacity or CapacityModel.from_config(None)
         self.booking_counter = 1
+        # booking_id -> record, day ordinal -> booking_id -> record, and resource use per day
+        self._records: Dict[str, BookingRecord] = {}
+        self._days: Dict[int, Dict[str, BookingRecord]] = {}
+        self._occupancy: Dict[int, Occupancy] = {}
+        # Slots temporarily reserved (e.g. for a waitlisted patient), keyed by (day, start minute)
+        self.holds: Dict[Tuple[int, int], Dict] = {}
+        self._listeners: List[Callable[[str, Dict], None]] = []
+        # Sequenced deltas for external consumers, recorded inside store transactions
+        self.changes = ChangeFeed()
+        # With a shared store, get_changes reads the store's versions so cursors work on every worker
+        self.store_changes = StoreChangeFeed(
+            self.store, lambda booking: booking.get("date", "9999-12-31") < clinic_today().isoformat()
+        ) if self.store.shared else None
+        # Earliest free slot per appointment type, kept current by _index/_unindex
+        self.next_available = NextAvailableIndex(self._slot_starts, self._fits, list(APPOINTMENT_DURATIONS))
+        # Bookings persisted by a previous run (journal store)
+        for booking in self.store.recover(lambda: [record.to_dict() for record in self._records.values()]):
+            self._index(BookingRecord.from_dict(booking))
+        # Archived IDs outlive every store (the memory store restarts at 1); never reuse them
+        if self.archive is not None:
+            self.store.skip_booking_numbers(self.archive.last_booking_number())
+    
+    @property
+    def bookings(self) -> BookingsView:
+        """Bookings keyed by booking ID (converted to dicts on access)"""
+        return BookingsView(self)
+    
+    def add_listener(self, callback: Callable[[str, Dict], None]):
+        """
+        Register a callback invoked as callback(event, booking) after each change
+        
+        Events: "booked", "cancelled", "rescheduled" (the booking carries a
+        "previous" dict with the old date and start_time)
+        """
+        self._listeners.append(callback)
+    
+    def _emit(self, event: str, booking: Dict):
+        """Notify listeners; a failing listener never breaks the booking path"""
+        for callback in self._listeners:
+            try:
+                callback(event, booking)
+            except Exception as e:
+                print(f"⚠️ Warning: Booking listener failed on {event}: {e}")
+    
+    def _sync(self):
+        """Pull in bookings changed by other worker processes"""
+        if not self.store.shared:
+            return
+        version, changes = self.store.changes_since(self._store_version)
+        for booking_id, booking in changes:
+            record = self._unindex(booking_id)
+            previous = record.to_dict() if record else None
+            if booking is not None:
+                self._index(BookingRecord.from_dict(booking))
+            # Our own writes come back here too; only feed what another worker changed
+            # (a past booking disappearing was archived, not cancelled)
+            archived = booking is None and record is not None and record.day < clinic_today().toordinal()
+            if booking != previous and not archived:
+                self.changes.record(OP_DELETE if booking is None else OP_UPSERT, "synced", booking or previous)
+        self._store_version = version
+    
+    def _index(self, record: BookingRecord):
+        self._records[record.booking_id] = record
+        self._days.setdefault(record.day, {})[record.booking_id] = record
+        self._day_occupancy(record.day).add(self.capacity.needs(record.appointment_type), record.start, record.end)
+        self.next_available.invalidate(record.day)
+    
+    def _unindex(self, booking_id: str) -> Optional[BookingRecord]:
+        record = self._records.pop(booking_id, None)
+        if record is not None:
+            self._days.get(record.day, {}).pop(booking_id, None)
+            self._day_occupancy(record.day).add(self.capacity.needs(record.appointment_type), record.start, record.end, sign=-1)
+            self.next_available.invalidate(record.day)
+        return record
+    
+    def _day_occupancy(self, day: int) -> Occupancy:
+        occupancy = self._occupancy.get(day)
+        if occupancy is None:
+            occupancy = self._occupancy[day] = Occupancy()
+        return occupancy
+    
+    def _fits(self, day: int, start: int, appointment_type: str) -> bool:
+        """Whether every resource the type needs has room for its whole duration"""
+        occupancy = self._occupancy.get(day)
+        if occupancy is None:
+            return True
+        return occupancy.fits(self.capacity, appointment_type, start, start + APPOINTMENT_DURATIONS[appointment_type])
+    
+    def place_hold(
+        self,
+        target_date: str,
+        start_time: str,
+        hold_id: str,
+        expires_at: datetime,
+        appointment_type: AppointmentType = "consultation"
+    ):
+        """Reserve a free slot so only the holder can book it until expires_at"""
+        self._sync()
+        day, start = parse_date(target_date), parse_time(start_time)
+        if not self._is_free(day, start, appointment_type):
+            raise ValueError(f"Slot {target_date} {start_time} is not free")
+        self.holds[(day, start)] = {"hold_id": hold_id, "expires_at": expires_at}
+    
+    def release_hold(self, target_date: str, start_time: str, hold_id: Optional[str] = None):
+        """Release a hold (only if it belongs to hold_id, when given)"""
+        key = (parse_date(target_date), parse_time(start_time))
+        hold = self.holds.get(key)
+        if hold and (hold_id is None or hold["hold_id"] == hold_id):
+            del self.holds[key]
+    
+    def _is_held(self, key: Tuple[int, int], hold_id: Optional[str] = None) -> bool:
+        """Check whether a (day, start) slot is held by someone other than hold_id"""
+        hold = self.holds.get(key)
+        if hold is None:
+            return False
+        if hold["expires_at"] <= datetime.now():
+            del self.holds[key]
+            return False
+        return hold["hold_id"] != hold_id
+    
+    def _is_free(self, day: int, start: int, appointment_type: str) -> bool:
+        return self._fits(day, start, appointment_type) and not (self.holds and self._is_held((day, start)))
+    
+    def is_slot_available(
+        self,
+        target_date: str,
+        start_time: str,
+        appointment_type: AppointmentType = "consultation"
+    ) -> bool:
+        """
+        Check a single slot without generating the whole day
+        """
+        day, start = parse_date(target_date), parse_time(start_time)
+        if self._off_schedule(day, start, appointment_type):
+            return False
+        self._sync()
+        
+        return self._is_free(day, start, appointment_type)
+    
+    def _off_schedule(self, day: int, start: int, appointment_type: str) -> Optional[str]:
+        """Return why a start can never be booked (past day, off the slot grid, outside business hours), or None"""
+        if day < clinic_today().toordinal():
+            return f"{format_date(day)} is in the past"
+        end = start + APPOINTMENT_DURATIONS[appointment_type]
+        if start % SLOT_INTERVAL_MINUTES != 0 or start < BUSINESS_HOURS["start"] * 60 or end > BUSINESS_HOURS["end"] * 60:
+            return f"{format_date(day)} {format_time(start)} is not a bookable start time"
+        return None
+    
+    def get_free_starts(self, target_date: str, appointment_type: AppointmentType = "consultation") -> List[int]:
+        """
+        Free start times of a date as minutes from midnight (the fast path for internal callers)
+        """
+        day = parse_date(target_date)
+        if day < clinic_today().toordinal():
+            return []
+        self._sync()
+        
+        return [start for start in self._slot_starts(appointment_type) if self._is_free(day, start, appointment_type)]
+    
+    def _slot_starts(self, appointment_type: str) -> range:
+        """Start minutes on the slot grid where an appointment of this type ends within business hours"""
+        last_start = BUSINESS_HOURS["end"] * 60 - APPOINTMENT_DURATIONS[appointment_type]
+        return range(BUSINESS_HOURS["start"] * 60, last_start + 1, SLOT_INTERVAL_MINUTES)
+    
+    def get_next_available(self, appointment_type: AppointmentType = "consultation", time_of_day: Optional[str] = None) -> Optional[Dict]:
+        """
+        Earliest free slot within the booking horizon, from the maintained index
+        
+        Args:
+            appointment_type: Type of appointment
+            time_of_day: "morning", "afternoon" or "evening" (None for any time)
+        """
+        self._sync()
+        is_held = (lambda day, start: self._is_held((day, start))) if self.holds else None
+        found = self.next_available.earliest(appointment_type, time_of_day or ANY_TIME, is_held)
+        if found is None:
+            return None
+        day, start = found
+        return {
+            "appointment_type": appointment_type,
+            "date": format_date(day),
+            "start_time": format_time(start),
+            "duration_minutes": APPOINTMENT_DURATIONS[appointment_type]
+        }
         
     def get_available_slots(
         self, 
@@ -34,44 +259,35 @@ class MockCalendlyAPI:
         """
         Get available time slots for a given date and appointment type
         """
-        target = datetime.strptime(target_date, "%Y-%m-%d").date()
-        today = date.today()
-        
-        if target < today:
-            return AvailabilityResponse(date=target_date, available_slots=[])
-        
         duration = APPOINTMENT_DURATIONS[appointment_type]
-        slots = []
-        
-        current_hour = BUSINESS_HOURS["start"]
-        while current_hour < BUSINESS_HOURS["end"]:
-            end_hour = current_hour + (duration / 60)
-            if end_hour > BUSINESS_HOURS["end"]:
-                break
-            
-            start_time_str = f"{int(current_hour):02d}:00"
-            end_minutes = int((end_hour - int(end_hour)) * 60)
-            end_hour_int = int(end_hour)
-            end_time_str = f"{end_hour_int:02d}:{end_minutes:02d}"
-            
-            slot_key = f"{target_date}_{start_time_str}"
-            is_available = slot_key not in self.bookings
-            
-            slots.append(TimeSlot(
-                start_time=start_time_str,
-                end_time=end_time_str,
-                available=is_available
-            ))
-            
-            current_hour += 0.5
-        
-        available_slots = [slot for slot in slots if slot.available]
-        
         return AvailabilityResponse(
             date=target_date,
-            available_slots=available_slots
+            available_slots=[
+                TimeSlot(start_time=format_time(start), end_time=format_time(start + duration), available=True)
+                for start in self.get_free_starts(target_date, appointment_type)
+            ]
         )
     
+    def get_booked_intervals(self, target_date: str, appointment_type: Optional[AppointmentType] = None) -> List[tuple]:
+        """
+        Get occupied (start_minute, end_minute) intervals for a date, including holds
+        
+        With an appointment type, only the intervals where that type has no
+        capacity left (parallel rooms/providers leave other times open).
+        """
+        self._sync()
+        day = parse_date(target_date)
+        if appointment_type:
+            intervals = self._day_occupancy(day).blocked_intervals(self.capacity, appointment_type)
+        else:
+            intervals = [(record.start, record.end) for record in self._days.get(day, {}).values()]
+        
+        for key in list(self.holds.keys()):
+            if key[0] == day and self._is_held(key):
+                intervals.append((key[1], key[1] + SLOT_INTERVAL_MINUTES))
+        
+        return sorted(intervals)
+    
     def get_multiple_days_availability(
         self,
         start_date: str,
@@ -82,10 +298,10 @@ class MockCalendlyAPI:
         Get availability for multiple days
         """
         results = {}
-        current_date = datetime.strptime(start_date, "%Y-%m-%d").date()
+        first_day = parse_date(start_date)
         
         for i in range(num_days):
-            date_str = (current_date + timedelta(days=i)).strftime("%Y-%m-%d")
+            date_str = format_date(first_day + i)
             results[date_str] = self.get_available_slots(date_str, appointment_type)
         
         return results
@@ -94,29 +310,344 @@ class MockCalendlyAPI:
         """
         Book an appointment
         """
-        slot_key = f"{booking_request.date}_{booking_request.start_time}"
+        day, start = parse_date(booking_request.date), parse_time(booking_request.start_time)
         
-        # Check if slot is still available
-        if slot_key in self.bookings:
-            raise ValueError(f"Slot {booking_request.date} {booking_request.start_time} is already booked")
+        with self.store.transaction():
+            self._sync()
+            # Check if slot is still available
+            conflict = self._check_conflict(day, start, booking_request)
+            if conflict:
+                raise ValueError(conflict)
+            
+            booking_response = self._create_booking(day, start, booking_request)
         
-        # Create booking
-        booking_id = f"APPT-{datetime.now().year}-{self.booking_counter:03d}"
-        self.booking_counter += 1
-        confirmation_code = f"ABC{self.booking_counter % 1000:03d}"
+        self._emit("booked", booking_response.details)
+        return booking_response
+    
+    def bulk_book(self, booking_requests: List[BookingRequest], series_id: Optional[str] = None, all_or_nothing: bool = False) -> List[Dict]:
+        """
+        Book a batch of appointments in a single pass
         
-        booking_details = {
-            "booking_id": booking_id,
-            "appointment_type": booking_request.appointment_type,
-            "date": booking_request.date,
-            "start_time": booking_request.start_time,
-            "patient": booking_request.patient.dict(),
-            "reason": booking_request.reason,
-            "duration_minutes": APPOINTMENT_DURATIONS[booking_request.appointment_type],
-            "status": "confirmed"
-        }
+        Conflicts are checked against existing bookings and within the batch
+        itself; conflicting requests are reported and the rest are committed.
+        With all_or_nothing, the whole batch is checked first and nothing is
+        booked if any request conflicts (the others are reported as skipped),
+        all in the same store transaction.
+        
+        Returns:
+            One result dict per request, in order
+        """
+        results = []
+        booked = []
+        with self.store.transaction():
+            self._sync()
+            if all_or_nothing:
+                conflicts = self._batch_conflicts(booking_requests)
+                if conflicts:
+                    not_booked = f"Not booked, {len(conflicts)} other request(s) in the batch conflict"
+                    return [
+                        {"success": False, "error": conflicts[i]} if i in conflicts
+                        else {"success": False, "error": not_booked, "skipped": True}
+                        for i in range(len(booking_requests))
+                    ]
+            for booking_request in booking_requests:
+                day, start = parse_date(booking_request.date), parse_time(booking_request.start_time)
+                conflict = self._check_conflict(day, start, booking_request, on_schedule=True)
+                if conflict:
+                    results.append({"success": False, "error": conflict})
+                    continue
+                
+                booking_response = self._create_booking(day, start, booking_request, series_id)
+                booked.append(booking_response.details)
+                results.append({"success": True, "booking_id": booking_response.booking_id})
+        
+        for booking_details in booked:
+            self._emit("booked", booking_details)
+        return results
+    
+    def find_conflicts(self, booking_requests: List[BookingRequest], ignore_booking_ids: Optional[set] = None) -> Dict[int, str]:
+        """
+        Check a batch of requests against the calendar in one pass without booking
         
-        self.bookings[slot_key] = booking_details
+        Args:
+            booking_requests: Requests to check
+            ignore_booking_ids: Bookings treated as free (e.g. the ones being moved)
+        
+        Returns:
+            Dict mapping request index to conflict message
+        """
+        with self.store.transaction():
+            self._sync()
+            return self._batch_conflicts(booking_requests, ignore_booking_ids)
+    
+    def _batch_conflicts(self, booking_requests: List[BookingRequest], ignore_booking_ids: Optional[set] = None) -> Dict[int, str]:
+        """find_conflicts for a caller already inside a store transaction"""
+        conflicts = {}
+        # Check against the calendar as if the ignored bookings were gone and
+        # the earlier requests of the batch were already booked, then undo
+        ignored = [self._unindex(booking_id) for booking_id in (ignore_booking_ids or ()) if booking_id in self._records]
+        tentative = []
+        try:
+            for i, booking_request in enumerate(booking_requests):
+                day, start = parse_date(booking_request.date), parse_time(booking_request.start_time)
+                conflict = self._check_conflict(day, start, booking_request, on_schedule=True)
+                if conflict:
+                    conflicts[i] = conflict
+                    continue
+                needs = self.capacity.needs(booking_request.appointment_type)
+                end = start + APPOINTMENT_DURATIONS[booking_request.appointment_type]
+                self._day_occupancy(day).add(needs, start, end)
+                tentative.append((day, needs, start, end))
+        finally:
+            for day, needs, start, end in tentative:
+                self._day_occupancy(day).add(needs, start, end, sign=-1)
+                # A concurrent index refresh may have seen the tentative bookings
+                self.next_available.invalidate(day)
+            for record in ignored:
+                self._index(record)
+        return conflicts
+    
+    def series_bookings(self, series_id: str) -> List[Dict]:
+        """Current (not yet archived) bookings of a recurring series, in date order"""
+        self._sync()
+        records = [record for record in list(self._records.values()) if record.series_id == series_id]
+        return [record.to_dict() for record in sorted(records, key=lambda record: (record.day, record.start))]
+    
+    def get_booking(self, booking_id: str) -> Optional[Dict]:
+        """Look up a booking by its ID (past bookings come from the archive)"""
+        self._sync()
+        record = self._records.get(booking_id)
+        if record is not None:
+            return record.to_dict()
+        return self.archive.get(booking_id) if self.archive else None
+    
+    def archive_past(self, before: Optional[str] = None) -> int:
+        """
+        Move bookings dated before a day (today by default) to the cold archive,
+        so the hot records only cover today onward
+        
+        Returns:
+            Number of bookings moved
+        """
+        if self.archive is None:
+            return 0
+        cutoff = parse_date(before) if before else clinic_today().toordinal()
+        with self.store.transaction():
+            self._sync()
+            past = [day for day in self._days if day < cutoff]
+            records = [record for day in past for record in self._days[day].values()]
+            # Written and fsynced before anything is dropped from the hot store
+            conflicts = set(self.archive.append([record.to_dict() for record in records])) if records else set()
+            if conflicts:
+                print(f"⚠️ Warning: Not archiving {len(conflicts)} bookings whose IDs are taken in the archive: {', '.join(sorted(conflicts))}")
+            records = [record for record in records if record.booking_id not in conflicts]
+            for record in records:
+                self._unindex(record.booking_id)
+                self.store.delete(record.booking_id)
+            for day in past:
+                if not self._days.get(day):
+                    self._days.pop(day, None)
+                    self._occupancy.pop(day, None)
+            for key in [key for key in self.holds if key[0] < cutoff]:
+                del self.holds[key]
+        ARCHIVED_BOOKINGS.inc(len(records))
+        return len(records)
+    
+    def reschedule_appointment(
+        self,
+        booking_id: str,
+        new_date: str,
+        new_start_time: str,
+        appointment_type: Optional[AppointmentType] = None
+    ) -> Dict:
+        """
+        Move a booking to another slot (and optionally change its type), keeping its ID
+        
+        Returns:
+            Updated booking details
+        """
+        new_day, new_start = parse_date(new_date), parse_time(new_start_time)
+        with self.store.transaction():
+            self._sync()
+            record = self._records.get(booking_id)
+            if record is None:
+                raise ValueError(f"Booking {booking_id} not found")
+            
+            new_type = appointment_type or record.appointment_type
+            self._unindex(booking_id)
+            if not self._fits(new_day, new_start, new_type):
+                self._index(record)
+                raise ValueError(f"Slot {new_date} {new_start_time} is already booked")
+            if (new_day, new_start) != (record.day, record.start) and self._is_held((new_day, new_start)):
+                self._index(record)
+                raise ValueError(f"Slot {new_date} {new_start_time} is on hold for another patient")
+            
+            booking, previous = self._move(record, new_day, new_start, appointment_type)
+        
+        self._emit("rescheduled", {**booking, "previous": previous})
+        return booking
+    
+    def reschedule_batch(self, moves: List[Tuple[str, BookingRequest]]) -> Dict[int, str]:
+        """
+        Move several bookings at once: either every booking moves or none does
+        
+        The whole batch is checked (each move may use the slots the others
+        free up) and then written in a single store transaction.
+        
+        Args:
+            moves: (booking ID, request for the new slot and type) pairs
+        
+        Returns:
+            Dict mapping move index to conflict message; empty if all moved
+        """
+        moved = []
+        with self.store.transaction():
+            self._sync()
+            missing = [booking_id for booking_id, _ in moves if booking_id not in self._records]
+            if missing:
+                raise ValueError(f"Booking {missing[0]} not found")
+            
+            new_requests = [booking_request for _, booking_request in moves]
+            conflicts = self._batch_conflicts(new_requests, ignore_booking_ids={booking_id for booking_id, _ in moves})
+            if conflicts:
+                return conflicts
+            
+            # Free every old slot before taking the new ones, as the check did
+            records = [self._unindex(booking_id) for booking_id, _ in moves]
+            for record, booking_request in zip(records, new_requests):
+                moved.append(self._move(
+                    record,
+                    parse_date(booking_request.date),
+                    parse_time(booking_request.start_time),
+                    booking_request.appointment_type
+                ))
+        
+        for booking, previous in moved:
+            self._emit("rescheduled", {**booking, "previous": previous})
+        return {}
+    
+    def _move(self, record: BookingRecord, new_day: int, new_start: int, appointment_type: Optional[str]) -> Tuple[Dict, Dict]:
+        """Re-index an unindexed record at a slot already known to be free; returns (booking, previous slot)"""
+        previous = {"date": record.date, "start_time": record.start_time}
+        record.day = new_day
+        record.start = new_start
+        if appointment_type:
+            record.appointment_type = sys.intern(appointment_type)
+            record.duration = APPOINTMENT_DURATIONS[appointment_type]
+        self._index(record)
+        booking = record.to_dict()
+        self.store.put(booking)
+        self.changes.record(OP_UPSERT, "rescheduled", booking)
+        return booking, previous
+    
+    def _check_conflict(self, day: int, start: int, booking_request: BookingRequest, on_schedule: bool = False) -> Optional[str]:
+        """
+        Return why a slot can't be booked for a request, or None if it is free
+
+        on_schedule also applies is_slot_available's checks (past day, slot
+        grid, business hours), for batches generated from recurrence rules or files
+        """
+        if on_schedule:
+            problem = self._off_schedule(day, start, booking_request.appointment_type)
+            if problem:
+                return problem
+        if not self._fits(day, start, booking_request.appointment_type):
+            return f"Slot {booking_request.date} {booking_request.start_time} is already booked"
+        if self._is_held((day, start), booking_request.hold_id):
+            return f"Slot {booking_request.date} {booking_request.start_time} is on hold for another patient"
+        return None
+    
+    def get_changes(self, since: Optional[str] = None, limit: int = 500) -> Dict:
+        """
+        Booking changes after a cursor (see ChangeFeed.read)
+
+        Raises:
+            ValueError: malformed cursor
+        """
+        if self.store_changes is not None:
+            # A plain read of the shared store; no write lock, no sync of our view
+            return self.store_changes.read(since, limit)
+        with self.store.transaction():
+            self._sync()
+            return self.changes.read(since, limit, lambda: [record.to_dict() for record in self._records.values()])
+    
+    def snapshot_records(self) -> Tuple[int, List[BookingRecord]]:
+        """Change sequence and the current records, read together (for analytics caches)"""
+        with self.store.transaction():
+            self._sync()
+            return self.changes.seq, list(self._records.values())
+    
+    def get_occupancy(self, target_date: str) -> Dict[str, float]:
+        """Average utilization of each resource over business hours"""
+        self._sync()
+        return self._day_occupancy(parse_date(target_date)).utilization(
+            self.capacity, BUSINESS_HOURS["start"] * 60, BUSINESS_HOURS["end"] * 60
+        )
+    
+    def iter_records(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> Iterator[BookingRecord]:
+        """
+        Iterate over booking records, optionally limited to an inclusive date range
+        (archived ones first when the range reaches into the past)
+        """
+        self._sync()
+        first = parse_date(start_date) if start_date else None
+        last = parse_date(end_date) if end_date else None
+        if self.archive is not None and (first is None or first < clinic_today().toordinal()):
+            for booking in self.archive.iter_bookings(start_date, end_date):
+                yield BookingRecord.from_dict(booking)
+        # Snapshot so concurrent bookings don't break iteration
+        for record in list(self._records.values()):
+            if first is not None and record.day < first:
+                continue
+            if last is not None and record.day > last:
+                continue
+            yield record
+    
+    def day_records(self, first_day: int, last_day: int) -> List[BookingRecord]:
+        """
+        Hot booking records on an inclusive range of day ordinals, read from
+        the per-day index (no archive, no scan of other days)
+        """
+        self._sync()
+        return [record for day in range(first_day, last_day + 1) for record in list(self._days.get(day, {}).values())]
+    
+    def iter_bookings(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Iterate over bookings, optionally limited to an inclusive date range
+        """
+        for record in self.iter_records(start_date, end_date):
+            yield record.to_dict()
+    
+    def _create_booking(self, day: int, start: int, booking_request: BookingRequest, series_id: Optional[str] = None) -> BookingResponse:
+        """
+        Create and store a booking for a slot already known to be free
+        
+        Called inside a store transaction; the caller emits "booked" once it commits.
+        """
+        number = self.store.next_booking_number()
+        booking_id = f"APPT-{datetime.now().year}-{number:03d}"
+        self.booking_counter = number + 1
+        confirmation_code = f"ABC{self.booking_counter % 1000:03d}"
+        
+        patient = booking_request.patient
+        record = BookingRecord(
+            booking_id=booking_id,
+            appointment_type=booking_request.appointment_type,
+            day=day,
+            start=start,
+            duration=APPOINTMENT_DURATIONS[booking_request.appointment_type],
+            patient_name=patient.name,
+            patient_email=patient.email,
+            patient_phone=patient.phone,
+            reason=booking_request.reason,
+            series_id=series_id,
+            created=minute_stamp(datetime.now())
+        )
+        self._index(record)
+        self.holds.pop((day, start), None)
+        booking_details = record.to_dict()
+        self.store.put(booking_details)
+        self.changes.record(OP_UPSERT, "booked", booking_details)
         
         return BookingResponse(
             booking_id=booking_id,
@@ -129,13 +660,22 @@ class MockCalendlyAPI:
         """
         Cancel an appointment
         """
-        for slot_key, booking in list(self.bookings.items()):
-            if booking["booking_id"] == booking_id:
-                del self.bookings[slot_key]
-                return True
-        return False
+        with self.store.transaction():
+            self._sync()
+            record = self._unindex(booking_id)
+            if record is None:
+                return False
+            self.store.delete(booking_id)
+            self.changes.record(OP_DELETE, "cancelled", record.to_dict())
+        
+        self._emit("cancelled", record.to_dict())
+        return True
 
-calendly_api = MockCalendlyAPI()
+calendly_api = MockCalendlyAPI(
+    get_booking_store(),
+    load_capacity(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "doctor_schedule.json")),
+    get_booking_archive()
+)
 
 router = APIRouter()
 
@@ -150,6 +690,53 @@ async def get_availability(
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/occupancy")
+async def get_occupancy(date: str = Query(..., description="Date in YYYY-MM-DD format")):
+    """Share of each resource (provider, rooms...) booked over business hours"""
+    try:
+        return {"date": date, "utilization": calendly_api.get_occupancy(date)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/next-available")
+async def get_next_available(
+    appointment_type: Optional[AppointmentType] = Query(None, description="Type of appointment (all types if omitted)"),
+    time_of_day: Optional[str] = Query(None, description="morning, afternoon or evening")
+):
+    """Earliest free slot per appointment type (e.g. for a "next available" banner)"""
+    if time_of_day and time_of_day not in TIME_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"time_of_day must be one of: {', '.join(TIME_BUCKETS)}")
+    types = [appointment_type] if appointment_type else list(APPOINTMENT_DURATIONS)
+    return {
+        "time_of_day": time_of_day or ANY_TIME,
+        "next_available": {t: calendly_api.get_next_available(t, time_of_day) for t in types}
+    }
+
+@router.get("/changes")
+async def get_changes(
+    since: Optional[str] = Query(None, description="Cursor from the previous response (omit to start from a snapshot)"),
+    limit: int = Query(500, ge=1, le=5000, description="Maximum changes per page"),
+    wait: float = Query(0, ge=0, le=60, description="Long-poll: seconds to wait for a change when there is none")
+):
+    """Bookings created, moved or cancelled since a cursor, for incremental sync"""
+    try:
+        result = calendly_api.get_changes(since, limit)
+        deadline = asyncio.get_running_loop().time() + wait
+        while not result["changes"] and not result["reset"]:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            if calendly_api.store.shared:
+                # Changes made by other workers are only seen by re-reading the shared store;
+                # our own writes still end the wait early
+                await calendly_api.changes.wait(calendly_api.changes.cursor(), min(remaining, CHANGES_POLL_SECONDS))
+            else:
+                await calendly_api.changes.wait(result["cursor"], remaining)
+            result = calendly_api.get_changes(result["cursor"], limit)
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.post("/book", response_model=BookingResponse)
 async def create_booking(booking_request: BookingRequest):
     """Book an appointment"""
@@ -160,3 +747,10 @@ async def create_booking(booking_request: BookingRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.delete("/bookings/{booking_id}")
+async def cancel_booking(booking_id: str):
+    """Cancel an appointment"""
+    if not calendly_api.cancel_appointment(booking_id):
+        raise HTTPException(status_code=404, detail=f"Booking {booking_id} not found")
+    return {"booking_id": booking_id, "status": "cancelled"}
+
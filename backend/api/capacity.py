@@ -0,0 +1,149 @@
+"""
+Capacity model for the scheduler
+Each appointment type needs some units of named resources (provider, exam
+room, nurse...) for its whole duration. Occupancy is counted per resource in
+15-minute ticks, so a slot is free when every required resource has room
+over every tick the appointment covers. An optional overbooking policy
+raises the limit per appointment type from historical no-show rates.
+"""
+import json
+import math
+import os
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+TICK_MINUTES = 15
+TICKS_PER_DAY = 24 * 60 // TICK_MINUTES
+
+DEFAULT_CAPACITY = {
+    "resources": {"provider": 1},
+    "appointment_resources": {},
+    "overbooking": {"enabled": False}
+}
+
+class CapacityModel:
+    def __init__(
+        self,
+        resources: Dict[str, int],
+        appointment_resources: Optional[Dict[str, Dict[str, int]]] = None,
+        overbooking: Optional[Dict] = None
+    ):
+        self.resources = dict(resources)
+        self.appointment_resources = appointment_resources or {}
+        overbooking = overbooking or {}
+        self.overbooking_enabled = overbooking.get("enabled", False)
+        self.max_overbook_ratio = overbooking.get("max_ratio", 0.2)
+        self.no_show_rates: Dict[str, float] = overbooking.get("no_show_rates", {})
+        self._needs_cache: Dict[str, Tuple[Tuple[str, int], ...]] = {}
+        self._limits_cache: Dict[str, Dict[str, int]] = {}
+        unknown = {
+            resource
+            for needs in self.appointment_resources.values()
+            for resource in needs
+            if resource not in self.resources
+        }
+        if unknown:
+            raise ValueError(f"Appointment types need undefined resources: {', '.join(sorted(unknown))}")
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict]) -> "CapacityModel":
+        config = config or DEFAULT_CAPACITY
+        return cls(config["resources"], config.get("appointment_resources"), config.get("overbooking"))
+
+    def needs(self, appointment_type: str) -> Tuple[Tuple[str, int], ...]:
+        """(resource, units) an appointment type holds for its duration; one of each resource by default"""
+        needs = self._needs_cache.get(appointment_type)
+        if needs is None:
+            configured = self.appointment_resources.get(appointment_type)
+            if configured is None:
+                configured = {resource: 1 for resource in self.resources}
+            needs = self._needs_cache[appointment_type] = tuple(configured.items())
+        return needs
+
+    def limit(self, resource: str, appointment_type: str) -> int:
+        """
+        Units of a resource that may be committed when booking this type
+
+        With overbooking, capacity is scaled so expected attendance
+        (bookings x show rate) fits, capped at max_ratio over capacity.
+        """
+        limits = self._limits_cache.get(appointment_type)
+        if limits is None:
+            limits = self._limits_cache[appointment_type] = {}
+            rate = self.no_show_rates.get(appointment_type, 0.0) if self.overbooking_enabled else 0.0
+            for name, capacity in self.resources.items():
+                overbooked = math.floor(capacity / (1 - min(rate, 0.9)) + 1e-9)
+                cap = math.floor(capacity * (1 + self.max_overbook_ratio) + 1e-9)
+                limits[name] = max(capacity, min(overbooked, cap))
+        return limits[resource]
+
+    def set_no_show_rates(self, rates: Dict[str, float]):
+        """Update the no-show history driving the overbooking policy"""
+        self.no_show_rates = dict(rates)
+        self._limits_cache.clear()
+
+def load_capacity(schedule_path: str) -> CapacityModel:
+    """Capacity section of doctor_schedule.json (single provider if absent)"""
+    if not os.path.exists(schedule_path):
+        return CapacityModel.from_config(None)
+    with open(schedule_path) as f:
+        return CapacityModel.from_config(json.load(f).get("capacity"))
+
+class Occupancy:
+    """Units in use per resource and tick for one day"""
+
+    __slots__ = ("counts",)
+
+    def __init__(self):
+        self.counts: Dict[str, array] = {}
+
+    def add(self, needs: Tuple[Tuple[str, int], ...], start: int, end: int, sign: int = 1):
+        first, last = start // TICK_MINUTES, -(-end // TICK_MINUTES)
+        for resource, units in needs:
+            counts = self.counts.get(resource)
+            if counts is None:
+                counts = self.counts[resource] = array("H", bytes(2 * TICKS_PER_DAY))
+            for tick in range(first, last):
+                counts[tick] += sign * units
+
+    def fits(self, model: CapacityModel, appointment_type: str, start: int, end: int) -> bool:
+        first, last = start // TICK_MINUTES, -(-end // TICK_MINUTES)
+        for resource, units in model.needs(appointment_type):
+            counts = self.counts.get(resource)
+            if counts is not None and max(counts[first:last]) + units > model.limit(resource, appointment_type):
+                return False
+        return True
+
+    def blocked_intervals(self, model: CapacityModel, appointment_type: str) -> List[Tuple[int, int]]:
+        """(start, end) minute ranges where this type can't fit any part of an appointment"""
+        blocked = [False] * TICKS_PER_DAY
+        for resource, units in model.needs(appointment_type):
+            counts = self.counts.get(resource)
+            if counts is None:
+                continue
+            limit = model.limit(resource, appointment_type)
+            for tick, used in enumerate(counts):
+                if used + units > limit:
+                    blocked[tick] = True
+
+        intervals = []
+        tick = 0
+        while tick < TICKS_PER_DAY:
+            if blocked[tick]:
+                begin = tick
+                while tick < TICKS_PER_DAY and blocked[tick]:
+                    tick += 1
+                intervals.append((begin * TICK_MINUTES, tick * TICK_MINUTES))
+            else:
+                tick += 1
+        return intervals
+
+    def utilization(self, model: CapacityModel, start: int, end: int) -> Dict[str, float]:
+        """Average share of each resource in use between two minutes of the day"""
+        first, last = start // TICK_MINUTES, -(-end // TICK_MINUTES)
+        result = {}
+        for resource, capacity in model.resources.items():
+            counts = self.counts.get(resource)
+            used = sum(counts[first:last]) if counts is not None else 0
+            result[resource] = round(used / (capacity * (last - first)), 4) if last > first else 0.0
+        return result
@@ -0,0 +1,159 @@
+"""
+Booking change feed
+Every booking mutation gets the next sequence number, so consumers (EHR sync,
+reporting jobs, front-desk screens) can poll for deltas since an opaque
+cursor instead of re-reading every booking. The most recent changes are kept
+in memory; a cursor older than that window, from another process run, or
+missing gets a full snapshot to resync from. With a shared store the feed is
+read from the store's own version numbers instead, so any worker can serve
+any cursor.
+"""
+import asyncio
+import os
+import threading
+import uuid
+from collections import deque
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+OP_UPSERT = "upsert"
+OP_DELETE = "delete"
+
+# Changes kept for delta reads; older cursors get a snapshot
+RETENTION = int(os.getenv("CHANGE_FEED_RETENTION", 10000))
+
+class ChangeFeed:
+    def __init__(self, retention: int = RETENTION):
+        # Cursors are "<epoch>-<seq>"; a new epoch per process run invalidates old cursors
+        self.epoch = uuid.uuid4().hex[:8]
+        self.seq = 0
+        self._changes: deque = deque(maxlen=retention)
+        self._lock = threading.Lock()
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = set()
+
+    def cursor(self, seq: Optional[int] = None) -> str:
+        return f"{self.epoch}-{self.seq if seq is None else seq}"
+
+    def record(self, op: str, event: str, booking: Dict):
+        """
+        Append a change (call while holding the booking store's transaction so
+        the sequence follows commit order)
+
+        Args:
+            op: "upsert" or "delete"
+            event: What happened ("booked", "rescheduled", "cancelled", "synced")
+            booking: The booking after the change (last known state for deletes)
+        """
+        with self._lock:
+            self.seq += 1
+            self._changes.append({
+                "seq": self.seq,
+                "op": op,
+                "event": event,
+                "booking_id": booking["booking_id"],
+                "booking": booking,
+                "changed_at": datetime.now().isoformat(timespec="seconds")
+            })
+            waiters, self._waiters = self._waiters, set()
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_wake, future)
+
+    def read(self, since: Optional[str], limit: int, snapshot: Callable[[], List[Dict]]) -> Dict:
+        """
+        Changes after a cursor, oldest first
+
+        Args:
+            since: Cursor from a previous read (None to start with a snapshot)
+            limit: Maximum number of changes to return
+            snapshot: Returns all current bookings, used when the cursor can't be served
+
+        Returns:
+            {"cursor", "changes", "has_more", "reset"} plus "bookings" when reset
+            is True: the consumer should replace its copy with them
+        """
+        seq = self._parse(since)
+        with self._lock:
+            oldest = self._changes[0]["seq"] if self._changes else self.seq + 1
+            if seq is None or seq > self.seq or seq < oldest - 1:
+                return {"cursor": self.cursor(), "changes": [], "has_more": False, "reset": True, "bookings": snapshot()}
+            skip = seq - oldest + 1
+            changes = list(islice(self._changes, skip, skip + limit))
+            last = changes[-1]["seq"] if changes else seq
+            return {"cursor": self.cursor(last), "changes": changes, "has_more": last < self.seq, "reset": False}
+
+    async def wait(self, since: str, timeout: float) -> bool:
+        """Long-poll: wait until there is a change after the cursor; False on timeout"""
+        seq = self._parse(since)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            if seq is None or self.seq > seq:
+                return True
+            waiter = (loop, future)
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+    def _parse(self, cursor: Optional[str]) -> Optional[int]:
+        """Sequence number of a cursor from this run (None if it must resync)"""
+        return _parse_cursor(cursor, self.epoch)
+
+class StoreChangeFeed:
+    """
+    Changes read straight from a shared store: the sequence is the store's
+    version and deletions are its tombstones. The store keeps only the latest
+    state of each booking, so a delta collapses repeated changes to one.
+    """
+
+    def __init__(self, store, is_archived: Callable[[Dict], bool]):
+        self.store = store
+        # Deleting a past booking archives it; that is not a cancellation
+        self.is_archived = is_archived
+
+    def read(self, since: Optional[str], limit: int) -> Dict:
+        """Same contract as ChangeFeed.read"""
+        epoch = self.store.feed_id()
+        version = _parse_cursor(since, epoch)
+        if version is None:
+            version, bookings = self.store.snapshot()
+            return {"cursor": f"{epoch}-{version}", "changes": [], "has_more": False, "reset": True, "bookings": bookings}
+
+        rows = self.store.read_changes(version, limit + 1)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        changes = []
+        for row_version, booking_id, deleted, booking in rows:
+            booking = booking or {"booking_id": booking_id}
+            if deleted and self.is_archived(booking):
+                continue
+            changes.append({
+                "seq": row_version,
+                "op": OP_DELETE if deleted else OP_UPSERT,
+                "event": "cancelled" if deleted else "synced",
+                "booking_id": booking_id,
+                "booking": booking,
+                # The store records versions, not times
+                "changed_at": None
+            })
+        last = rows[-1][0] if rows else version
+        return {"cursor": f"{epoch}-{last}", "changes": changes, "has_more": has_more, "reset": False}
+
+def _parse_cursor(cursor: Optional[str], epoch: str) -> Optional[int]:
+    """Sequence number of a cursor if it belongs to epoch (None if it must resync)"""
+    if not cursor:
+        return None
+    cursor_epoch, _, seq = cursor.partition("-")
+    if not seq.isdigit():
+        raise ValueError(f"Invalid cursor '{cursor}'")
+    return int(seq) if cursor_epoch == epoch else None
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
@@ -3,9 +3,14 @@ Chat API endpoints
 """
 import os
 import sys
-from fastapi import APIRouter, HTTPException
+from typing import Optional, Tuple
+from fastapi import APIRouter, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
 from ..models.schemas import ChatMessage, ChatResponse
-from ..agent.scheduling_agent import SchedulingAgent
+from .admission import (
+    PRIORITY_DEFAULT, PRIORITY_MID_BOOKING, AdmissionRejected, chat_admission,
+    check_client_rate, check_conversation_rate
+)
 import uuid
 
 router = APIRouter()
@@ -15,6 +20,8 @@ def get_agent():
     """Get or create agent instance (lazy initialization)"""
     global _agent_instance
     if _agent_instance is None:
+        # Imported on first use so workers that never chat don't load the LLM stack
+        from ..agent.scheduling_agent import SchedulingAgent
         try:
             _agent_instance = SchedulingAgent()
         except ValueError as e:
@@ -24,25 +31,66 @@ def get_agent():
             )
     return _agent_instance
 
+def _client_id(request: Request) -> str:
+    """
+    Rate-limit key: the caller's address, never a value the caller chooses
+    (behind a reverse proxy, run uvicorn with --proxy-headers so this is the real client)
+    """
+    return request.client.host if request.client else "unknown"
+
+def _conversation_key(agent, client_id: str, conversation_id: Optional[str]) -> str:
+    """
+    Conversation rate-limit key; new or unknown conversation IDs all share one
+    bucket per client, so a fresh ID doesn't come with a fresh allowance
+    """
+    if conversation_id and conversation_id in agent.conversations:
+        return conversation_id
+    return f"{client_id}:new"
+
+def _admission(agent, client_id: str, conversation_id: Optional[str]) -> Tuple[str, int]:
+    """
+    Conversation rate-limit key and queue priority for a chat turn
+
+    Reads and replays the stored conversation, so call it off the event loop.
+    """
+    conversation_key = _conversation_key(agent, client_id, conversation_id)
+    # Turns that are collecting details for a booking go ahead of new conversations
+    mid_booking = conversation_key == conversation_id and agent.is_mid_booking(conversation_id)
+    return conversation_key, PRIORITY_MID_BOOKING if mid_booking else PRIORITY_DEFAULT
+
 @router.post("/chat", response_model=ChatResponse)
-async def chat(message: ChatMessage):
+async def chat(message: ChatMessage, request: Request):
     """
     Main chat endpoint for patient interaction
     """
     try:
+        client_id = _client_id(request)
+        check_client_rate(client_id)
         agent = get_agent() 
+        conversation_key, priority = await run_in_threadpool(_admission, agent, client_id, message.conversation_id)
+        check_conversation_rate(conversation_key)
         conversation_id = message.conversation_id or str(uuid.uuid4())
         
-        result = agent.process_message(
-            message.message,
-            conversation_id=conversation_id
-        )
+        async with chat_admission.slot(priority):
+            # LLM calls block, so keep them off the event loop
+            result = await run_in_threadpool(
+                agent.process_message,
+                message.message,
+                conversation_id=conversation_id
+            )
         
         return ChatResponse(
             response=result["response"],
             conversation_id=result["conversation_id"],
             intent=result.get("intent"),
-            requires_info=result.get("requires_info")
+            requires_info=result.get("requires_info"),
+            booking_details=result.get("booking_details")
+        )
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail=f"{e.reason}, please retry in {e.retry_after}s",
+            headers={"Retry-After": str(e.retry_after)}
         )
     except HTTPException:
         raise
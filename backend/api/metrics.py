@@ -0,0 +1,16 @@
+"""
+Prometheus metrics endpoint
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from ..monitoring.metrics import BOOKINGS, registry
+from .calendly_integration import calendly_api
+
+router = APIRouter()
+
+BOOKINGS.set_function(lambda: len(calendly_api.bookings))
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Metrics in Prometheus text format"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
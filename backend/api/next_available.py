@@ -0,0 +1,122 @@
+"""
+Next-available index
+Keeps the free start times of every day in the booking horizon per
+appointment type, plus sorted lists of the days with a free start in each
+time-of-day bucket, so "when is the next available X?" is a binary search
+instead of a day-by-day scan. Days are recomputed lazily after a booking
+change touches them and as the horizon rolls forward.
+"""
+import bisect
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from ..clinic_clock import clinic_today
+
+ANY_TIME = "any"
+# Slot start buckets, minutes from midnight (same cutoffs as the agent's morning/afternoon/evening)
+TIME_BUCKETS = {
+    "morning": (0, 12 * 60),
+    "afternoon": (12 * 60, 17 * 60),
+    "evening": (17 * 60, 24 * 60)
+}
+
+HORIZON_DAYS = int(os.getenv("NEXT_AVAILABLE_HORIZON_DAYS", 60))
+
+class NextAvailableIndex:
+    def __init__(
+        self,
+        slot_starts: Callable[[str], range],
+        fits: Callable[[int, int, str], bool],
+        appointment_types: List[str],
+        horizon_days: int = HORIZON_DAYS
+    ):
+        """
+        Args:
+            slot_starts: Candidate start minutes of a day for an appointment type
+            fits: Whether (day, start, appointment_type) has capacity, ignoring holds
+            appointment_types: Types to index
+            horizon_days: Days from today that are indexed
+        """
+        self._slot_starts = slot_starts
+        self._fits = fits
+        self.appointment_types = list(appointment_types)
+        self.horizon_days = horizon_days
+        # appointment type -> day -> free starts
+        self._starts: Dict[str, Dict[int, Tuple[int, ...]]] = {t: {} for t in self.appointment_types}
+        # (appointment type, bucket) -> sorted days with a free start in the bucket
+        self._free_days: Dict[Tuple[str, str], List[int]] = {
+            (t, bucket): [] for t in self.appointment_types for bucket in (ANY_TIME, *TIME_BUCKETS)
+        }
+        self._dirty: Set[int] = set()
+        self._today: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self, day: int):
+        """A booking on this day changed"""
+        with self._lock:
+            self._dirty.add(day)
+
+    def earliest(
+        self,
+        appointment_type: str,
+        bucket: str = ANY_TIME,
+        is_held: Optional[Callable[[int, int], bool]] = None
+    ) -> Optional[Tuple[int, int]]:
+        """
+        (day ordinal, start minute) of the earliest free slot in the horizon, or None
+
+        Args:
+            appointment_type: Type of appointment
+            bucket: "any", "morning", "afternoon" or "evening"
+            is_held: Whether (day, start) is reserved by a hold; held starts are skipped
+        """
+        low, high = TIME_BUCKETS.get(bucket, (0, 24 * 60))
+        with self._lock:
+            self._refresh()
+            days = self._free_days[(appointment_type, bucket)]
+            for position in range(bisect.bisect_left(days, self._today), len(days)):
+                day = days[position]
+                for start in self._starts[appointment_type][day]:
+                    if low <= start < high and not (is_held and is_held(day, start)):
+                        return day, start
+        return None
+
+    def _refresh(self):
+        """Roll the horizon forward and recompute days touched since the last query"""
+        today = clinic_today().toordinal()
+        if today != self._today:
+            last = today + self.horizon_days
+            start = today if self._today is None else max(today, self._today + self.horizon_days)
+            self._dirty.update(range(start, last))
+            for days in self._starts.values():
+                for day in [day for day in days if day < today]:
+                    del days[day]
+            for key, days in self._free_days.items():
+                del days[:bisect.bisect_left(days, today)]
+            self._today = today
+
+        last = self._today + self.horizon_days
+        dirty, self._dirty = self._dirty, set()
+        for day in dirty:
+            if self._today <= day < last:
+                self._compute_day(day)
+
+    def _compute_day(self, day: int):
+        for appointment_type in self.appointment_types:
+            starts = tuple(
+                start for start in self._slot_starts(appointment_type)
+                if self._fits(day, start, appointment_type)
+            )
+            self._starts[appointment_type][day] = starts
+            self._set_free(appointment_type, ANY_TIME, day, bool(starts))
+            for bucket, (low, high) in TIME_BUCKETS.items():
+                self._set_free(appointment_type, bucket, day, any(low <= start < high for start in starts))
+
+    def _set_free(self, appointment_type: str, bucket: str, day: int, free: bool):
+        days = self._free_days[(appointment_type, bucket)]
+        position = bisect.bisect_left(days, day)
+        present = position < len(days) and days[position] == day
+        if free and not present:
+            days.insert(position, day)
+        elif not free and present:
+            del days[position]
@@ -0,0 +1,50 @@
+"""
+Recurring appointment series endpoints
+"""
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from ..models.schemas import SeriesBookingRequest, SeriesUpdateRequest
+from ..tools.series_tool import SeriesConflictError, series_manager
+
+router = APIRouter()
+
+@router.post("")
+async def create_series(request: SeriesBookingRequest):
+    """Book a recurring series of appointments"""
+    try:
+        return series_manager.book_series(request)
+    except SeriesConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/{series_id}")
+async def get_series(series_id: str):
+    """Get a series and its occurrences"""
+    series = series_manager.get_series(series_id)
+    if series is None:
+        raise HTTPException(status_code=404, detail=f"Series {series_id} not found")
+    return series
+
+@router.patch("/{series_id}")
+async def update_series(series_id: str, update: SeriesUpdateRequest):
+    """Move or retype all upcoming occurrences of a series"""
+    try:
+        return series_manager.update_series(series_id, update)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Series {series_id} not found")
+    except SeriesConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.delete("/{series_id}")
+async def cancel_series(
+    series_id: str,
+    from_date: Optional[str] = Query(None, description="Cancel occurrences on or after this date (defaults to today)")
+):
+    """Cancel upcoming occurrences of a series"""
+    try:
+        return series_manager.cancel_series(series_id, from_date)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Series {series_id} not found")
@@ -0,0 +1,46 @@
+"""
+Waitlist endpoints
+"""
+from fastapi import APIRouter, HTTPException
+from ..models.schemas import WaitlistRequest, WaitlistEntry
+from ..tools.waitlist_tool import waitlist_manager
+
+router = APIRouter()
+
+@router.post("", response_model=WaitlistEntry)
+async def join_waitlist(request: WaitlistRequest):
+    """Add a patient to the waitlist"""
+    try:
+        return waitlist_manager.add_entry(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/{entry_id}", response_model=WaitlistEntry)
+async def get_waitlist_entry(entry_id: str):
+    """Get a waitlist entry, including any slot currently held for it"""
+    entry = waitlist_manager.get_entry(entry_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Waitlist entry {entry_id} not found")
+    return entry
+
+@router.delete("/{entry_id}")
+async def leave_waitlist(entry_id: str):
+    """Remove a patient from the waitlist"""
+    if not waitlist_manager.remove_entry(entry_id):
+        raise HTTPException(status_code=404, detail=f"Waitlist entry {entry_id} not found")
+    return {"entry_id": entry_id, "status": "removed"}
+
+@router.post("/holds/{hold_id}/confirm")
+async def confirm_hold(hold_id: str):
+    """Book the slot held for a waitlisted patient"""
+    try:
+        return waitlist_manager.confirm_hold(hold_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/holds/{hold_id}/decline")
+async def decline_hold(hold_id: str):
+    """Decline a held slot so it goes to the next patient"""
+    if not waitlist_manager.decline_hold(hold_id):
+        raise HTTPException(status_code=404, detail=f"Hold {hold_id} not found or expired")
+    return {"hold_id": hold_id, "status": "declined"}
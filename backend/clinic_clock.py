@@ -0,0 +1,32 @@
+"""
+The clinic's local date
+Past days, the booking horizon and relative phrases like "tomorrow" are all
+judged in the clinic's timezone (CLINIC_TIMEZONE, else the "timezone" of the
+doctor schedule), so a server running in UTC agrees with the front desk.
+"""
+import json
+import os
+from datetime import date, datetime
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+SCHEDULE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "doctor_schedule.json")
+
+def _load_timezone() -> str:
+    if os.getenv("CLINIC_TIMEZONE"):
+        return os.getenv("CLINIC_TIMEZONE")
+    try:
+        with open(SCHEDULE_PATH) as f:
+            return json.load(f).get("timezone", "UTC")
+    except (OSError, ValueError):
+        return "UTC"
+
+CLINIC_TIMEZONE = _load_timezone()
+
+def clinic_today() -> date:
+    """Today's date in the clinic's timezone"""
+    return datetime.now(_zone()).date()
+
+@lru_cache(maxsize=1)
+def _zone() -> ZoneInfo:
+    return ZoneInfo(CLINIC_TIMEZONE)
@@ -0,0 +1,12 @@
+"""
+Optional subsystems, switched off with environment variables so workers that
+only serve the calendar API don't load them:
+    ENABLE_AGENT=false  - no /api/chat endpoints (and no RAG)
+    ENABLE_RAG=false    - agent answers without FAQ retrieval
+"""
+import os
+
+def is_enabled(feature: str) -> bool:
+    """Whether ENABLE_<FEATURE> is on (default true)"""
+    value = os.getenv(f"ENABLE_{feature.upper()}", "true")
+    return value.strip().lower() not in ("0", "false", "no", "off")
@@ -0,0 +1,147 @@
+"""
+Record/replay of LLM calls for offline, deterministic testing
+Record mode stores each request fingerprint with the response, token usage and
+observed latency in a JSONL cassette; replay mode serves them without network,
+optionally sleeping to simulate the provider's latency.
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Parts of prompts that change from day to day and must not break fingerprints
+_VOLATILE_PATTERNS = [
+    re.compile(r"\b\d{4}-\d{2}-\d{2}\b"),
+    re.compile(r"\b(?:Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday), [A-Z][a-z]+ \d{2}, \d{4}\b"),
+]
+
+FINGERPRINT_FIELDS = ("model", "messages", "temperature", "max_tokens", "tools", "response_format")
+
+class CassetteMissError(LookupError):
+    """No recording matches a request in replay mode"""
+
+def _normalize(text: str) -> str:
+    for pattern in _VOLATILE_PATTERNS:
+        text = pattern.sub("<date>", text)
+    return text
+
+def fingerprint(request: Dict[str, Any]) -> str:
+    """Stable hash of the parts of a request that determine the response"""
+    relevant = {key: request[key] for key in FINGERPRINT_FIELDS if key in request}
+    canonical = _normalize(json.dumps(relevant, sort_keys=True, default=str))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+class LatencyModel:
+    """
+    How long replayed calls take:
+        "none"                  - return immediately
+        "recorded"              - the latency observed when recording
+        "scale:0.5"             - recorded latency times a factor
+        "fixed:0.3"             - constant seconds
+        "lognormal:0.8,0.5"     - lognormal with median seconds and sigma
+    """
+
+    def __init__(self, spec: str = "recorded", seed: Optional[int] = None):
+        self.spec = spec
+        self.kind, _, params = spec.partition(":")
+        self.params = [float(value) for value in params.split(",") if value]
+        self._random = random.Random(seed)
+        if self.kind not in ("none", "recorded", "scale", "fixed", "lognormal"):
+            raise ValueError(f"Unknown latency model '{spec}'")
+
+    def sample(self, recorded: float) -> float:
+        if self.kind == "none":
+            return 0.0
+        if self.kind == "recorded":
+            return recorded
+        if self.kind == "scale":
+            return recorded * self.params[0]
+        if self.kind == "fixed":
+            return self.params[0]
+        median, sigma = self.params
+        return self._random.lognormvariate(0, sigma) * median
+
+class Cassette:
+    def __init__(self, path: str):
+        self.path = path
+        self.recordings: Dict[str, List[Dict]] = {}
+        self._cursor: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.recordings.setdefault(entry["fingerprint"], []).append(entry)
+
+    def record(self, request: Dict[str, Any], response: Any, latency: float):
+        """Append one interaction to the cassette"""
+        data = response.model_dump() if hasattr(response, "model_dump") else response
+        entry = {
+            "fingerprint": fingerprint(request),
+            "request": {key: request[key] for key in FINGERPRINT_FIELDS if key in request},
+            "response": data,
+            "usage": data.get("usage"),
+            "latency": latency,
+            "recorded_at": time.time()
+        }
+        with self._lock:
+            self.recordings.setdefault(entry["fingerprint"], []).append(entry)
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+
+    def lookup(self, request: Dict[str, Any]) -> Dict:
+        """
+        Next recording for a request; repeated requests cycle through all
+        recordings with the same fingerprint
+        """
+        key = fingerprint(request)
+        with self._lock:
+            entries = self.recordings.get(key)
+            if not entries:
+                raise CassetteMissError(f"No recording for request {key[:12]} in {self.path}")
+            index = self._cursor.get(key, 0)
+            self._cursor[key] = index + 1
+            return entries[index % len(entries)]
+
+class RecordReplay:
+    """Wraps a request function according to the cassette mode"""
+
+    def __init__(self, mode: str, cassette: Cassette, latency: Optional[LatencyModel] = None):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode '{mode}'")
+        self.mode = mode
+        self.cassette = cassette
+        self.latency = latency or LatencyModel()
+
+    def replay(self, request: Dict[str, Any]) -> Any:
+        from openai.types.chat import ChatCompletion
+        entry = self.cassette.lookup(request)
+        delay = self.latency.sample(entry.get("latency") or 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        return ChatCompletion.model_validate(entry["response"])
+
+    def record(self, request: Dict[str, Any], send) -> Any:
+        started = time.perf_counter()
+        response = send()
+        self.cassette.record(request, response, time.perf_counter() - started)
+        return response
+
+def from_env() -> Optional[RecordReplay]:
+    """Build from LLM_CASSETTE_MODE / LLM_CASSETTE / LLM_REPLAY_LATENCY, or None when off"""
+    mode = os.getenv("LLM_CASSETTE_MODE", "off")
+    if mode == "off":
+        return None
+    return RecordReplay(
+        mode,
+        Cassette(os.getenv("LLM_CASSETTE", "./data/llm_cassette.jsonl")),
+        LatencyModel(os.getenv("LLM_REPLAY_LATENCY", "recorded"))
+    )
@@ -0,0 +1,230 @@
+"""
+Shared LLM gateway
+One pooled OpenAI client for the whole process with tuned timeouts, jittered
+retries on 429/5xx, optional request hedging and a circuit breaker that fails
+fast when the provider is degraded so callers can use their fallback message.
+"""
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Any, Callable, Optional
+from ..monitoring.metrics import ERRORS, record_llm_call
+from .cassette import RecordReplay, from_env as cassette_from_env
+
+if TYPE_CHECKING:
+    # openai and httpx are imported when the first gateway is created
+    from openai import OpenAI
+
+class CircuitOpenError(Exception):
+    """Raised without calling the provider while the circuit is open"""
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures, then lets a single
+    trial request through once reset_timeout has passed (half-open).
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+def is_retryable(error: Exception) -> bool:
+    """Rate limits, server errors, timeouts and connection errors are worth retrying"""
+    from openai import APIConnectionError, APIStatusError, APITimeoutError
+    if isinstance(error, (APIConnectionError, APITimeoutError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds requested by a Retry-After header, if any"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+class LLMGateway:
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        connect_timeout: float = 3.0,
+        read_timeout: float = 30.0,
+        max_connections: int = 50,
+        hedge_after: Optional[float] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        record_replay: Optional[RecordReplay] = None
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_after = hedge_after
+        self.breaker = breaker or CircuitBreaker()
+        self.record_replay = record_replay
+
+        import httpx
+        from openai import OpenAI
+        self.http_client = httpx.Client(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout, pool=connect_timeout)
+        )
+        # Retries are handled here, not by the SDK, so they go through the breaker
+        self.client = OpenAI(api_key=api_key, base_url=base_url, http_client=self.http_client, max_retries=0)
+        self._executor = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix="llm-hedge")
+
+    def chat_completion(self, call: str = "default", **kwargs) -> Any:
+        """
+        Create a chat completion (same keyword arguments as the OpenAI SDK)
+
+        Args:
+            call: Name of the call site, used to label metrics
+
+        Raises:
+            CircuitOpenError: provider is considered down, use the fallback
+            Exception: the last provider error once retries are exhausted
+        """
+        model = kwargs.get("model", "")
+        started = time.perf_counter()
+        send = lambda: self.call(lambda client: client.chat.completions.create(**kwargs))
+        try:
+            if self.record_replay is None:
+                response = send()
+            elif self.record_replay.mode == "replay":
+                response = self.record_replay.replay(kwargs)
+                record_llm_call(call, model, time.perf_counter() - started, response, outcome="replay")
+                return response
+            else:
+                response = self.record_replay.record(kwargs, send)
+        except CircuitOpenError:
+            record_llm_call(call, model, time.perf_counter() - started, outcome="circuit_open")
+            ERRORS.inc(component="llm_circuit_open")
+            raise
+        except Exception:
+            record_llm_call(call, model, time.perf_counter() - started, outcome="error")
+            ERRORS.inc(component="llm")
+            raise
+        record_llm_call(call, model, time.perf_counter() - started, response)
+        return response
+
+    def call(self, request: Callable[["OpenAI"], Any]) -> Any:
+        """
+        Run a request against the pooled client with retries, hedging and the breaker
+
+        The breaker sees one outcome per call, however many attempts it took.
+        A Retry-After longer than backoff_max is not waited out: the call fails
+        at once so the caller can use its fallback.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError("LLM provider circuit is open")
+        attempt = 0
+        while True:
+            try:
+                result = self._hedged(request) if self.hedge_after else request(self.client)
+            except Exception as e:
+                if not is_retryable(e):
+                    # The provider answered (e.g. a 400), so it is up; this also ends a half-open trial
+                    self.breaker.record_success()
+                    raise
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = min(self.backoff_max, self.backoff_base * 2 ** attempt) * random.random()
+                if attempt >= self.max_retries or delay > self.backoff_max:
+                    self.breaker.record_failure()
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            self.breaker.record_success()
+            return result
+
+    def _hedged(self, request: Callable[["OpenAI"], Any]) -> Any:
+        """Send a duplicate request if the first hasn't answered within hedge_after"""
+        first = self._executor.submit(request, self.client)
+        done, _ = wait([first], timeout=self.hedge_after)
+        if done:
+            return first.result()
+
+        second = self._executor.submit(request, self.client)
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.http_client.close()
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+def get_llm_gateway() -> LLMGateway:
+    """Get or create the process-wide gateway (configured from the environment)"""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                record_replay = cassette_from_env()
+                api_key = os.getenv("OPENAI_API_KEY")
+                if not api_key and record_replay and record_replay.mode == "replay":
+                    # Replay never reaches the provider
+                    api_key = "replay"
+                if not api_key:
+                    raise ValueError(
+                        "OPENAI_API_KEY not set. Please set it in your .env file or environment variables."
+                    )
+                hedge_after = os.getenv("LLM_HEDGE_AFTER")
+                _gateway = LLMGateway(
+                    api_key=api_key,
+                    base_url=os.getenv("OPENAI_BASE_URL") or None,
+                    max_retries=int(os.getenv("LLM_MAX_RETRIES", 2)),
+                    connect_timeout=float(os.getenv("LLM_CONNECT_TIMEOUT", 3)),
+                    read_timeout=float(os.getenv("LLM_READ_TIMEOUT", 30)),
+                    max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", 50)),
+                    hedge_after=float(hedge_after) if hedge_after else None,
+                    breaker=CircuitBreaker(
+                        failure_threshold=int(os.getenv("LLM_BREAKER_THRESHOLD", 5)),
+                        reset_timeout=float(os.getenv("LLM_BREAKER_RESET", 30))
+                    ),
+                    record_replay=record_replay
+                )
+    return _gateway
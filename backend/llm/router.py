@@ -0,0 +1,160 @@
+"""
+Model cascade routing
+Each call is classified by how much reasoning it needs: answering an FAQ from
+retrieved context and confirming offered slots go to the small model, open
+ended triage goes to the large one. A small-model reply that fails validation
+(empty, cut off, refusing, or contradicting the tool results) is retried on
+the large model.
+"""
+import json
+import os
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from ..monitoring.metrics import LLM_COST, LLM_ROUTE_CALLS, LLM_ROUTE_SECONDS
+from .gateway import CircuitOpenError
+
+ROUTE_SMALL = "small"
+ROUTE_LARGE = "large"
+
+TASK_FAQ = "faq_answer"
+TASK_CONFIRMATION = "slot_confirmation"
+TASK_TRIAGE = "triage"
+
+# Route and sampling temperature per task
+TASKS = {
+    TASK_FAQ: (ROUTE_SMALL, 0.3),
+    TASK_CONFIRMATION: (ROUTE_SMALL, 0.4),
+    TASK_TRIAGE: (ROUTE_LARGE, 0.8)
+}
+
+# USD per million (prompt, completion) tokens; LLM_PRICES='{"model": [in, out]}' adds or overrides
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4-turbo-preview": (10.00, 30.00),
+    "gpt-3.5-turbo": (0.50, 1.50)
+}
+
+# Symptoms and open questions that need the large model's judgement
+_TRIAGE_WORDS = re.compile(
+    r"\b(pain|hurts?|ache|aches|\w+aches?|fever|cough|bleed\w*|dizz\w*|rash|vomit\w*|nause\w*|breath\w*|"
+    r"chest|symptoms?|injur\w*|swell\w*|sick|worse|emergency|pregnan\w*|medication|prescription|"
+    r"which (doctor|appointment|type)|what kind|should i|not sure)\b",
+    re.IGNORECASE
+)
+_REFUSALS = re.compile(r"\b(as an ai|i('m| am) (not able|unable) to|i cannot help|i can't help)\b", re.IGNORECASE)
+
+# Longer user turns are rarely simple confirmations
+SIMPLE_TURN_WORDS = 40
+
+def _load_prices() -> Dict[str, Tuple[float, float]]:
+    prices = dict(MODEL_PRICES)
+    override = os.getenv("LLM_PRICES")
+    if override:
+        try:
+            prices.update({model: tuple(price) for model, price in json.loads(override).items()})
+        except (ValueError, TypeError) as e:
+            print(f"⚠️ Warning: Ignoring invalid LLM_PRICES: {e}")
+    return prices
+
+def classify(call: str, messages: List[Dict]) -> str:
+    """Task of a call, from its call site and the turn being answered"""
+    if call == "faq":
+        return TASK_FAQ
+    user = next((msg["content"] for msg in reversed(messages) if msg["role"] == "user"), "")
+    if _TRIAGE_WORDS.search(user) or len(user.split()) > SIMPLE_TURN_WORDS:
+        return TASK_TRIAGE
+    context = messages[-1]["content"] if messages and messages[-1]["role"] == "system" else ""
+    if "Booking progress" in context or "Available slots found" in context:
+        return TASK_CONFIRMATION
+    if "FAQ Context" in context:
+        return TASK_FAQ
+    return TASK_TRIAGE
+
+def reply_text(response: Any) -> str:
+    return (response.choices[0].message.content or "").strip()
+
+def failed_validation(response: Any, validate: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+    """Why a reply can't be used (None if it can)"""
+    text = reply_text(response)
+    if not text:
+        return "empty"
+    if getattr(response.choices[0], "finish_reason", None) == "length":
+        return "truncated"
+    if _REFUSALS.search(text):
+        return "refusal"
+    if validate is not None and not validate(text):
+        return "invalid"
+    return None
+
+class ModelRouter:
+    def __init__(self, gateway: Any, small_model: Optional[str] = None, large_model: Optional[str] = None):
+        self.gateway = gateway
+        self.large_model = large_model or os.getenv("LLM_LARGE_MODEL") or os.getenv("LLM_MODEL", "gpt-4-turbo-preview")
+        self.small_model = small_model or os.getenv("LLM_SMALL_MODEL", "gpt-4o-mini")
+        self.prices = _load_prices()
+
+    def model_for(self, route: str) -> str:
+        return self.small_model if route == ROUTE_SMALL else self.large_model
+
+    def chat_completion(
+        self,
+        call: str,
+        messages: List[Dict],
+        task: Optional[str] = None,
+        validate: Optional[Callable[[str], bool]] = None,
+        **kwargs
+    ) -> Any:
+        """
+        Complete on the model the task routes to, escalating to the large model
+        when a small-model reply fails validation
+
+        Args:
+            call: Name of the call site, used to label metrics
+            messages: Chat messages
+            task: Task class (classified from the messages if None)
+            validate: Extra check on the reply text
+            **kwargs: Passed to the gateway (temperature defaults per task)
+
+        Raises:
+            CircuitOpenError: provider is considered down, use the fallback
+        """
+        task = task or classify(call, messages)
+        route, temperature = TASKS[task]
+        kwargs.setdefault("temperature", temperature)
+        started = time.perf_counter()
+
+        if route == ROUTE_SMALL and self.small_model != self.large_model:
+            reason = None
+            try:
+                response = self._complete(call, task, ROUTE_SMALL, messages, kwargs)
+                reason = failed_validation(response, validate)
+            except CircuitOpenError:
+                raise
+            except Exception:
+                reason = "error"
+            if reason is None:
+                self._observe(task, ROUTE_SMALL, started)
+                return response
+            LLM_ROUTE_CALLS.inc(route=ROUTE_SMALL, task=task, outcome=f"escalated_{reason}")
+            route = "escalated"
+
+        response = self._complete(call, task, ROUTE_LARGE, messages, kwargs)
+        self._observe(task, route, started)
+        return response
+
+    def _complete(self, call: str, task: str, route: str, messages: List[Dict], kwargs: Dict) -> Any:
+        model = self.model_for(route)
+        response = self.gateway.chat_completion(call=call, model=model, messages=messages, **kwargs)
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            prompt_price, completion_price = self.prices.get(model, (0.0, 0.0))
+            cost = ((usage.prompt_tokens or 0) * prompt_price + (usage.completion_tokens or 0) * completion_price) / 1e6
+            LLM_COST.inc(cost, route=route, task=task, model=model)
+        return response
+
+    def _observe(self, task: str, route: str, started: float):
+        LLM_ROUTE_SECONDS.observe(time.perf_counter() - started, route=route, task=task)
+        LLM_ROUTE_CALLS.inc(route=route, task=task, outcome="ok")
@@ -0,0 +1,139 @@
+"""
+Local stub of the OpenAI chat completions API for tests and benchmarks
+
+Run with:
+    python -m backend.llm.stub_server --port 8001
+and point the app at it with OPENAI_BASE_URL=http://127.0.0.1:8001/v1
+"""
+import asyncio
+import threading
+import time
+import uuid
+from typing import List, Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+class StubState:
+    """
+    Behaviour of the stub: fixed reply, base delay, per-request delays
+    (consumed in order) and a number of initial requests that fail.
+    """
+
+    def __init__(
+        self,
+        reply: str = "Thank you! I can help you schedule an appointment.",
+        delay: float = 0.0,
+        delays: Optional[List[float]] = None,
+        fail_first: int = 0,
+        fail_status: int = 503,
+        retry_after: Optional[float] = None
+    ):
+        self.reply = reply
+        self.delay = delay
+        self.delays = list(delays or [])
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        # Sent as a Retry-After header with the failures
+        self.retry_after = retry_after
+        self.requests = 0
+        self.seen_prefixes = set()
+        self._lock = threading.Lock()
+
+    def next_request(self):
+        """Return (delay, should_fail) for the next request"""
+        with self._lock:
+            self.requests += 1
+            delay = self.delays.pop(0) if self.delays else self.delay
+            should_fail = self.fail_first > 0
+            if should_fail:
+                self.fail_first -= 1
+            return delay, should_fail
+
+    def cached_tokens(self, messages: List[dict]) -> int:
+        """Emulate provider prompt caching: a repeated first message counts as cached"""
+        if not messages:
+            return 0
+        prefix = str(messages[0].get("content", ""))
+        with self._lock:
+            hit = prefix in self.seen_prefixes
+            self.seen_prefixes.add(prefix)
+        return len(prefix.split()) if hit else 0
+
+def create_app(state: Optional[StubState] = None) -> FastAPI:
+    state = state or StubState()
+    app = FastAPI(title="Stub LLM")
+    app.state.stub = state
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        delay, should_fail = state.next_request()
+        if delay:
+            await asyncio.sleep(delay)
+        if should_fail:
+            return JSONResponse(
+                status_code=state.fail_status,
+                content={"error": {"message": "stub failure", "type": "server_error"}},
+                headers={"Retry-After": str(state.retry_after)} if state.retry_after is not None else None
+            )
+
+        prompt_tokens = sum(len(str(message.get("content", "")).split()) for message in body.get("messages", []))
+        completion_tokens = len(state.reply.split())
+        cached_tokens = state.cached_tokens(body.get("messages", []))
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub-model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": state.reply},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens}
+            }
+        }
+
+    return app
+
+class StubServer:
+    """Runs the stub app with uvicorn on a background thread"""
+
+    def __init__(self, state: Optional[StubState] = None, host: str = "127.0.0.1", port: int = 0):
+        import uvicorn
+        self.state = state or StubState()
+        config = uvicorn.Config(create_app(self.state), host=host, port=port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.servers[0].sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StubServer":
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(5)
+
+if __name__ == "__main__":
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Stub OpenAI chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before each reply")
+    parser.add_argument("--reply", default=StubState().reply)
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(StubState(reply=args.reply, delay=args.delay)), host=args.host, port=args.port)
@@ -3,7 +3,7 @@ Main FastAPI application for Medical Appointment Scheduling Agent
 """
 import os
 import sys
-import uvicorn
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
@@ -11,9 +11,14 @@ from dotenv import load_dotenv
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from backend.api import chat
 from backend.api.calendly_integration import router as calendly_router
-from backend.rag.faq_rag import FAQRAG
+from backend.api.bulk import router as bulk_router
+from backend.api.waitlist import router as waitlist_router
+from backend.api.series import router as series_router
+from backend.api.metrics import router as metrics_router
+from backend.api.analytics import router as analytics_router
+from backend.monitoring.middleware import RequestIDMiddleware
+from backend.features import is_enabled
 
 # Load environment variables
 load_dotenv()
@@ -32,18 +37,30 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
+app.add_middleware(RequestIDMiddleware)
 
 # Include routers
-app.include_router(chat.router, prefix="/api", tags=["chat"])
+if is_enabled("agent"):
+    from backend.api import chat
+    app.include_router(chat.router, prefix="/api", tags=["chat"])
 app.include_router(calendly_router, prefix="/api/calendly", tags=["calendly"])
+app.include_router(bulk_router, prefix="/api/calendly", tags=["bulk"])
+app.include_router(waitlist_router, prefix="/api/waitlist", tags=["waitlist"])
+app.include_router(series_router, prefix="/api/calendly/series", tags=["series"])
+app.include_router(analytics_router, prefix="/api/analytics", tags=["analytics"])
+app.include_router(metrics_router, tags=["monitoring"])
 
 # Initialize RAG system on startup
 @app.on_event("startup")
 async def startup_event():
     """Initialize RAG system and load clinic information"""
+    if not (is_enabled("agent") and is_enabled("rag")):
+        return
     try:
-        faq_rag = FAQRAG()
+        from backend.rag.faq_rag import get_faq_rag
+        faq_rag = get_faq_rag()
         # Get absolute path to clinic_info.json
         base_dir = os.path.dirname(os.path.dirname(__file__))
         clinic_info_path = os.path.join(base_dir, "data", "clinic_info.json")
@@ -57,6 +74,73 @@ async def startup_event():
         import traceback
         traceback.print_exc()
 
+@app.on_event("startup")
+async def load_existing_appointments_event():
+    """Load existing appointments from doctor_schedule.json"""
+    from backend.tools.bulk_tool import load_existing_appointments
+    base_dir = os.path.dirname(os.path.dirname(__file__))
+    schedule_path = os.path.join(base_dir, "data", "doctor_schedule.json")
+    if not os.path.exists(schedule_path):
+        return
+    try:
+        summary = load_existing_appointments(schedule_path)
+        print(f"✅ Loaded {summary['imported']} existing appointments ({summary['failed']} skipped)")
+    except Exception as e:
+        print(f"⚠️ Warning: Could not load existing appointments: {e}")
+
+@app.on_event("startup")
+async def start_notifications():
+    """Send cancellation and reschedule notices for calendar changes"""
+    from backend.api.calendly_integration import calendly_api
+    from backend.notifications.queue import booking_event_listener, notification_queue
+    calendly_api.add_listener(booking_event_listener)
+    notification_queue.start()
+
+@app.on_event("shutdown")
+async def stop_notifications():
+    """Stop notification workers; persisted jobs resume on next start"""
+    from backend.notifications.queue import notification_queue
+    notification_queue.stop()
+
+@app.on_event("shutdown")
+async def close_booking_store():
+    """Make pending journal entries durable before exit"""
+    from backend.api.calendly_integration import calendly_api
+    calendly_api.store.close()
+
+@app.on_event("startup")
+async def start_waitlist_expiry():
+    """Periodically release expired waitlist holds so their slots are re-offered"""
+    from backend.tools.waitlist_tool import waitlist_manager
+
+    async def expire_loop():
+        while True:
+            await asyncio.sleep(30)
+            try:
+                waitlist_manager.expire_holds()
+            except Exception as e:
+                print(f"⚠️ Warning: Waitlist hold expiry failed: {e}")
+
+    asyncio.create_task(expire_loop())
+
+@app.on_event("startup")
+async def start_archiving():
+    """Move past bookings to the cold archive so the hot set stays bounded by the booking horizon"""
+    from backend.api.calendly_integration import calendly_api
+    interval = float(os.getenv("ARCHIVE_INTERVAL_MINUTES", 60)) * 60
+
+    async def archive_loop():
+        while True:
+            try:
+                moved = await asyncio.to_thread(calendly_api.archive_past)
+                if moved:
+                    print(f"✅ Archived {moved} past bookings")
+            except Exception as e:
+                print(f"⚠️ Warning: Archiving past bookings failed: {e}")
+            await asyncio.sleep(interval)
+
+    asyncio.create_task(archive_loop())
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -66,7 +150,18 @@ async def root():
         "endpoints": {
             "chat": "/api/chat",
             "calendly_availability": "/api/calendly/availability",
-            "calendly_book": "/api/calendly/book"
+            "calendly_book": "/api/calendly/book",
+            "calendly_import": "/api/calendly/import",
+            "calendly_export": "/api/calendly/export",
+            "calendly_series": "/api/calendly/series",
+            "calendly_occupancy": "/api/calendly/occupancy",
+            "calendly_next_available": "/api/calendly/next-available",
+            "calendly_changes": "/api/calendly/changes",
+            "analytics_heatmap": "/api/analytics/heatmap",
+            "analytics_lead_times": "/api/analytics/lead-times",
+            "analytics_demand": "/api/analytics/demand",
+            "waitlist": "/api/waitlist",
+            "metrics": "/metrics"
         }
     }
 
@@ -76,6 +171,7 @@ async def health_check():
     return {"status": "healthy"}
 
 if __name__ == "__main__":
+    import uvicorn
     port = int(os.getenv("BACKEND_PORT", 8000))
     uvicorn.run(app, host="0.0.0.0", port=port, reload=True)
 
@@ -0,0 +1,129 @@
+"""
+Compact in-memory representation of bookings
+Dates are stored as day ordinals and times as minutes from midnight, so the
+scheduler compares integers instead of reparsing strings. The public dict
+and Pydantic shapes are produced only at the API boundary.
+"""
+import sys
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Dict, Optional
+
+@lru_cache(maxsize=4096)
+def parse_date(value: str) -> int:
+    """'YYYY-MM-DD' -> day ordinal"""
+    return date.fromisoformat(value).toordinal()
+
+@lru_cache(maxsize=4096)
+def format_date(day: int) -> str:
+    """Day ordinal -> 'YYYY-MM-DD'"""
+    return date.fromordinal(day).isoformat()
+
+@lru_cache(maxsize=1440)
+def parse_time(value: str) -> int:
+    """'HH:MM' -> minutes from midnight"""
+    hour, minute = value.split(":")
+    return int(hour) * 60 + int(minute)
+
+@lru_cache(maxsize=1440)
+def format_time(minute: int) -> str:
+    """Minutes from midnight -> 'HH:MM'"""
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+def minute_stamp(moment: datetime) -> int:
+    """Datetime -> minutes since day ordinal 0, comparable with day * 1440 + start"""
+    return moment.toordinal() * 1440 + moment.hour * 60 + moment.minute
+
+def format_stamp(stamp: int) -> str:
+    """Minute stamp -> 'YYYY-MM-DDTHH:MM'"""
+    return f"{format_date(stamp // 1440)}T{format_time(stamp % 1440)}"
+
+def parse_stamp(value: str) -> int:
+    """ISO datetime -> minute stamp"""
+    return minute_stamp(datetime.fromisoformat(value))
+
+class BookingRecord:
+    """One booking; well under half the memory of the equivalent nested dicts"""
+
+    __slots__ = (
+        "booking_id", "appointment_type", "day", "start", "duration",
+        "patient_name", "patient_email", "patient_phone", "reason", "status", "series_id", "created"
+    )
+
+    def __init__(
+        self,
+        booking_id: str,
+        appointment_type: str,
+        day: int,
+        start: int,
+        duration: int,
+        patient_name: str,
+        patient_email: str,
+        patient_phone: str,
+        reason: Optional[str] = None,
+        status: str = "confirmed",
+        series_id: Optional[str] = None,
+        created: Optional[int] = None
+    ):
+        self.booking_id = booking_id
+        # Few distinct values, so share one string object per type/status
+        self.appointment_type = sys.intern(appointment_type)
+        self.day = day
+        self.start = start
+        self.duration = duration
+        self.patient_name = patient_name
+        self.patient_email = patient_email
+        self.patient_phone = patient_phone
+        self.reason = reason
+        self.status = sys.intern(status)
+        self.series_id = series_id
+        # When the booking was made, as a minute stamp (None for bookings from before it was recorded)
+        self.created = created
+
+    @property
+    def end(self) -> int:
+        return self.start + self.duration
+
+    @property
+    def date(self) -> str:
+        return format_date(self.day)
+
+    @property
+    def start_time(self) -> str:
+        return format_time(self.start)
+
+    def to_dict(self) -> Dict:
+        """Public booking details (the shape returned by the API and given to listeners)"""
+        details = {
+            "booking_id": self.booking_id,
+            "appointment_type": self.appointment_type,
+            "date": format_date(self.day),
+            "start_time": format_time(self.start),
+            "patient": {"name": self.patient_name, "email": self.patient_email, "phone": self.patient_phone},
+            "reason": self.reason,
+            "duration_minutes": self.duration,
+            "status": self.status
+        }
+        if self.series_id:
+            details["series_id"] = self.series_id
+        if self.created is not None:
+            details["created_at"] = format_stamp(self.created)
+        return details
+
+    @classmethod
+    def from_dict(cls, details: Dict) -> "BookingRecord":
+        patient = details.get("patient", {})
+        return cls(
+            booking_id=details["booking_id"],
+            appointment_type=details["appointment_type"],
+            day=parse_date(details["date"]),
+            start=parse_time(details["start_time"]),
+            duration=details["duration_minutes"],
+            patient_name=patient.get("name"),
+            patient_email=patient.get("email"),
+            patient_phone=patient.get("phone"),
+            reason=details.get("reason"),
+            status=details.get("status", "confirmed"),
+            series_id=details.get("series_id"),
+            created=parse_stamp(details["created_at"]) if details.get("created_at") else None
+        )
@@ -24,6 +24,7 @@ class BookingRequest(BaseModel):
     start_time: str
     patient: PatientInfo
     reason: Optional[str] = None
+    hold_id: Optional[str] = None
 
 class BookingResponse(BaseModel):
     booking_id: str
@@ -40,4 +41,39 @@ class ChatResponse(BaseModel):
     conversation_id: str
     intent: Optional[str] = None
     requires_info: Optional[dict] = None
+    booking_details: Optional[dict] = None
 
+
+
+class WaitlistRequest(BaseModel):
+    appointment_type: AppointmentType
+    patient: PatientInfo
+    start_date: str
+    end_date: str
+    time_preference: Optional[str] = None
+    reason: Optional[str] = None
+
+class WaitlistEntry(BaseModel):
+    entry_id: str
+    appointment_type: AppointmentType
+    patient: PatientInfo
+    start_date: str
+    end_date: str
+    time_preference: Optional[str] = None
+    reason: Optional[str] = None
+    status: str
+    hold: Optional[dict] = None
+
+class SeriesBookingRequest(BaseModel):
+    appointment_type: AppointmentType
+    start_date: str
+    start_time: str
+    rrule: str
+    patient: PatientInfo
+    reason: Optional[str] = None
+    mode: Literal["all_or_nothing", "best_effort"] = "all_or_nothing"
+
+class SeriesUpdateRequest(BaseModel):
+    start_time: Optional[str] = None
+    appointment_type: Optional[AppointmentType] = None
+    from_date: Optional[str] = None
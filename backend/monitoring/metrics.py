@@ -0,0 +1,241 @@
+"""
+Prometheus metrics without external dependencies
+Counters, gauges and histograms rendered in the Prometheus text format.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# ID of the HTTP request being served, set by RequestIDMiddleware
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+class Gauge(_Metric):
+    """Gauge that is either set directly or read from a callback at scrape time"""
+    type_name = "gauge"
+
+    def __init__(self, *args, callback: Optional[Callable[[], float]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self.callback = callback
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def set_function(self, callback: Callable[[], float]):
+        self.callback = callback
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        if self.callback is not None:
+            try:
+                lines.append(f"{self.name} {float(self.callback())}")
+            except Exception:
+                pass
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, *args, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # key -> (bucket counts, sum, count)
+        self._values: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+STAGE_SECONDS = registry.register(Histogram(
+    "agent_stage_seconds", "Time spent in each stage of a chat turn", ("stage",)
+))
+LLM_REQUEST_SECONDS = registry.register(Histogram(
+    "llm_request_seconds", "Latency of LLM calls", ("call", "model", "outcome")
+))
+LLM_TOKENS = registry.register(Counter(
+    "llm_tokens_total", "Tokens used by LLM calls", ("call", "model", "kind")
+))
+LLM_PROMPT_TOKENS = registry.register(Counter(
+    "llm_prompt_tokens_total", "Prompt tokens by whether the provider served them from its prompt cache",
+    ("call", "model", "cache")
+))
+LLM_ROUTE_SECONDS = registry.register(Histogram(
+    "llm_route_seconds", "Latency of routed LLM calls including escalation (route: small, large or escalated)",
+    ("route", "task")
+))
+LLM_ROUTE_CALLS = registry.register(Counter(
+    "llm_route_calls_total", "Routed LLM calls by outcome; escalated_* counts small-model replies retried on the large model",
+    ("route", "task", "outcome")
+))
+LLM_COST = registry.register(Counter(
+    "llm_cost_usd_total", "Estimated LLM spend from token usage and LLM_PRICES", ("route", "task", "model")
+))
+INTENTS = registry.register(Counter(
+    "agent_intents_total", "Detected intents", ("intent",)
+))
+FAST_PATHS = registry.register(Counter(
+    "agent_fast_paths_total", "Turns that skipped work on a fast path", ("path",)
+))
+ERRORS = registry.register(Counter(
+    "errors_total", "Errors by component", ("component",)
+))
+HTTP_REQUESTS = registry.register(Counter(
+    "http_requests_total", "HTTP requests", ("method", "route", "status")
+))
+HTTP_REQUEST_SECONDS = registry.register(Histogram(
+    "http_request_seconds", "HTTP request latency", ("method", "route")
+))
+CONVERSATIONS = registry.register(Gauge(
+    "agent_conversations", "Conversations held in the conversation store"
+))
+BOOKINGS = registry.register(Gauge(
+    "calendly_bookings", "Bookings held by the scheduler (hot tier: today onward)"
+))
+ARCHIVED_BOOKINGS = registry.register(Counter(
+    "calendly_archived_bookings_total", "Past bookings moved to the cold archive"
+))
+ADMISSIONS = registry.register(Counter(
+    "chat_admissions_total", "Chat admission decisions", ("outcome",)
+))
+CHAT_IN_FLIGHT = registry.register(Gauge(
+    "chat_in_flight", "Chat turns currently being processed"
+))
+CHAT_QUEUE_DEPTH = registry.register(Gauge(
+    "chat_queue_depth", "Chat turns waiting for capacity"
+))
+COALESCED = registry.register(Counter(
+    "singleflight_calls_total", "Coalesced lookups: leaders ran the work, followers shared its result", ("name", "role")
+))
+
+@contextmanager
+def stage_timer(stage: str):
+    """Time one stage of a chat turn"""
+    with STAGE_SECONDS.time(stage=stage):
+        yield
+
+def record_llm_call(call: str, model: str, seconds: float, response=None, outcome: str = "ok"):
+    """Record latency and token usage of one LLM call"""
+    LLM_REQUEST_SECONDS.observe(seconds, call=call, model=model, outcome=outcome)
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        LLM_TOKENS.inc(usage.prompt_tokens or 0, call=call, model=model, kind="prompt")
+        LLM_TOKENS.inc(usage.completion_tokens or 0, call=call, model=model, kind="completion")
+        prompt_tokens = usage.prompt_tokens or 0
+        cached = min(prompt_tokens, cached_prompt_tokens(usage))
+        LLM_PROMPT_TOKENS.inc(cached, call=call, model=model, cache="cached")
+        LLM_PROMPT_TOKENS.inc(prompt_tokens - cached, call=call, model=model, cache="uncached")
+
+def cached_prompt_tokens(usage) -> int:
+    """usage.prompt_tokens_details.cached_tokens, which older SDKs only keep as an extra field"""
+    details = getattr(usage, "prompt_tokens_details", None)
+    if details is None:
+        details = (getattr(usage, "model_extra", None) or {}).get("prompt_tokens_details")
+    if isinstance(details, dict):
+        return details.get("cached_tokens") or 0
+    return getattr(details, "cached_tokens", 0) or 0
@@ -0,0 +1,50 @@
+"""
+Request ID and HTTP metrics middleware
+"""
+import time
+import uuid
+from .metrics import HTTP_REQUESTS, HTTP_REQUEST_SECONDS, request_id_var
+
+class RequestIDMiddleware:
+    """
+    Tags every request with an X-Request-ID (taken from the client or generated),
+    exposes it through request_id_var and records HTTP metrics.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        request_id = headers.get(b"x-request-id", b"").decode("latin-1") or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        status = {"code": 500}
+        started = time.perf_counter()
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            route = _route_template(scope)
+            HTTP_REQUESTS.inc(method=scope["method"], route=route, status=str(status["code"]))
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, method=scope["method"], route=route)
+            request_id_var.reset(token)
+
+def _route_template(scope) -> str:
+    """Collapse path parameters so metrics aren't labelled per booking ID"""
+    if "endpoint" not in scope:
+        return "unmatched"
+    path = scope["path"]
+    for name, value in (scope.get("path_params") or {}).items():
+        path = path.replace(f"/{value}", f"/{{{name}}}")
+    return path
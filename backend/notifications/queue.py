@@ -0,0 +1,299 @@
+"""
+In-process job queue for notification side-effects
+Jobs are delivered by background workers with retry and exponential backoff,
+optionally persisted to SQLite so pending jobs survive a restart. Only the
+most recent finished jobs are kept in memory.
+
+Several worker processes may share one NOTIFICATION_DB and all reload its
+pending jobs; a job is claimed in the database before each attempt, so only
+one process sends it and then owns its retries. A claim left by a crashed
+process expires after claim_timeout seconds and is picked up on the next start.
+"""
+import heapq
+import itertools
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from .senders import NotificationSender, get_default_senders
+
+class NotificationQueue:
+    def __init__(
+        self,
+        senders: Optional[Dict[str, NotificationSender]] = None,
+        db_path: Optional[str] = None,
+        num_workers: int = 2,
+        max_attempts: int = 5,
+        base_delay: float = 2.0,
+        max_delay: float = 300.0,
+        keep_finished: int = 1000,
+        claim_timeout: float = 300.0
+    ):
+        self.senders = senders if senders is not None else {}
+        self.num_workers = num_workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.keep_finished = keep_finished
+        self.claim_timeout = claim_timeout
+
+        self.jobs: Dict[str, Dict] = {}
+        # IDs of sent/failed jobs, oldest first; older ones are dropped from jobs
+        self._finished: deque = deque()
+        self._schedule: List[Tuple[float, int, str]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._workers: List[threading.Thread] = []
+        self._stopping = False
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        if db_path:
+            self._open_db(db_path)
+
+    def enqueue(self, channel: str, recipient: str, subject: str, body: str) -> str:
+        """
+        Queue a message for delivery and return immediately
+
+        Returns:
+            Job ID
+        """
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "channel": channel,
+            "recipient": recipient,
+            "subject": subject,
+            "body": body,
+            "attempts": 0,
+            "next_attempt_at": time.time(),
+            "status": "pending",
+            "last_error": None
+        }
+        self._persist(job)
+        with self._condition:
+            self.jobs[job["job_id"]] = job
+            heapq.heappush(self._schedule, (job["next_attempt_at"], next(self._sequence), job["job_id"]))
+            self._condition.notify()
+        self._ensure_started()
+        return job["job_id"]
+
+    def start(self):
+        """Start worker threads (done automatically on first enqueue)"""
+        with self._condition:
+            self._stopping = False
+            while len(self._workers) < self.num_workers:
+                worker = threading.Thread(target=self._worker_loop, name=f"notification-worker-{len(self._workers)}", daemon=True)
+                self._workers.append(worker)
+                worker.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop workers; pending jobs stay queued (and persisted, if enabled)"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+
+    def drain(self, timeout: float = 10.0) -> bool:
+        """Wait until every pending job (including retries) is done; returns False on timeout"""
+        deadline = time.time() + timeout
+        with self._condition:
+            while self._in_flight or self._schedule:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(min(remaining, 0.05))
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        """Count pending jobs and recently finished ones by status"""
+        with self._condition:
+            counts: Dict[str, int] = {}
+            for job in self.jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            return counts
+
+    def _ensure_started(self):
+        if len(self._workers) < self.num_workers and not self._stopping:
+            self.start()
+
+    def _worker_loop(self):
+        while True:
+            with self._condition:
+                job = None
+                while job is None:
+                    if self._stopping:
+                        return
+                    if self._schedule:
+                        wait = self._schedule[0][0] - time.time()
+                        if wait <= 0:
+                            _, _, job_id = heapq.heappop(self._schedule)
+                            job = self.jobs[job_id]
+                            self._in_flight += 1
+                            break
+                        self._condition.wait(wait)
+                    else:
+                        self._condition.wait()
+
+            try:
+                self._deliver(job)
+            finally:
+                with self._condition:
+                    self._in_flight -= 1
+                    self._condition.notify_all()
+
+    def _deliver(self, job: Dict):
+        if not self._claim(job):
+            return
+        sender = self.senders.get(job["channel"])
+        job["attempts"] += 1
+        try:
+            if sender is None:
+                raise LookupError(f"No sender configured for channel '{job['channel']}'")
+            sender.send(job["recipient"], job["subject"], job["body"])
+            job["status"] = "sent"
+            job["last_error"] = None
+        except Exception as e:
+            job["last_error"] = str(e)
+            if isinstance(e, LookupError) or job["attempts"] >= self.max_attempts:
+                job["status"] = "failed"
+                print(f"⚠️ Warning: Notification {job['job_id']} to {job['recipient']} failed: {e}")
+            else:
+                delay = min(self.max_delay, self.base_delay * 2 ** (job["attempts"] - 1))
+                job["next_attempt_at"] = time.time() + delay * (0.5 + random.random())
+                with self._condition:
+                    heapq.heappush(self._schedule, (job["next_attempt_at"], next(self._sequence), job["job_id"]))
+                    self._condition.notify()
+        self._persist(job)
+        if job["status"] != "pending":
+            self._retire(job["job_id"])
+
+    def _claim(self, job: Dict) -> bool:
+        """
+        Take a persisted job for one attempt; False (and the job is forgotten
+        here) if another process holds it, rescheduled it or finished it
+        """
+        if self._db is None:
+            return True
+        now = time.time()
+        with self._db_lock:
+            claimed = self._db.execute(
+                "UPDATE notification_jobs SET status = 'sending', next_attempt_at = ? "
+                "WHERE job_id = ? AND status IN ('pending', 'sending') AND next_attempt_at <= ? AND attempts = ?",
+                (now + self.claim_timeout, job["job_id"], now, job["attempts"])
+            ).rowcount
+            self._db.commit()
+        if not claimed:
+            with self._condition:
+                self.jobs.pop(job["job_id"], None)
+        return bool(claimed)
+
+    def _retire(self, job_id: str):
+        """Remember a finished job, forgetting the oldest past keep_finished"""
+        with self._condition:
+            self._finished.append(job_id)
+            while len(self._finished) > self.keep_finished:
+                self.jobs.pop(self._finished.popleft(), None)
+
+    def _open_db(self, db_path: str):
+        """Open the SQLite store and reload jobs that were still pending (or whose sender crashed)"""
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS notification_jobs (
+                job_id TEXT PRIMARY KEY,
+                channel TEXT NOT NULL,
+                recipient TEXT NOT NULL,
+                subject TEXT,
+                body TEXT,
+                attempts INTEGER NOT NULL,
+                next_attempt_at REAL NOT NULL,
+                status TEXT NOT NULL,
+                last_error TEXT
+            )"""
+        )
+        self._db.commit()
+
+        rows = self._db.execute(
+            "SELECT job_id, channel, recipient, subject, body, attempts, next_attempt_at, status, last_error "
+            "FROM notification_jobs WHERE status IN ('pending', 'sending')"
+        ).fetchall()
+        columns = ["job_id", "channel", "recipient", "subject", "body", "attempts", "next_attempt_at", "status", "last_error"]
+        for row in rows:
+            # A job still 'sending' is retried when its claim expires (next_attempt_at)
+            job = {**dict(zip(columns, row)), "status": "pending"}
+            self.jobs[job["job_id"]] = job
+            heapq.heappush(self._schedule, (job["next_attempt_at"], next(self._sequence), job["job_id"]))
+
+    def _persist(self, job: Dict):
+        if self._db is None:
+            return
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO notification_jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job["job_id"], job["channel"], job["recipient"], job["subject"], job["body"],
+                 job["attempts"], job["next_attempt_at"], job["status"], job["last_error"])
+            )
+            self._db.commit()
+
+notification_queue = NotificationQueue(
+    get_default_senders(),
+    db_path=os.getenv("NOTIFICATION_DB"),
+    num_workers=int(os.getenv("NOTIFICATION_WORKERS", 2))
+)
+
+def _describe(booking: Dict) -> str:
+    return (
+        f"{booking['appointment_type']} appointment on {booking['date']} at {booking['start_time']} "
+        f"(Booking ID: {booking['booking_id']})"
+    )
+
+def _enqueue_both(patient: Dict, subject: str, body: str):
+    if patient.get("email"):
+        notification_queue.enqueue("email", patient["email"], subject, body)
+    if patient.get("phone"):
+        notification_queue.enqueue("sms", patient["phone"], subject, body)
+
+def enqueue_booking_confirmation(booking: Dict):
+    """Queue the confirmation email/SMS for a new booking"""
+    patient = booking.get("patient", {})
+    _enqueue_both(
+        patient,
+        "Your appointment is confirmed",
+        f"Hi {patient.get('name')}, your {_describe(booking)} is confirmed. See you then!"
+    )
+
+def enqueue_waitlist_offer(entry: Dict, hold: Dict):
+    """Queue a message offering a held slot to a waitlisted patient"""
+    patient = entry["patient"]
+    _enqueue_both(
+        patient,
+        "An earlier appointment is available",
+        f"Hi {patient.get('name')}, a {entry['appointment_type']} slot opened on {hold['date']} at "
+        f"{hold['start_time']}. It is held for you until {hold['expires_at']} (Hold ID: {hold['hold_id']})."
+    )
+
+def booking_event_listener(event: str, booking: Dict):
+    """MockCalendlyAPI listener that notifies patients of cancellations and reschedules"""
+    patient = booking.get("patient", {})
+    if event == "cancelled":
+        _enqueue_both(
+            patient,
+            "Your appointment was cancelled",
+            f"Hi {patient.get('name')}, your {_describe(booking)} has been cancelled."
+        )
+    elif event == "rescheduled":
+        _enqueue_both(
+            patient,
+            "Your appointment was updated",
+            f"Hi {patient.get('name')}, your appointment is now a {_describe(booking)}."
+        )
@@ -0,0 +1,98 @@
+"""
+Pluggable notification senders (email/SMS) and a file-based fake for testing
+"""
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+class NotificationSender:
+    """Base class for senders; send() raises on failure so the job is retried"""
+
+    def send(self, recipient: str, subject: str, body: str):
+        raise NotImplementedError
+
+class FileSender(NotificationSender):
+    """Appends every message to a local JSONL outbox instead of delivering it"""
+
+    def __init__(self, path: str, channel: str):
+        self.path = path
+        self.channel = channel
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def send(self, recipient: str, subject: str, body: str):
+        record = {
+            "channel": self.channel,
+            "to": recipient,
+            "subject": subject,
+            "body": body,
+            "sent_at": datetime.now().isoformat(timespec="seconds")
+        }
+        with self._lock, open(self.path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+class SMTPEmailSender(NotificationSender):
+    """Sends email through an SMTP server"""
+
+    def __init__(self, host: str, port: int, sender: str, username: Optional[str] = None, password: Optional[str] = None):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+
+    def send(self, recipient: str, subject: str, body: str):
+        import smtplib
+        from email.message import EmailMessage
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = recipient
+        message["Subject"] = subject
+        message.set_content(body)
+
+        with smtplib.SMTP(self.host, self.port, timeout=10) as smtp:
+            if self.username:
+                smtp.starttls()
+                smtp.login(self.username, self.password or "")
+            smtp.send_message(message)
+
+class WebhookSMSSender(NotificationSender):
+    """Sends SMS by POSTing to an HTTP gateway"""
+
+    def __init__(self, url: str, token: Optional[str] = None):
+        self.url = url
+        self.token = token
+
+    def send(self, recipient: str, subject: str, body: str):
+        import httpx
+        headers = {"Authorization": f"Bearer {self.token}"} if self.token else {}
+        response = httpx.post(self.url, json={"to": recipient, "body": body}, headers=headers, timeout=10)
+        response.raise_for_status()
+
+def get_default_senders() -> Dict[str, NotificationSender]:
+    """
+    Build senders from environment variables
+
+    NOTIFICATION_SENDER=file (default) writes to NOTIFICATION_OUTBOX;
+    NOTIFICATION_SENDER=live uses SMTP_* for email and SMS_WEBHOOK_URL for SMS.
+    """
+    outbox = os.getenv("NOTIFICATION_OUTBOX", "./data/outbox.jsonl")
+    if os.getenv("NOTIFICATION_SENDER", "file") != "live":
+        return {"email": FileSender(outbox, "email"), "sms": FileSender(outbox, "sms")}
+
+    senders: Dict[str, NotificationSender] = {}
+    if os.getenv("SMTP_HOST"):
+        senders["email"] = SMTPEmailSender(
+            host=os.getenv("SMTP_HOST"),
+            port=int(os.getenv("SMTP_PORT", 587)),
+            sender=os.getenv("SMTP_FROM", "no-reply@healthcareplus.example"),
+            username=os.getenv("SMTP_USER"),
+            password=os.getenv("SMTP_PASSWORD")
+        )
+    if os.getenv("SMS_WEBHOOK_URL"):
+        senders["sms"] = WebhookSMSSender(os.getenv("SMS_WEBHOOK_URL"), os.getenv("SMS_WEBHOOK_TOKEN"))
+    return senders
@@ -1,32 +1,56 @@
 """
 RAG system for answering FAQs
 """
-import os
-from openai import OpenAI
+import re
+import threading
 from typing import Optional
 from .vector_store import FAQVectorStore
+from ..llm.gateway import get_llm_gateway
+from ..llm.router import TASK_FAQ, ModelRouter
+from ..monitoring.metrics import stage_timer
+from ..singleflight import SingleFlight
+
+FAQ_SYSTEM_PROMPT = """You are a helpful medical appointment scheduling assistant. 
+Answer questions about the clinic based on the provided context. 
+Be friendly, concise, and accurate. Only use information from the provided context.
+If the question cannot be answered from the context, politely say you don't have that information."""
+
+def normalize_question(question: str) -> str:
+    """Key under which identical questions are coalesced"""
+    return re.sub(r"\s+", " ", re.sub(r"[^\w\s]", " ", question.lower())).strip()
 
 class FAQRAG:
     def __init__(self):
         self.vector_store = FAQVectorStore()
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY not set for FAQ RAG system")
-        self.client = OpenAI(api_key=api_key)
-        self.model = os.getenv("LLM_MODEL", "gpt-4-turbo-preview")
+        self.llm = ModelRouter(get_llm_gateway())
+        # The same question asked concurrently costs one retrieval and one LLM call
+        self._flight = SingleFlight("faq")
+        self._retrieval_flight = SingleFlight("faq_retrieval")
+    
+    def retrieve_context(self, question: str, top_k: int = 3) -> str:
+        """
+        Clinic information relevant to a question, without generating an answer
+        (for callers that inline it into their own completion)
+        """
+        key = (normalize_question(question), top_k)
+        
+        def retrieve():
+            with stage_timer("retrieval"):
+                return self.vector_store.get_context_for_rag(question, top_k=top_k)
+        
+        return self._retrieval_flight.do(key, retrieve)
     
     def answer_question(self, question: str, conversation_context: Optional[str] = None) -> str:
         """
         Answer FAQ using RAG
         """
-        context = self.vector_store.get_context_for_rag(question, top_k=3)
+        # The answer depends only on the question (the context is not in the prompt), so it alone is the key
+        return self._flight.do(normalize_question(question), lambda: self._answer(question))
+    
+    def _answer(self, question: str) -> str:
+        context = self.retrieve_context(question)
         
         # Build prompt
-        system_prompt = """You are a helpful medical appointment scheduling assistant. 
-Answer questions about the clinic based on the provided context. 
-Be friendly, concise, and accurate. Only use information from the provided context.
-If the question cannot be answered from the context, politely say you don't have that information."""
-        
         user_prompt = f"""Context about the clinic:
 {context}
 
@@ -35,13 +59,13 @@ Question: {question}
 Provide a helpful, accurate answer based on the context above."""
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = self.llm.chat_completion(
+                call="faq",
+                task=TASK_FAQ,
                 messages=[
-                    {"role": "system", "content": system_prompt},
+                    {"role": "system", "content": FAQ_SYSTEM_PROMPT},
                     {"role": "user", "content": user_prompt}
                 ],
-                temperature=0.7,
                 max_tokens=300
             )
             
@@ -49,3 +73,15 @@ Provide a helpful, accurate answer based on the context above."""
         except Exception as e:
             return f"I apologize, but I'm having trouble accessing that information right now. Please call our office at +1-555-123-4567 for assistance."
 
+
+_faq_rag: Optional[FAQRAG] = None
+_faq_rag_lock = threading.Lock()
+
+def get_faq_rag() -> FAQRAG:
+    """Process-wide FAQ RAG, so the clinic info loaded at startup is the one the agent searches"""
+    global _faq_rag
+    if _faq_rag is None:
+        with _faq_rag_lock:
+            if _faq_rag is None:
+                _faq_rag = FAQRAG()
+    return _faq_rag
@@ -3,18 +3,18 @@ Vector store for FAQ retrieval using ChromaDB
 """
 import os
 import json
+from importlib.util import find_spec
 from typing import List, Dict, Optional
-try:
-    from langchain.text_splitter import RecursiveCharacterTextSplitter
-except ImportError:
-    from langchain_text_splitters import RecursiveCharacterTextSplitter
 
-try:
-    import chromadb
-    from chromadb.config import Settings
-    CHROMADB_AVAILABLE = True
-except ImportError:
-    CHROMADB_AVAILABLE = False
+# Checked without importing; chromadb and langchain are only loaded on first use
+CHROMADB_AVAILABLE = find_spec("chromadb") is not None
+
+def _make_text_splitter(chunk_size: int, chunk_overlap: int):
+    try:
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+    except ImportError:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+    return RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
 
 class FAQVectorStore:
     def __init__(self, persist_directory: str = "./data/vectordb"):
@@ -24,6 +24,8 @@ class FAQVectorStore:
         self.use_chromadb = CHROMADB_AVAILABLE
         
         if self.use_chromadb:
+            import chromadb
+            from chromadb.config import Settings
             self.client = chromadb.PersistentClient(
                 path=persist_directory,
                 settings=Settings(anonymized_telemetry=False)
@@ -36,10 +38,14 @@ class FAQVectorStore:
         else:
             self.documents: List[Dict] = []
         
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=500,
-            chunk_overlap=50
-        )
+        self._text_splitter = None
+    
+    @property
+    def text_splitter(self):
+        """Text splitter, created when clinic info is first loaded"""
+        if self._text_splitter is None:
+            self._text_splitter = _make_text_splitter(chunk_size=500, chunk_overlap=50)
+        return self._text_splitter
     
     def load_clinic_info(self, clinic_info_path: str):
         """
@@ -0,0 +1,53 @@
+"""
+Single-flight request coalescing
+Concurrent calls with the same key share one execution: the first caller
+runs the function and later callers wait for its result (or its exception).
+Nothing is cached once the call finishes.
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable
+from .monitoring.metrics import COALESCED
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn, or wait for the in-flight call with the same key
+
+        The result object is shared by every caller of that flight, so treat
+        it as read-only.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            COALESCED.inc(name=self.name, role="follower")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        COALESCED.inc(name=self.name, role="leader")
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
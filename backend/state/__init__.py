@@ -0,0 +1,47 @@
+"""
+State that must be shared when the API runs as several worker processes
+
+STATE_BACKEND=memory (default) keeps everything in the process;
+STATE_BACKEND=sqlite stores bookings and conversations in STATE_DB_PATH so
+any worker can serve any conversation and booking. STATE_BACKEND=journal keeps
+a single process's bookings in an append-only journal under JOURNAL_DIR so
+they survive restarts. Past bookings are moved to a BookingArchive under
+BOOKING_ARCHIVE_DIR whatever the backend.
+"""
+import os
+from .archive import BookingArchive
+from .bookings import BookingStore, MemoryBookingStore, SQLiteBookingStore
+from .conversations import ConversationStore, MemoryConversationStore, SQLiteConversationStore
+from .journal import JournalBookingStore
+
+def _backend() -> str:
+    backend = os.getenv("STATE_BACKEND", "memory")
+    if backend not in ("memory", "sqlite", "journal"):
+        raise ValueError(f"Unknown STATE_BACKEND '{backend}' (expected memory, sqlite or journal)")
+    return backend
+
+def _db_path() -> str:
+    return os.getenv("STATE_DB_PATH", "./data/state.db")
+
+def get_booking_store() -> BookingStore:
+    """Booking store configured from the environment"""
+    if _backend() == "sqlite":
+        return SQLiteBookingStore(_db_path())
+    if _backend() == "journal":
+        return JournalBookingStore(
+            os.getenv("JOURNAL_DIR", "./data/journal"),
+            snapshot_every=int(os.getenv("JOURNAL_SNAPSHOT_EVERY", 1000)),
+            commit_interval=float(os.getenv("JOURNAL_COMMIT_MS", 2)) / 1000,
+            fsync=os.getenv("JOURNAL_FSYNC", "true").lower() != "false"
+        )
+    return MemoryBookingStore()
+
+def get_booking_archive() -> BookingArchive:
+    """Cold archive for past bookings"""
+    return BookingArchive(os.getenv("BOOKING_ARCHIVE_DIR", "./data/archive"))
+
+def get_conversation_store() -> ConversationStore:
+    """Conversation store configured from the environment"""
+    if _backend() == "sqlite":
+        return SQLiteConversationStore(_db_path())
+    return MemoryConversationStore()
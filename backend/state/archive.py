@@ -0,0 +1,139 @@
+"""
+Cold archive for past bookings
+Bookings whose date has passed are moved out of the hot store into
+append-only, gzip-compressed JSON-lines files partitioned by month
+(bookings-YYYY-MM.jsonl.gz). Each append is a separate gzip member, so a
+partition is never rewritten; a member cut short by a crash is truncated
+before the next append. Range reads open only the partitions that overlap
+the range; lookups by ID use an index that reads only what was appended (by
+any worker) since it was last brought up to date.
+"""
+import gzip
+import json
+import os
+import re
+import threading
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+_PARTITION = re.compile(r"^bookings-(\d{4}-\d{2})\.jsonl\.gz$")
+_BOOKING_NUMBER = re.compile(r"^APPT-\d+-(\d+)$")
+
+class BookingArchive:
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        # booking_id -> partition ("YYYY-MM"), and the end of the last complete member indexed per partition
+        self._ids: Dict[str, str] = {}
+        self._indexed: Dict[str, int] = {}
+
+    def partitions(self) -> List[str]:
+        """Months with archived bookings, oldest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(match.group(1) for match in map(_PARTITION.match, os.listdir(self.directory)) if match)
+
+    def version(self) -> Tuple:
+        """Changes whenever any worker appends (for caches over the archive)"""
+        return tuple((month, os.path.getsize(self._path(month))) for month in self.partitions())
+
+    def append(self, bookings: List[Dict]) -> List[str]:
+        """
+        Archive bookings; ones already archived unchanged are skipped
+
+        Returns:
+            IDs that were not archived because a different booking with the
+            same ID already is (the caller must keep those)
+        """
+        with self._lock:
+            ids = self._index()
+            by_month: Dict[str, List[Dict]] = {}
+            conflicts = []
+            for booking in bookings:
+                month = ids.get(booking["booking_id"])
+                if month is None:
+                    by_month.setdefault(booking["date"][:7], []).append(booking)
+                elif self._find(month, booking["booking_id"]) != booking:
+                    conflicts.append(booking["booking_id"])
+
+            os.makedirs(self.directory, exist_ok=True)
+            for month, rows in by_month.items():
+                path = self._path(month)
+                if os.path.exists(path) and os.path.getsize(path) > self._indexed.get(month, 0):
+                    # _index stopped at an incomplete member: drop it so new members stay readable
+                    print(f"⚠️ Warning: Truncating an incomplete write at the end of archive partition {month}")
+                    with open(path, "r+b") as f:
+                        f.truncate(self._indexed.get(month, 0))
+                        os.fsync(f.fileno())
+                data = gzip.compress("".join(json.dumps(row) + "\n" for row in rows).encode("utf-8"))
+                with open(self._path(month), "ab") as f:
+                    f.write(data)
+                    f.flush()
+                    # Durable before the bookings are dropped from the hot store
+                    os.fsync(f.fileno())
+            return conflicts
+
+    def get(self, booking_id: str) -> Optional[Dict]:
+        """Look up an archived booking by ID"""
+        with self._lock:
+            month = self._index().get(booking_id)
+        return self._find(month, booking_id) if month else None
+
+    def last_booking_number(self) -> int:
+        """Highest number in archived APPT-<year>-<number> IDs (0 if none)"""
+        with self._lock:
+            numbers = [int(match.group(1)) for match in map(_BOOKING_NUMBER.match, self._index()) if match]
+        return max(numbers, default=0)
+
+    def iter_bookings(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> Iterator[Dict]:
+        """Archived bookings in an inclusive date range, oldest partition first"""
+        for month in self.partitions():
+            if (start_date and month < start_date[:7]) or (end_date and month > end_date[:7]):
+                continue
+            for booking in self._read(month):
+                if (start_date and booking["date"] < start_date) or (end_date and booking["date"] > end_date):
+                    continue
+                yield booking
+
+    def _path(self, month: str) -> str:
+        return os.path.join(self.directory, f"bookings-{month}.jsonl.gz")
+
+    def _members(self, month: str, offset: int = 0) -> Iterator[Tuple[int, List[Dict]]]:
+        """(end offset, bookings) of each complete gzip member from a member boundary on"""
+        try:
+            with open(self._path(month), "rb") as f:
+                f.seek(offset)
+                data = memoryview(f.read())
+        except FileNotFoundError:
+            return
+        position = 0
+        while position < len(data):
+            decompressor = zlib.decompressobj(wbits=31)
+            try:
+                text = decompressor.decompress(data[position:])
+            except zlib.error:
+                break
+            if not decompressor.eof:
+                break
+            position = len(data) - len(decompressor.unused_data)
+            yield offset + position, [json.loads(line) for line in text.decode("utf-8").splitlines() if line]
+        if position < len(data):
+            # A member cut short by a crash mid-append; everything before it is intact
+            print(f"⚠️ Warning: Archive partition {month} ends with an incomplete write")
+
+    def _read(self, month: str) -> Iterator[Dict]:
+        for _, bookings in self._members(month):
+            yield from bookings
+
+    def _find(self, month: str, booking_id: str) -> Optional[Dict]:
+        return next((booking for booking in self._read(month) if booking["booking_id"] == booking_id), None)
+
+    def _index(self) -> Dict[str, str]:
+        """Under the lock: booking_id -> partition, after reading any complete members appended since last time"""
+        for month, size in self.version():
+            if size > self._indexed.get(month, 0):
+                for end, bookings in self._members(month, self._indexed.get(month, 0)):
+                    for booking in bookings:
+                        self._ids[booking["booking_id"]] = month
+                    self._indexed[month] = end
+        return self._ids
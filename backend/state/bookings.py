@@ -0,0 +1,194 @@
+"""
+Booking storage shared by all worker processes
+MockCalendlyAPI keeps its dicts and indexes as an in-process view and asks
+the store for changes made by other workers (tracked with a version number)
+before reading, and inside a transaction before writing.
+"""
+import json
+import random
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+from .sqlite import SQLiteDatabase
+
+class BookingStore:
+    """Interface for booking storage"""
+
+    # False when the in-process view is the only copy (nothing to sync)
+    shared = False
+
+    @contextmanager
+    def transaction(self):
+        """Serialize a read-check-write sequence against other writers"""
+        raise NotImplementedError
+
+    def changes_since(self, version: int) -> Tuple[int, List[Tuple[str, Optional[Dict]]]]:
+        """
+        Bookings changed after a version
+
+        Returns:
+            (current version, [(booking_id, booking or None if deleted)])
+        """
+        raise NotImplementedError
+
+    def put(self, booking: Dict):
+        raise NotImplementedError
+
+    def delete(self, booking_id: str):
+        raise NotImplementedError
+
+    def feed_id(self) -> str:
+        """Names this store's version sequence in change-feed cursors (shared stores only)"""
+        raise NotImplementedError
+
+    def read_changes(self, version: int, limit: int) -> List[Tuple[int, str, bool, Optional[Dict]]]:
+        """
+        Up to limit changes after a version, oldest first, without taking the
+        write lock (shared stores only)
+
+        Returns:
+            [(version, booking_id, deleted, last known booking or None)]
+        """
+        raise NotImplementedError
+
+    def snapshot(self) -> Tuple[int, List[Dict]]:
+        """Live bookings and the version they were read at (shared stores only)"""
+        raise NotImplementedError
+
+    def next_booking_number(self) -> int:
+        """Allocate the number used in the next booking ID"""
+        raise NotImplementedError
+
+    def skip_booking_numbers(self, up_to: int):
+        """Never allocate booking numbers up to and including this one"""
+        raise NotImplementedError
+
+    def recover(self, snapshot_source: Callable[[], List[Dict]]) -> List[Dict]:
+        """
+        Bookings persisted by a previous run, loaded once at startup
+
+        Args:
+            snapshot_source: Returns the current bookings, for stores that compact
+        """
+        return []
+
+    def close(self):
+        """Flush and release resources on shutdown"""
+
+class MemoryBookingStore(BookingStore):
+    """Single-process mode: the API's own dicts are the store"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._counter = 0
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            yield
+
+    def changes_since(self, version: int) -> Tuple[int, List[Tuple[str, Optional[Dict]]]]:
+        return version, []
+
+    def put(self, booking: Dict):
+        pass
+
+    def delete(self, booking_id: str):
+        pass
+
+    def next_booking_number(self) -> int:
+        with self._lock:
+            self._counter += 1
+            return self._counter
+
+    def skip_booking_numbers(self, up_to: int):
+        with self._lock:
+            self._counter = max(self._counter, up_to)
+
+class SQLiteBookingStore(BookingStore):
+    """Bookings in a SQLite file every worker on the host opens"""
+
+    shared = True
+
+    def __init__(self, path: str):
+        self.db = SQLiteDatabase(path)
+        with self.db.transaction() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS bookings (
+                    booking_id TEXT PRIMARY KEY,
+                    data TEXT,
+                    deleted INTEGER NOT NULL DEFAULT 0,
+                    version INTEGER NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS bookings_version ON bookings (version)")
+            conn.execute("CREATE TABLE IF NOT EXISTS booking_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO booking_meta VALUES ('version', 0), ('booking_counter', 0)")
+            # Set once per database, so every worker hands out the same cursors
+            conn.execute("INSERT OR IGNORE INTO booking_meta VALUES ('feed_id', ?)", (random.getrandbits(32),))
+        self._feed_id = f"{self._meta('feed_id'):08x}"
+
+    @contextmanager
+    def transaction(self):
+        with self.db.transaction():
+            yield
+
+    def changes_since(self, version: int) -> Tuple[int, List[Tuple[str, Optional[Dict]]]]:
+        current = self._meta("version")
+        if current == version:
+            return version, []
+        rows = self.db.execute(
+            "SELECT booking_id, data, deleted FROM bookings WHERE version > ? ORDER BY version",
+            (version,)
+        ).fetchall()
+        return current, [(booking_id, None if deleted else json.loads(data)) for booking_id, data, deleted in rows]
+
+    def feed_id(self) -> str:
+        return self._feed_id
+
+    def read_changes(self, version: int, limit: int) -> List[Tuple[int, str, bool, Optional[Dict]]]:
+        rows = self.db.execute(
+            "SELECT version, booking_id, deleted, data FROM bookings WHERE version > ? ORDER BY version LIMIT ?",
+            (version, limit)
+        ).fetchall()
+        return [(row_version, booking_id, bool(deleted), json.loads(data) if data else None) for row_version, booking_id, deleted, data in rows]
+
+    def snapshot(self) -> Tuple[int, List[Dict]]:
+        # One statement, so the rows and the version agree
+        rows = self.db.execute("SELECT version, deleted, data FROM bookings").fetchall()
+        version = max((row[0] for row in rows), default=0)
+        return version, [json.loads(data) for _, deleted, data in rows if not deleted]
+
+    def put(self, booking: Dict):
+        with self.db.transaction() as conn:
+            version = self._bump("version")
+            conn.execute(
+                "INSERT OR REPLACE INTO bookings VALUES (?, ?, 0, ?)",
+                (booking["booking_id"], json.dumps(booking), version)
+            )
+
+    def delete(self, booking_id: str):
+        with self.db.transaction() as conn:
+            version = self._bump("version")
+            # Keep a tombstone with the last state so other workers and feed readers see the deletion
+            conn.execute(
+                "UPDATE bookings SET deleted = 1, version = ? WHERE booking_id = ?",
+                (version, booking_id)
+            )
+
+    def next_booking_number(self) -> int:
+        with self.db.transaction():
+            return self._bump("booking_counter")
+
+    def skip_booking_numbers(self, up_to: int):
+        with self.db.transaction():
+            self.db.execute(
+                "UPDATE booking_meta SET value = MAX(value, ?) WHERE key = 'booking_counter'", (up_to,)
+            )
+
+    def _meta(self, key: str) -> int:
+        return self.db.execute("SELECT value FROM booking_meta WHERE key = ?", (key,)).fetchone()[0]
+
+    def _bump(self, key: str) -> int:
+        self.db.execute("UPDATE booking_meta SET value = value + 1 WHERE key = ?", (key,))
+        return self._meta(key)
@@ -0,0 +1,89 @@
+"""
+Conversation history storage shared by all worker processes
+"""
+import threading
+from typing import Dict, List
+from .sqlite import SQLiteDatabase
+
+class ConversationStore:
+    """Interface for conversation storage; messages are {"role", "content"} dicts"""
+
+    def get(self, conversation_id: str) -> List[Dict]:
+        """Messages of a conversation in order (empty if unknown)"""
+        raise NotImplementedError
+
+    def append(self, conversation_id: str, role: str, content: str):
+        raise NotImplementedError
+
+    def replace_last(self, conversation_id: str, content: str):
+        """Overwrite the content of the most recent message"""
+        raise NotImplementedError
+
+    def __contains__(self, conversation_id: str) -> bool:
+        return bool(self.get(conversation_id))
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+class MemoryConversationStore(ConversationStore):
+    def __init__(self):
+        self._conversations: Dict[str, List[Dict]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, conversation_id: str) -> List[Dict]:
+        return list(self._conversations.get(conversation_id, ()))
+
+    def append(self, conversation_id: str, role: str, content: str):
+        with self._lock:
+            self._conversations.setdefault(conversation_id, []).append({"role": role, "content": content})
+
+    def replace_last(self, conversation_id: str, content: str):
+        with self._lock:
+            messages = self._conversations.get(conversation_id)
+            if messages:
+                messages[-1] = {**messages[-1], "content": content}
+
+    def __contains__(self, conversation_id: str) -> bool:
+        return conversation_id in self._conversations
+
+    def __len__(self) -> int:
+        return len(self._conversations)
+
+class SQLiteConversationStore(ConversationStore):
+    def __init__(self, path: str):
+        self.db = SQLiteDatabase(path)
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS conversation_messages (
+                conversation_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                PRIMARY KEY (conversation_id, seq)
+            )"""
+        )
+
+    def get(self, conversation_id: str) -> List[Dict]:
+        rows = self.db.execute(
+            "SELECT role, content FROM conversation_messages WHERE conversation_id = ? ORDER BY seq",
+            (conversation_id,)
+        ).fetchall()
+        return [{"role": role, "content": content} for role, content in rows]
+
+    def append(self, conversation_id: str, role: str, content: str):
+        with self.db.transaction() as conn:
+            conn.execute(
+                "INSERT INTO conversation_messages "
+                "SELECT ?, COALESCE(MAX(seq) + 1, 0), ?, ? FROM conversation_messages WHERE conversation_id = ?",
+                (conversation_id, role, content, conversation_id)
+            )
+
+    def replace_last(self, conversation_id: str, content: str):
+        with self.db.transaction() as conn:
+            conn.execute(
+                "UPDATE conversation_messages SET content = ? WHERE conversation_id = ? AND seq = "
+                "(SELECT MAX(seq) FROM conversation_messages WHERE conversation_id = ?)",
+                (content, conversation_id, conversation_id)
+            )
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(DISTINCT conversation_id) FROM conversation_messages").fetchone()[0]
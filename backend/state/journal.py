@@ -0,0 +1,313 @@
+"""
+Append-only booking journal with snapshots
+Every put/delete is appended to a write-ahead log; a background flusher
+fsyncs whatever has accumulated, so concurrent bookings share one fsync
+(group commit) and a booking call returns once its entry is durable. Every
+snapshot_every entries the current bookings are written to a compacted
+snapshot and a new log segment is started, so recovery reads one snapshot
+plus a bounded tail however long the history is.
+
+Layout of the journal directory:
+    snapshot-<seq>.json    bookings as of entry <seq>
+    journal-<seq>.log      JSON lines, entries from <seq> on
+"""
+import glob
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+from .bookings import BookingStore
+
+_SEGMENT = re.compile(r"(journal|snapshot)-(\d+)\.(log|json)$")
+
+def _numbered(directory: str, kind: str) -> List[Tuple[int, str]]:
+    """(seq, path) of the snapshots or log segments in a directory, oldest first"""
+    files = []
+    for path in glob.glob(os.path.join(directory, f"{kind}-*")):
+        match = _SEGMENT.search(path)
+        if match and match.group(1) == kind:
+            files.append((int(match.group(2)), path))
+    return sorted(files)
+
+def _fsync_directory(directory: str):
+    """Make a rename or new file in the directory durable (no-op where unsupported)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def _read_segment(path: str) -> List[Dict]:
+    """
+    Entries of a log segment
+
+    A torn write (a crash mid-append) can only be the last line; it was never
+    acknowledged, so it is cut off the file before anything is appended after it.
+    """
+    entries = []
+    offset = 0
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("incomplete line")
+                entries.append(json.loads(line))
+            except ValueError:
+                break
+            offset += len(line)
+    if offset < os.path.getsize(path):
+        print(f"⚠️ Warning: Dropping a torn write at the end of {os.path.basename(path)}")
+        with open(path, "r+b") as f:
+            f.truncate(offset)
+            os.fsync(f.fileno())
+    return entries
+
+class Journal:
+    """Write-ahead log with group commit"""
+
+    def __init__(self, directory: str, next_seq: int, commit_interval: float = 0.002, fsync: bool = True):
+        self.directory = directory
+        self.commit_interval = commit_interval
+        self.fsync = fsync
+        self._cond = threading.Condition()
+        self._written = self._durable = next_seq - 1
+        self._file = self._open_segment(next_seq)
+        self._closed = False
+        self._flusher = threading.Thread(target=self._flush_loop, name="journal-flusher", daemon=True)
+        self._flusher.start()
+
+    @property
+    def last_seq(self) -> int:
+        return self._written
+
+    def append(self, entry: Dict) -> int:
+        """Write an entry (not yet durable); returns its sequence number"""
+        with self._cond:
+            seq = self._written + 1
+            self._file.write(json.dumps({"seq": seq, **entry}) + "\n")
+            self._written = seq
+            self._cond.notify_all()
+            return seq
+
+    def wait_durable(self, seq: int):
+        """Block until the entry with this sequence number has been fsynced"""
+        with self._cond:
+            while self._durable < seq:
+                self._cond.wait()
+
+    def rotate(self) -> int:
+        """Make everything durable and start a new segment; returns the last seq of the old one"""
+        with self._cond:
+            self._sync_file()
+            self._file.close()
+            self._file = self._open_segment(self._written + 1)
+            self._durable = self._written
+            self._cond.notify_all()
+            return self._written
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._flusher.join()
+        with self._cond:
+            self._sync_file()
+            self._file.close()
+
+    def _open_segment(self, first_seq: int):
+        path = os.path.join(self.directory, f"journal-{first_seq:012d}.log")
+        segment = open(path, "a", encoding="utf-8")
+        _fsync_directory(self.directory)
+        return segment
+
+    def _sync_file(self):
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                while self._written == self._durable and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+            # Let concurrent writers join this batch
+            time.sleep(self.commit_interval)
+            with self._cond:
+                target = self._written
+                self._file.flush()
+                fd = self._file.fileno()
+            if self.fsync:
+                try:
+                    os.fsync(fd)
+                except OSError:
+                    # The segment was rotated (and synced) meanwhile
+                    pass
+            with self._cond:
+                self._durable = max(self._durable, target)
+                self._cond.notify_all()
+
+class JournalBookingStore(BookingStore):
+    """Single-process store that survives restarts: snapshot + write-ahead journal"""
+
+    def __init__(
+        self,
+        directory: str,
+        snapshot_every: int = 1000,
+        commit_interval: float = 0.002,
+        fsync: bool = True
+    ):
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.commit_interval = commit_interval
+        self.fsync = fsync
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._counter = 0
+        self._journal: Optional[Journal] = None
+        self._snapshot_source: Optional[Callable[[], List[Dict]]] = None
+        self._since_snapshot = 0
+        self._snapshotting = False
+        # What the last recovery did, for logs and tests
+        self.recovery: Dict = {}
+
+    @contextmanager
+    def transaction(self):
+        """Serialize writers; the outermost transaction returns once its entries are durable"""
+        depth = getattr(self._local, "depth", 0)
+        with self._lock:
+            self._local.depth = depth + 1
+            try:
+                yield
+            finally:
+                self._local.depth = depth
+            snapshot = None
+            if depth == 0:
+                snapshot = self._maybe_start_snapshot()
+        if depth == 0:
+            # Wait outside the lock so other bookings can join the same fsync
+            last = getattr(self._local, "last_seq", None)
+            if last is not None:
+                self._local.last_seq = None
+                self._require_journal().wait_durable(last)
+            if snapshot:
+                threading.Thread(target=self._write_snapshot, args=snapshot, name="journal-snapshot", daemon=True).start()
+
+    def changes_since(self, version: int) -> Tuple[int, List[Tuple[str, Optional[Dict]]]]:
+        return version, []
+
+    def put(self, booking: Dict):
+        self._append({"op": "put", "booking": booking, "counter": self._counter})
+
+    def delete(self, booking_id: str):
+        self._append({"op": "delete", "booking_id": booking_id})
+
+    def next_booking_number(self) -> int:
+        with self._lock:
+            self._counter += 1
+            return self._counter
+
+    def skip_booking_numbers(self, up_to: int):
+        with self._lock:
+            self._counter = max(self._counter, up_to)
+
+    def recover(self, snapshot_source: Callable[[], List[Dict]]) -> List[Dict]:
+        """Load the latest snapshot, replay the journal tail and start appending"""
+        started = time.perf_counter()
+        self._snapshot_source = snapshot_source
+        bookings: Dict[str, Dict] = {}
+        snapshot_seq = 0
+
+        snapshots = _numbered(self.directory, "snapshot")
+        if snapshots:
+            snapshot_seq, path = snapshots[-1]
+            with open(path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+            self._counter = snapshot["counter"]
+            bookings = {booking["booking_id"]: booking for booking in snapshot["bookings"]}
+
+        last_seq, replayed = snapshot_seq, 0
+        for first_seq, path in _numbered(self.directory, "journal"):
+            for entry in _read_segment(path):
+                if entry["seq"] <= snapshot_seq:
+                    continue
+                if entry["op"] == "put":
+                    bookings[entry["booking"]["booking_id"]] = entry["booking"]
+                    self._counter = max(self._counter, entry.get("counter", 0))
+                else:
+                    bookings.pop(entry["booking_id"], None)
+                last_seq = entry["seq"]
+                replayed += 1
+
+        self._since_snapshot = replayed
+        self._journal = Journal(self.directory, last_seq + 1, self.commit_interval, self.fsync)
+        self.recovery = {
+            "snapshot_seq": snapshot_seq,
+            "replayed": replayed,
+            "bookings": len(bookings),
+            "seconds": round(time.perf_counter() - started, 4)
+        }
+        return list(bookings.values())
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+
+    def _append(self, entry: Dict):
+        with self._lock:
+            seq = self._require_journal().append(entry)
+            self._since_snapshot += 1
+        if getattr(self._local, "depth", 0) == 0:
+            self._journal.wait_durable(seq)
+        else:
+            self._local.last_seq = seq
+
+    def _require_journal(self) -> Journal:
+        if self._journal is None:
+            # Nothing recovered yet (e.g. the store is used without an API); start empty
+            self.recover(self._snapshot_source or (lambda: []))
+        return self._journal
+
+    def _maybe_start_snapshot(self) -> Optional[Tuple]:
+        """Under the lock: capture the state and rotate the log once enough entries piled up"""
+        if self._snapshotting or self._since_snapshot < self.snapshot_every or self._snapshot_source is None:
+            return None
+        self._snapshotting = True
+        bookings = self._snapshot_source()
+        seq = self._journal.rotate()
+        self._since_snapshot = 0
+        return seq, self._counter, bookings
+
+    def _write_snapshot(self, seq: int, counter: int, bookings: List[Dict]):
+        """Write snapshot-<seq> atomically, then drop older snapshots and covered segments"""
+        try:
+            path = os.path.join(self.directory, f"snapshot-{seq:012d}.json")
+            temporary = path + ".tmp"
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump({"seq": seq, "counter": counter, "bookings": bookings}, f)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            os.replace(temporary, path)
+            _fsync_directory(self.directory)
+
+            for old_seq, old_path in _numbered(self.directory, "snapshot"):
+                if old_seq < seq:
+                    os.remove(old_path)
+            for first_seq, old_path in _numbered(self.directory, "journal"):
+                if first_seq <= seq:
+                    os.remove(old_path)
+        except OSError as e:
+            print(f"⚠️ Warning: Could not write booking snapshot: {e}")
+        finally:
+            self._snapshotting = False
@@ -0,0 +1,363 @@
+"""
+Utilization and demand analytics over bookings
+Bookings are loaded into columnar NumPy arrays sorted by day, so a date range
+is a binary search and every metric is a handful of vectorized passes instead
+of a loop over booking dicts. Archived (past) bookings are read into columns
+once per archive change and combined with the hot ones. Results are cached
+per (metric, date range) and reused until the next booking change.
+"""
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from ..clinic_clock import clinic_today
+from ..api.calendly_integration import (
+    APPOINTMENT_DURATIONS,
+    BUSINESS_HOURS,
+    MockCalendlyAPI,
+    calendly_api
+)
+from ..api.capacity import TICK_MINUTES, TICKS_PER_DAY, CapacityModel
+from ..models.records import BookingRecord, parse_date
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+# Lead-time histogram bin edges in days (the last bin is open ended)
+LEAD_TIME_BINS = [0, 1, 2, 3, 7, 14, 30, 60, 90, 180, 365]
+
+# Default range: the last 90 days plus the next 30
+DEFAULT_PAST_DAYS = 90
+DEFAULT_AHEAD_DAYS = 30
+
+# Longest range a request may ask for; the per-day arrays grow with it
+MAX_RANGE_DAYS = 5 * 366
+
+class BookingColumns:
+    """One array per booking attribute, sorted by day"""
+
+    def __init__(self, records: Iterable[BookingRecord], appointment_types: Iterable[str]):
+        records = list(records)
+        self.types = list(appointment_types)
+        codes = {appointment_type: code for code, appointment_type in enumerate(self.types)}
+        for record in records:
+            if record.appointment_type not in codes:
+                codes[record.appointment_type] = len(self.types)
+                self.types.append(record.appointment_type)
+
+        count = len(records)
+        day = np.fromiter((record.day for record in records), np.int32, count)
+        order = np.argsort(day, kind="stable")
+        self.day = day[order]
+        self.start = np.fromiter((record.start for record in records), np.int32, count)[order]
+        self.duration = np.fromiter((record.duration for record in records), np.int32, count)[order]
+        self.type_code = np.fromiter((codes[record.appointment_type] for record in records), np.int16, count)[order]
+        # Minute stamp the booking was made, -1 if unknown
+        created = (-1 if record.created is None else record.created for record in records)
+        self.created = np.fromiter(created, np.int64, count)[order]
+
+    @classmethod
+    def combine(cls, parts: List["BookingColumns"]) -> "BookingColumns":
+        """One set of columns holding the rows of several (type codes remapped)"""
+        combined = cls([], [t for part in parts for t in part.types])
+        combined.types = list(dict.fromkeys(combined.types))
+        codes = [np.array([combined.types.index(t) for t in part.types], dtype=np.int16) for part in parts]
+        day = np.concatenate([part.day for part in parts])
+        order = np.argsort(day, kind="stable")
+        combined.day = day[order]
+        combined.start = np.concatenate([part.start for part in parts])[order]
+        combined.duration = np.concatenate([part.duration for part in parts])[order]
+        combined.type_code = np.concatenate([code[part.type_code] for code, part in zip(codes, parts)])[order]
+        combined.created = np.concatenate([part.created for part in parts])[order]
+        return combined
+
+    def span(self, first: int, last: int) -> slice:
+        """Rows booked between two day ordinals (inclusive)"""
+        return slice(
+            int(np.searchsorted(self.day, first, side="left")),
+            int(np.searchsorted(self.day, last, side="right"))
+        )
+
+def _ticks(columns: BookingColumns, rows: slice) -> Tuple[np.ndarray, np.ndarray]:
+    """Expand bookings into the 15-minute ticks they occupy: (row, tick of day) per tick"""
+    start = columns.start[rows]
+    first = start // TICK_MINUTES
+    count = -(-(start + columns.duration[rows]) // TICK_MINUTES) - first
+    row = np.repeat(np.arange(len(start)), count)
+    offset = np.arange(len(row)) - np.repeat(np.cumsum(count) - count, count)
+    return row, first[row] + offset
+
+def _units(columns: BookingColumns, capacity: CapacityModel, resource: str) -> np.ndarray:
+    """Units of a resource each appointment type holds, indexed by type code"""
+    return np.array([dict(capacity.needs(t)).get(resource, 0) for t in columns.types], dtype=np.float64)
+
+def _open_minutes() -> np.ndarray:
+    """Bookable minutes in each hour of the day"""
+    hours = np.arange(24) * 60
+    opens, closes = BUSINESS_HOURS["start"] * 60, BUSINESS_HOURS["end"] * 60
+    return np.clip(np.minimum(hours + 60, closes) - np.maximum(hours, opens), 0, 60)
+
+def utilization_heatmap(columns: BookingColumns, capacity: CapacityModel, first: int, last: int) -> Dict:
+    """
+    Share of each resource in use by weekday and hour over a date range
+
+    Returns:
+        {"weekdays", "hours", "utilization": {resource: [[share per hour] per weekday]}};
+        a weekday that doesn't occur in the range has None for every hour
+    """
+    rows = columns.span(first, last)
+    row, tick = _ticks(columns, rows)
+    day = columns.day[rows][row]
+    cell = ((day - 1) % 7) * 24 + tick * TICK_MINUTES // 60
+    code = columns.type_code[rows][row]
+
+    open_minutes = _open_minutes()
+    hours = np.flatnonzero(open_minutes)
+    weekday_count = np.bincount((np.arange(first, last + 1) - 1) % 7, minlength=7)
+
+    utilization = {}
+    for resource, units in capacity.resources.items():
+        used = np.bincount(cell, weights=_units(columns, capacity, resource)[code] * TICK_MINUTES, minlength=7 * 24)
+        available = np.outer(weekday_count, open_minutes) * units
+        share = np.divide(used.reshape(7, 24), available, out=np.zeros((7, 24)), where=available > 0)
+        utilization[resource] = [
+            [round(float(share[weekday, hour]), 4) for hour in hours] if weekday_count[weekday] else [None] * len(hours)
+            for weekday in range(7)
+        ]
+    return {"weekdays": WEEKDAYS, "hours": [int(hour) for hour in hours], "utilization": utilization}
+
+def lead_time_histogram(
+    columns: BookingColumns,
+    first: int,
+    last: int,
+    appointment_type: Optional[str] = None,
+    bins: List[int] = LEAD_TIME_BINS
+) -> Dict:
+    """
+    Distribution of days between making a booking and the appointment
+
+    Bookings without a creation time or made after the appointment (imported
+    history) are counted as excluded.
+    """
+    rows = columns.span(first, last)
+    created = columns.created[rows]
+    known = created >= 0
+    if appointment_type is not None:
+        code = columns.types.index(appointment_type) if appointment_type in columns.types else -1
+        selected = columns.type_code[rows] == code
+        known &= selected
+        total = int(selected.sum())
+    else:
+        total = len(created)
+
+    appointment = columns.day[rows].astype(np.int64) * 1440 + columns.start[rows]
+    lead = (appointment[known] - created[known]) / 1440
+    lead = lead[lead >= 0]
+    counts, _ = np.histogram(lead, bins=[*bins, np.inf])
+
+    return {
+        "appointment_type": appointment_type,
+        "bookings": int(len(lead)),
+        "excluded": total - int(len(lead)),
+        "mean_days": round(float(lead.mean()), 2) if len(lead) else None,
+        "median_days": round(float(np.median(lead)), 2) if len(lead) else None,
+        "p90_days": round(float(np.percentile(lead, 90)), 2) if len(lead) else None,
+        "bins": [
+            {"min_days": low, "max_days": high, "count": int(count)}
+            for low, high, count in zip(bins, [*bins[1:], None], counts)
+        ]
+    }
+
+def demand_vs_capacity(
+    columns: BookingColumns,
+    capacity: CapacityModel,
+    first: int,
+    last: int,
+    slot_starts: Callable[[str], range]
+) -> Dict[str, Dict]:
+    """
+    Booked demand against bookable capacity per appointment type
+
+    For each type: bookings and minutes booked, slots an empty calendar would
+    offer, slots still open given every booking's resource use, and days with
+    no open slot left (demand the calendar turned away).
+    """
+    rows = columns.span(first, last)
+    days = last - first + 1
+    row, tick = _ticks(columns, rows)
+    code = columns.type_code[rows]
+    position = (columns.day[rows][row] - first) * TICKS_PER_DAY + tick
+
+    # Units in use per resource, day and tick
+    occupancy = {
+        resource: np.bincount(
+            position, weights=_units(columns, capacity, resource)[code[row]], minlength=days * TICKS_PER_DAY
+        ).reshape(days, TICKS_PER_DAY)
+        for resource in capacity.resources
+    }
+
+    result = {}
+    for type_code, appointment_type in enumerate(columns.types):
+        booked = code == type_code
+        starts = slot_starts(appointment_type) if appointment_type in APPOINTMENT_DURATIONS else range(0)
+        open_per_day = np.zeros(days, dtype=np.int64)
+        for start in starts:
+            begin, end = start // TICK_MINUTES, -(-(start + APPOINTMENT_DURATIONS[appointment_type]) // TICK_MINUTES)
+            fits = np.ones(days, dtype=bool)
+            for resource, units in capacity.needs(appointment_type):
+                peak = occupancy[resource][:, begin:end].max(axis=1)
+                fits &= peak + units <= capacity.limit(resource, appointment_type)
+            open_per_day += fits
+        bookable = days * len(starts)
+        result[appointment_type] = {
+            "booked": int(booked.sum()),
+            "booked_minutes": int(columns.duration[rows][booked].sum()),
+            "bookable_slots": bookable,
+            "open_slots": int(open_per_day.sum()),
+            "fill_rate": round(1 - float(open_per_day.sum()) / bookable, 4) if bookable else None,
+            "full_days": int((open_per_day == 0).sum()) if bookable else 0
+        }
+    return result
+
+def waitlisted_by_type(entries: Iterable[Dict], first: int, last: int) -> Dict[str, int]:
+    """Patients still waiting for a slot in the range, per appointment type (unmet demand)"""
+    counts: Dict[str, int] = {}
+    for entry in entries:
+        if entry["status"] != "waiting":
+            continue
+        if parse_date(entry["end_date"]) < first or parse_date(entry["start_date"]) > last:
+            continue
+        counts[entry["appointment_type"]] = counts.get(entry["appointment_type"], 0) + 1
+    return counts
+
+def date_range(start_date: Optional[str], end_date: Optional[str]) -> Tuple[int, int]:
+    """Day ordinals of an inclusive range (the last 90 and next 30 days by default)"""
+    today = clinic_today()
+    last = parse_date(end_date) if end_date else (today + timedelta(days=DEFAULT_AHEAD_DAYS)).toordinal()
+    first = parse_date(start_date) if start_date else min(last, (today - timedelta(days=DEFAULT_PAST_DAYS)).toordinal())
+    if last < first:
+        raise ValueError("end_date must not be before start_date")
+    if last - first >= MAX_RANGE_DAYS:
+        raise ValueError(f"Date range may span at most {MAX_RANGE_DAYS} days")
+    return first, last
+
+class BookingAnalytics:
+    """Metrics over one API's bookings, cached until the next booking change"""
+
+    def __init__(self, api: MockCalendlyAPI, cache_size: int = 128):
+        self.api = api
+        self.cache_size = cache_size
+        self._columns: Optional[BookingColumns] = None
+        self._version: Optional[Tuple] = None
+        # Columns of the archived bookings and the archive state they were read at
+        self._cold: Optional[BookingColumns] = None
+        self._cold_version: Optional[Tuple] = None
+        self._results: "OrderedDict[Tuple, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def heatmap(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> Dict:
+        first, last = date_range(start_date, end_date)
+        return self._cached(
+            ("heatmap", first, last),
+            lambda columns: utilization_heatmap(columns, self.api.capacity, first, last)
+        )
+
+    def lead_times(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        appointment_type: Optional[str] = None
+    ) -> Dict:
+        first, last = date_range(start_date, end_date)
+        return self._cached(
+            ("lead_times", first, last, appointment_type),
+            lambda columns: lead_time_histogram(columns, first, last, appointment_type)
+        )
+
+    def demand(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        waitlist: Iterable[Dict] = ()
+    ) -> Dict:
+        """Demand vs capacity per type, with waitlisted patients as unmet demand"""
+        first, last = date_range(start_date, end_date)
+        by_type = self._cached(
+            ("demand", first, last),
+            lambda columns: demand_vs_capacity(columns, self.api.capacity, first, last, self.api._slot_starts)
+        )
+        waiting = waitlisted_by_type(waitlist, first, last)
+        return {
+            appointment_type: {**stats, "waitlisted": waiting.get(appointment_type, 0)}
+            for appointment_type, stats in by_type.items()
+        }
+
+    def _cached(self, key: Tuple, compute: Callable[[BookingColumns], Dict]) -> Dict:
+        sequence, records = self.api.snapshot_records()
+        archive = self.api.archive.version() if self.api.archive else ()
+        version = (sequence, archive)
+        with self._lock:
+            if version != self._version:
+                if archive != self._cold_version:
+                    archived = (BookingRecord.from_dict(booking) for booking in self.api.archive.iter_bookings()) if archive else ()
+                    self._cold = BookingColumns(archived, APPOINTMENT_DURATIONS)
+                    self._cold_version = archive
+                self._columns = BookingColumns.combine([BookingColumns(records, APPOINTMENT_DURATIONS), self._cold])
+                self._version = version
+                self._results.clear()
+            elif key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+            columns = self._columns
+
+        result = compute(columns)
+        with self._lock:
+            if version == self._version:
+                self._results[key] = result
+                while len(self._results) > self.cache_size:
+                    self._results.popitem(last=False)
+        return result
+
+def _range_dict(start_date: Optional[str], end_date: Optional[str]) -> Dict:
+    first, last = date_range(start_date, end_date)
+    return {"start_date": date.fromordinal(first).isoformat(), "end_date": date.fromordinal(last).isoformat()}
+
+analytics = BookingAnalytics(calendly_api)
+
+def report(metric: str, start_date: Optional[str] = None, end_date: Optional[str] = None, **options) -> Dict:
+    """One metric over the in-process bookings, in the shape the API returns"""
+    if metric == "heatmap":
+        data = analytics.heatmap(start_date, end_date)
+    elif metric == "lead-times":
+        data = analytics.lead_times(start_date, end_date, options.get("appointment_type"))
+    elif metric == "demand":
+        data = analytics.demand(start_date, end_date, options.get("waitlist", ()))
+    else:
+        raise ValueError(f"Unknown metric '{metric}'")
+    return {**_range_dict(start_date, end_date), metric.replace("-", "_"): data}
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Utilization, lead-time and demand analytics over bookings")
+    parser.add_argument("metric", choices=["heatmap", "lead-times", "demand"])
+    parser.add_argument("--start-date")
+    parser.add_argument("--end-date")
+    parser.add_argument("--appointment-type", help="lead-times: only this appointment type")
+    parser.add_argument("--url", help="Query a running server instead of the local booking store")
+    args = parser.parse_args()
+
+    if args.url:
+        import httpx
+        params = {
+            key: value for key, value in
+            {"start_date": args.start_date, "end_date": args.end_date, "appointment_type": args.appointment_type}.items()
+            if value
+        }
+        response = httpx.get(f"{args.url.rstrip('/')}/api/analytics/{args.metric}", params=params, timeout=None)
+        response.raise_for_status()
+        output = response.json()
+    else:
+        output = report(args.metric, args.start_date, args.end_date, appointment_type=args.appointment_type)
+    print(json.dumps(output, indent=2))
@@ -1,10 +1,18 @@
 """
 Tool for checking appointment availability
 """
-from typing import List, Dict
-from datetime import datetime, date, timedelta
+from typing import List, Dict, Optional, Tuple
+from datetime import date, timedelta
 from ..api.calendly_integration import calendly_api
+from ..clinic_clock import clinic_today
 from ..models.schemas import AppointmentType
+from ..models.records import format_time
+from ..singleflight import SingleFlight
+from .date_resolver import resolve
+
+# Identical concurrent lookups (e.g. many patients asking for the next consultation) share one computation
+_availability_flight = SingleFlight("check_availability")
+_suggestion_flight = SingleFlight("suggest_slots")
 
 def check_availability(
     appointment_type: AppointmentType = "consultation",
@@ -20,34 +28,36 @@ def check_availability(
         days_ahead: Number of days to check ahead
     
     Returns:
-        Dictionary with availability information
+        Dictionary with availability information (shared by coalesced callers, don't mutate)
     """
+    key = (appointment_type, target_date, None if target_date else days_ahead)
+    return _availability_flight.do(key, lambda: _check_availability(appointment_type, target_date, days_ahead))
+
+def _check_availability(appointment_type: AppointmentType, target_date: str, days_ahead: int) -> Dict:
     if target_date:
         # Check specific date
-        availability = calendly_api.get_available_slots(target_date, appointment_type)
+        duration = get_appointment_duration(appointment_type)
         return {
             "date": target_date,
             "available_slots": [
                 {
-                    "time": slot.start_time,
-                    "duration_minutes": get_appointment_duration(appointment_type)
+                    "time": format_time(start),
+                    "duration_minutes": duration
                 }
-                for slot in availability.available_slots
+                for start in calendly_api.get_free_starts(target_date, appointment_type)
             ]
         }
     else:
         # Check next N days
-        today = date.today()
+        today = clinic_today()
         results = {}
         
         for i in range(days_ahead):
             check_date = (today + timedelta(days=i)).strftime("%Y-%m-%d")
-            availability = calendly_api.get_available_slots(check_date, appointment_type)
+            free_starts = calendly_api.get_free_starts(check_date, appointment_type)
             
-            if availability.available_slots:
-                results[check_date] = [
-                    slot.start_time for slot in availability.available_slots
-                ]
+            if free_starts:
+                results[check_date] = [format_time(start) for start in free_starts]
         
         return {
             "available_dates": results,
@@ -75,85 +85,119 @@ def suggest_slots(
     
     Args:
         preferences: Dict with keys like 'time_preference' (morning/afternoon/evening),
-                     'date_preference' (asap/specific_date)
+                     'date_preference' (asap, YYYY-MM-DD or a phrase such as "next tuesday afternoon"),
+                     or an already resolved 'start_date'/'end_date' and 'time_window'
         appointment_type: Type of appointment
         days_ahead: Number of days to check
     
     Returns:
-        List of suggested slots with explanations
+        List of suggested slots with explanations (shared by coalesced callers, don't mutate)
     """
-    today = date.today()
-    suggestions = []
-    
+    start_date, end_date, time_window = resolve_preference_window(preferences, days_ahead, appointment_type)
     time_pref = preferences.get("time_preference", "").lower()
-    date_pref = preferences.get("date_preference", "asap")
+    key = (appointment_type, start_date, end_date, time_window, time_pref)
+    return _suggestion_flight.do(
+        key, lambda: _suggest_slots(appointment_type, start_date, end_date, time_window, time_pref)
+    )
+
+def resolve_preference_window(
+    preferences: Dict,
+    days_ahead: int = 7,
+    appointment_type: AppointmentType = "consultation"
+) -> Tuple[date, date, Optional[Tuple[int, int]]]:
+    """
+    First and last day to search and the (start, end) minute window for slot starts
+    
+    Phrases are resolved relative to today in the clinic timezone; without a
+    date the window is days_ahead days from the next available slot.
+    """
+    today = clinic_today()
+    start_date = end_date = None
+    time_window = preferences.get("time_window")
     
-    # Parse date preference
-    target_date = None
-    if date_pref != "asap":
-        # Try to parse specific date
-        try:
-            target_date = datetime.strptime(date_pref, "%Y-%m-%d").date()
-        except:
-            pass
+    if preferences.get("start_date"):
+        start_date = date.fromisoformat(preferences["start_date"])
+        end_date = date.fromisoformat(preferences.get("end_date") or preferences["start_date"])
+    else:
+        date_pref = preferences.get("date_preference") or "asap"
+        if date_pref != "asap":
+            resolved = resolve(date_pref, today)
+            if resolved.get("start_date"):
+                start_date = date.fromisoformat(resolved["start_date"])
+                end_date = date.fromisoformat(resolved["end_date"])
+            if time_window is None:
+                time_window = resolved.get("time_window")
     
-    # Get availability
-    if target_date:
-        availability = calendly_api.get_available_slots(
-            target_date.strftime("%Y-%m-%d"),
-            appointment_type
-        )
-        
-        # Filter by time preference
-        filtered_slots = filter_slots_by_preference(
-            availability.available_slots,
-            time_pref
+    if start_date is None:
+        # Skip fully booked days using the next-available index instead of ranking them
+        start_date = today
+        first = calendly_api.get_next_available(appointment_type)
+        if first:
+            start_date = max(today, date.fromisoformat(first["date"]))
+        end_date = start_date + timedelta(days=days_ahead - 1)
+    start_date = max(start_date, today)
+    end_date = max(end_date, start_date)
+    return start_date, end_date, tuple(time_window) if time_window else None
+
+def _suggest_slots(
+    appointment_type: AppointmentType,
+    start_date: date,
+    end_date: date,
+    time_window: Optional[Tuple[int, int]],
+    time_pref: str
+) -> List[Dict]:
+    suggestions = []
+    num_days = min((end_date - start_date).days + 1, 31)
+    max_per_day = 5 if num_days == 1 else 2
+    
+    from .slot_ranking import rank_slots
+    
+    # Rank slots by fragmentation, preference match and earliness
+    ranked = rank_slots(
+        appointment_type, time_pref, start_date=start_date, num_days=num_days,
+        top_k=5, max_per_day=max_per_day, time_window=time_window
+    )
+    if not ranked and time_window:
+        # Nothing starts inside the exact window; offer the closest alternatives those days
+        ranked = rank_slots(
+            appointment_type, time_pref, start_date=start_date, num_days=num_days,
+            top_k=5, max_per_day=max_per_day
         )
-        
-        for slot in filtered_slots[:5]:  # Top 5
+    
+    if num_days == 1:
+        for slot in ranked:
             suggestions.append({
-                "date": target_date.strftime("%Y-%m-%d"),
-                "time": slot.start_time,
+                "date": slot["date"],
+                "time": slot["time"],
                 "reason": f"Matches your preference for {time_pref if time_pref else 'any time'}"
             })
     else:
-        # Check next few days
-        for i in range(min(days_ahead, 14)):
-            check_date = (today + timedelta(days=i))
-            date_str = check_date.strftime("%Y-%m-%d")
-            
-            availability = calendly_api.get_available_slots(date_str, appointment_type)
-            
-            filtered_slots = filter_slots_by_preference(
-                availability.available_slots,
-                time_pref
-            )
-            
-            for slot in filtered_slots[:2]:  # 2 slots per day
-                day_name = check_date.strftime("%A")
-                suggestions.append({
-                    "date": date_str,
-                    "day": day_name,
-                    "time": slot.start_time,
-                    "reason": f"{day_name} {slot.start_time} - {get_time_description(slot.start_time, time_pref)}"
-                })
-                
-                if len(suggestions) >= 5:
-                    break
-            
-            if len(suggestions) >= 5:
-                break
+        for slot in ranked:
+            suggestions.append({
+                "date": slot["date"],
+                "day": slot["day"],
+                "time": slot["time"],
+                "reason": f"{slot['day']} {slot['time']} - {get_time_description(slot['time'], time_pref)}"
+            })
     
     return suggestions
 
+MORNING_CUTOFF = 12
+AFTERNOON_CUTOFF = 17
+
+def get_time_bucket(hour: int) -> str:
+    """Map an hour of the day to its time-of-day bucket"""
+    if hour < MORNING_CUTOFF:
+        return "morning"
+    if hour < AFTERNOON_CUTOFF:
+        return "afternoon"
+    return "evening"
+
 def filter_slots_by_preference(slots, time_pref: str) -> List:
     """Filter slots based on time preference"""
     if not time_pref:
         return slots
     
-    morning_cutoff = 12
-    afternoon_cutoff = 17
-    
     filtered = []
     for slot in slots:
         if not slot.available:
@@ -161,11 +205,7 @@ def filter_slots_by_preference(slots, time_pref: str) -> List:
             
         hour = int(slot.start_time.split(":")[0])
         
-        if "morning" in time_pref and hour < morning_cutoff:
-            filtered.append(slot)
-        elif "afternoon" in time_pref and morning_cutoff <= hour < afternoon_cutoff:
-            filtered.append(slot)
-        elif "evening" in time_pref and hour >= afternoon_cutoff:
+        if get_time_bucket(hour) in time_pref:
             filtered.append(slot)
     
     return filtered if filtered else slots
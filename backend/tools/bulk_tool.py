@@ -0,0 +1,281 @@
+"""
+Tool for bulk importing and exporting bookings
+Everything works on iterators so large histories are never held in memory
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from ..api.calendly_integration import calendly_api
+from ..models.schemas import BookingRequest
+
+CSV_FIELDS = [
+    "booking_id",
+    "appointment_type",
+    "date",
+    "start_time",
+    "duration_minutes",
+    "patient_name",
+    "patient_email",
+    "patient_phone",
+    "reason",
+    "status"
+]
+
+DEFAULT_CHUNK_SIZE = 500
+# Per-row errors kept in an import summary; the failed count covers them all
+MAX_REPORTED_ERRORS = 100
+
+def read_rows(path: str) -> Iterator[Tuple[int, Dict]]:
+    """
+    Read booking rows from a JSONL or CSV file
+
+    Yields:
+        (line_number, row) tuples
+    """
+    with open(path, "r", newline="") as f:
+        yield from iter_rows(f, "csv" if path.lower().endswith(".csv") else "jsonl")
+
+def iter_rows(lines: Iterable[str], fmt: str = "jsonl") -> Iterator[Tuple[int, Dict]]:
+    """
+    Parse booking rows from JSONL or CSV text, read lazily line by line
+
+    CSV text should be read with newline="" so quoted fields may span lines;
+    such a row is numbered by its last line.
+
+    Yields:
+        (line_number, row) tuples
+    """
+    if fmt != "csv":
+        for line_number, line in enumerate(lines, start=1):
+            if line.strip():
+                yield line_number, parse_json_line(line)
+        return
+
+    reader = csv.DictReader(lines, strict=True)
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            # e.g. the text ended inside a quoted field; reported like any bad row
+            yield reader.reader.line_num, {"_error": f"Invalid CSV: {e}"}
+            continue
+        yield reader.line_num, row
+
+def parse_json_line(line: str) -> Dict:
+    """Parse one JSONL line, keeping bad lines as rows that fail validation"""
+    try:
+        row = json.loads(line)
+    except json.JSONDecodeError as e:
+        return {"_error": f"Invalid JSON: {e}"}
+    return row if isinstance(row, dict) else {"_error": "Expected a JSON object"}
+
+def _to_booking_request(row: Dict) -> BookingRequest:
+    """Convert a flat (CSV) or nested (JSONL) row into a validated BookingRequest"""
+    if "_error" in row:
+        raise ValueError(row["_error"])
+
+    patient = row.get("patient") or {
+        "name": row.get("patient_name"),
+        "email": row.get("patient_email"),
+        "phone": row.get("patient_phone")
+    }
+
+    booking_request = BookingRequest(
+        appointment_type=row.get("appointment_type"),
+        date=row.get("date"),
+        start_time=row.get("start_time"),
+        patient=patient,
+        reason=row.get("reason") or None
+    )
+
+    # BookingRequest keeps dates and times as strings, so check their format here
+    datetime.strptime(booking_request.date, "%Y-%m-%d")
+    datetime.strptime(booking_request.start_time, "%H:%M")
+
+    return booking_request
+
+def import_chunk(rows: List[Tuple[int, Dict]]) -> Iterator[Dict]:
+    """
+    Validate and commit one chunk of rows
+
+    Yields:
+        One result dict per row with its line number
+    """
+    valid = []
+    for line_number, row in rows:
+        try:
+            valid.append((line_number, _to_booking_request(row)))
+        except ValidationError as e:
+            yield {"line": line_number, "success": False, "error": _format_validation_error(e)}
+        except (ValueError, TypeError) as e:
+            yield {"line": line_number, "success": False, "error": str(e)}
+
+    if not valid:
+        return
+
+    results = calendly_api.bulk_book([booking_request for _, booking_request in valid])
+    for (line_number, _), result in zip(valid, results):
+        yield {"line": line_number, **result}
+
+def iter_import_results(rows: Iterable[Tuple[int, Dict]], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict]:
+    """
+    Import rows in chunks, yielding a result per row as each chunk is committed
+    """
+    chunk = []
+    for item in rows:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield from import_chunk(chunk)
+            chunk = []
+    if chunk:
+        yield from import_chunk(chunk)
+
+def import_bookings(rows: Iterable[Tuple[int, Dict]], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict:
+    """
+    Import rows and summarize the outcome
+
+    Returns:
+        Dictionary with counts and the first MAX_REPORTED_ERRORS per-row errors
+    """
+    summary = {"total": 0, "imported": 0, "failed": 0, "errors": []}
+    for result in iter_import_results(rows, chunk_size):
+        _add_result(summary, result)
+    return summary
+
+def _add_result(summary: Dict, result: Dict):
+    """Count one import result into a summary, keeping at most MAX_REPORTED_ERRORS errors"""
+    summary["total"] += 1
+    if result["success"]:
+        summary["imported"] += 1
+        return
+    summary["failed"] += 1
+    if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+        summary["errors"].append({"line": result["line"], "error": result["error"]})
+
+def load_existing_appointments(schedule_path: str) -> Dict:
+    """
+    Import the existing_appointments array from doctor_schedule.json
+    """
+    with open(schedule_path, "r") as f:
+        schedule = json.load(f)
+
+    appointments = schedule.get("existing_appointments", [])
+    return import_bookings(enumerate(appointments, start=1))
+
+def _format_validation_error(error: ValidationError) -> str:
+    """Collapse a pydantic error into a single readable line"""
+    return "; ".join(
+        f"{'.'.join(map(str, item['loc']))}: {item['msg']}" for item in error.errors()
+    )
+
+def _flatten(booking: Dict) -> Dict:
+    """Flatten a booking into CSV columns"""
+    patient = booking.get("patient", {})
+    return {
+        "booking_id": booking["booking_id"],
+        "appointment_type": booking["appointment_type"],
+        "date": booking["date"],
+        "start_time": booking["start_time"],
+        "duration_minutes": booking["duration_minutes"],
+        "patient_name": patient.get("name"),
+        "patient_email": patient.get("email"),
+        "patient_phone": patient.get("phone"),
+        "reason": booking.get("reason") or "",
+        "status": booking["status"]
+    }
+
+def iter_export(
+    fmt: str = "jsonl",
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+) -> Iterator[str]:
+    """
+    Stream bookings as JSONL or CSV text, one line at a time
+    """
+    bookings = calendly_api.iter_bookings(start_date, end_date)
+
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for booking in bookings:
+            writer.writerow(_flatten(booking))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        # Header only when there are no bookings
+        if buffer.getvalue():
+            yield buffer.getvalue()
+    else:
+        for booking in bookings:
+            yield json.dumps(booking) + "\n"
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point: import or export bookings"""
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Bulk import/export of appointment bookings")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="Import bookings from a JSONL or CSV file")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--url", help="Stream the file to a running server instead of importing locally")
+    import_parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+
+    export_parser = subparsers.add_parser("export", help="Export bookings as JSONL or CSV")
+    export_parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    export_parser.add_argument("--start-date")
+    export_parser.add_argument("--end-date")
+    export_parser.add_argument("--output", help="Output file (defaults to stdout)")
+    export_parser.add_argument("--url", help="Export from a running server instead of the local process")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        if args.url:
+            import httpx
+            fmt = "csv" if args.path.lower().endswith(".csv") else "jsonl"
+            with open(args.path, "rb") as f:
+                response = httpx.post(
+                    f"{args.url.rstrip('/')}/api/calendly/import",
+                    params={"format": fmt, "chunk_size": args.chunk_size},
+                    content=iter(lambda: f.read(64 * 1024), b""),
+                    timeout=None
+                )
+            response.raise_for_status()
+            summary = response.json()
+        else:
+            summary = import_bookings(read_rows(args.path), args.chunk_size)
+
+        for error in summary["errors"]:
+            print(f"Line {error['line']}: {error['error']}", file=sys.stderr)
+        print(f"Imported {summary['imported']} of {summary['total']} rows ({summary['failed']} failed)")
+    else:
+        out = open(args.output, "w", newline="") if args.output else sys.stdout
+        try:
+            if args.url:
+                import httpx
+                params = {"format": args.format}
+                if args.start_date:
+                    params["start_date"] = args.start_date
+                if args.end_date:
+                    params["end_date"] = args.end_date
+                with httpx.stream("GET", f"{args.url.rstrip('/')}/api/calendly/export", params=params, timeout=None) as response:
+                    response.raise_for_status()
+                    for text in response.iter_text():
+                        out.write(text)
+            else:
+                for line in iter_export(args.format, args.start_date, args.end_date):
+                    out.write(line)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Natural-language date and time resolver
+Turns phrases like "tomorrow", "next Tuesday afternoon", "3/14", "this week"
+or "after 3pm" into a concrete date range and time window relative to the
+clinic's local date, so slot suggestions query the right days without an
+extra round trip to the model.
+"""
+import re
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+from ..clinic_clock import clinic_today
+
+# Minutes from midnight; the clinic closes at 17:00 so "evening" is the tail of the day
+TIME_WINDOWS = {
+    "morning": (0, 12 * 60),
+    "afternoon": (12 * 60, 17 * 60),
+    "evening": (17 * 60, 24 * 60)
+}
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MONTHS = [
+    "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december"
+]
+
+# Full names plus abbreviations that aren't everyday words ("sat", "sun", "mar")
+_WEEKDAY = "(" + "|".join(WEEKDAYS + ["mon", "tue", "tues", "wed", "thu", "thur", "thurs", "fri"]) + ")"
+_MONTH = "(" + "|".join(MONTHS + ["jan", "feb", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec"]) + r")\.?"
+_CLOCK = r"(\d{1,2})(?::(\d{2}))?\s*(am|pm|a\.m\.|p\.m\.)?"
+
+_ISO_DATE = re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b")
+_NUMERIC_DATE = re.compile(r"\b(\d{1,2})/(\d{1,2})(?:/(\d{2,4}))?\b")
+_MONTH_DAY = re.compile(rf"\b{_MONTH}\s+(\d{{1,2}})(?:st|nd|rd|th)?\b")
+_DAY_MONTH = re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?{_MONTH}")
+_RELATIVE_WEEKDAY = re.compile(rf"\b(?:(this|next|coming)\s+)?{_WEEKDAY}\b")
+_IN_PERIOD = re.compile(r"\b(?:in|within)\s+(?:the\s+next\s+)?(\d+|a|an|one|two|three|four)\s+(day|week)s?\b")
+_BETWEEN = re.compile(rf"\bbetween\s+{_CLOCK}\s+(?:and|-)\s+{_CLOCK}")
+_AFTER = re.compile(rf"\b(?:after|from|later than)\s+{_CLOCK}\b(?!/)")
+_BEFORE = re.compile(rf"\b(?:before|by|no later than|earlier than)\s+{_CLOCK}\b(?!/)")
+_AT = re.compile(rf"\b(?:at|around|about)\s+{_CLOCK}\b(?!\s*(?:days?|weeks?|months?|hours?|minutes?)\b)")
+_BARE_CLOCK = re.compile(r"\b(\d{1,2})(?::(\d{2}))?\s*(am|pm|a\.m\.|p\.m\.)(?!\w)")
+_COLON_CLOCK = re.compile(r"\b(\d{1,2}):(\d{2})\b()")
+_TIME_OF_DAY = re.compile(r"\b(morning|afternoon|evening|tonight|noon|midday|lunchtime)\b")
+_ASAP = re.compile(r"\b(asap|as soon as possible|soon|soonest|earliest|urgent(?:ly)?|right away)\b")
+
+_NUMBER_WORDS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4}
+
+def _weekday_index(token: str) -> int:
+    return next(i for i, name in enumerate(WEEKDAYS) if name.startswith(token[:3]))
+
+def _month_index(token: str) -> int:
+    return next(i for i, name in enumerate(MONTHS) if name.startswith(token[:3])) + 1
+
+def _clock(hour: str, minute: Optional[str], meridiem: Optional[str], default_pm: bool = True) -> Optional[int]:
+    """Minutes from midnight; bare hours 1-7 mean PM since the clinic is closed at night"""
+    hour, minute = int(hour), int(minute or 0)
+    if hour > 23 or minute > 59:
+        return None
+    if meridiem:
+        if meridiem.startswith("p") and hour < 12:
+            hour += 12
+        elif meridiem.startswith("a") and hour == 12:
+            hour = 0
+    elif default_pm and 1 <= hour <= 7:
+        hour += 12
+    return hour * 60 + minute
+
+def _future_date(today: date, month: int, day: int, year: Optional[int] = None) -> Optional[date]:
+    """A month/day without a year means its next occurrence"""
+    try:
+        if year is not None:
+            return date(year, month, day)
+        resolved = date(today.year, month, day)
+        return resolved if resolved >= today else date(today.year + 1, month, day)
+    except ValueError:
+        return None
+
+def _resolve_dates(text: str, today: date) -> Optional[Tuple[date, date, str]]:
+    """(start, end, label) of the first date expression found"""
+    match = _ISO_DATE.search(text)
+    if match:
+        try:
+            day = date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+            return day, day, "date"
+        except ValueError:
+            pass
+
+    match = _NUMERIC_DATE.search(text)
+    if match:
+        year = match.group(3)
+        if year is not None:
+            year = int(year) + (2000 if len(year) == 2 else 0)
+        day = _future_date(today, int(match.group(1)), int(match.group(2)), year)
+        if day:
+            return day, day, "date"
+
+    match = _MONTH_DAY.search(text)
+    if match:
+        day = _future_date(today, _month_index(match.group(1)), int(match.group(2)))
+        if day:
+            return day, day, "date"
+
+    match = _DAY_MONTH.search(text)
+    if match:
+        day = _future_date(today, _month_index(match.group(2)), int(match.group(1)))
+        if day:
+            return day, day, "date"
+
+    if "day after tomorrow" in text:
+        day = today + timedelta(days=2)
+        return day, day, "day after tomorrow"
+    if "tomorrow" in text:
+        day = today + timedelta(days=1)
+        return day, day, "tomorrow"
+    if re.search(r"\b(today|tonight)\b", text):
+        return today, today, "today"
+
+    match = _RELATIVE_WEEKDAY.search(text)
+    if match:
+        qualifier, weekday = match.group(1), _weekday_index(match.group(2))
+        ahead = (weekday - today.weekday()) % 7
+        if qualifier == "next":
+            # "next Tuesday" is the Tuesday of next week
+            next_monday = today + timedelta(days=7 - today.weekday())
+            day = next_monday + timedelta(days=weekday)
+        else:
+            # "Tuesday"/"this Tuesday" is the coming one, today included
+            day = today + timedelta(days=ahead)
+        return day, day, WEEKDAYS[weekday]
+
+    if re.search(r"\bnext\s+weekend\b", text):
+        saturday = today + timedelta(days=12 - today.weekday())
+        return saturday, saturday + timedelta(days=1), "next weekend"
+    if re.search(r"\bweekend\b", text):
+        if today.weekday() == 6:
+            return today, today, "this weekend"
+        saturday = today + timedelta(days=5 - today.weekday())
+        return saturday, saturday + timedelta(days=1), "this weekend"
+    if re.search(r"\bnext\s+week\b", text):
+        monday = today + timedelta(days=7 - today.weekday())
+        return monday, monday + timedelta(days=6), "next week"
+    if re.search(r"\b(this|later this|end of (the|this))\s+week\b", text):
+        return today, today + timedelta(days=6 - today.weekday()), "this week"
+    if re.search(r"\bnext\s+month\b", text):
+        first = (today.replace(day=1) + timedelta(days=32)).replace(day=1)
+        last = (first + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        return first, last, "next month"
+    if re.search(r"\bthis\s+month\b", text):
+        last = (today.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        return today, last, "this month"
+
+    match = _IN_PERIOD.search(text)
+    if match:
+        count = _NUMBER_WORDS.get(match.group(1)) or int(match.group(1))
+        days = count * (7 if match.group(2) == "week" else 1)
+        if text[match.start():match.start() + 6] == "within":
+            return today, today + timedelta(days=days), f"within {days} days"
+        day = today + timedelta(days=days)
+        return day, day, f"in {days} days"
+
+    return None
+
+def _resolve_time(text: str) -> Optional[Tuple[int, int, str]]:
+    """(start, end, label) minute window of the first time expression found"""
+    match = _BETWEEN.search(text)
+    if match:
+        end = _clock(*match.group(4, 5, 6))
+        # "between 2 and 4pm": the first hour inherits the meridiem of the second
+        start = _clock(*match.group(1, 2), match.group(3) or match.group(6))
+        if start is not None and end is not None and start < end:
+            return start, end, "between"
+
+    match = _AFTER.search(text)
+    if match:
+        start = _clock(*match.group(1, 2, 3))
+        if start is not None:
+            return start, 24 * 60, "after"
+
+    match = _BEFORE.search(text)
+    if match:
+        end = _clock(*match.group(1, 2, 3))
+        if end is not None:
+            return 0, end, "before"
+
+    match = _AT.search(text)
+    if match:
+        start = _clock(*match.group(1, 2, 3))
+        if start is not None:
+            return start, start + 60, "at"
+
+    match = _BARE_CLOCK.search(text) or _COLON_CLOCK.search(text)
+    if match:
+        start = _clock(*match.group(1, 2, 3))
+        if start is not None:
+            return start, start + 60, "at"
+
+    match = _TIME_OF_DAY.search(text)
+    if match:
+        label = match.group(1)
+        if label == "tonight":
+            label = "evening"
+        elif label in ("noon", "midday", "lunchtime"):
+            return 11 * 60, 14 * 60, "afternoon"
+        start, end = TIME_WINDOWS[label]
+        return start, end, label
+
+    return None
+
+def time_bucket(window: Tuple[int, int]) -> str:
+    """Morning/afternoon/evening bucket a time window mostly falls in"""
+    start, end = window
+    middle = (start + min(end, 17 * 60)) // 2 if start < 17 * 60 else start
+    for label, (bucket_start, bucket_end) in TIME_WINDOWS.items():
+        if bucket_start <= middle < bucket_end:
+            return label
+    return "evening"
+
+def resolve(text: str, today: Optional[date] = None) -> Dict:
+    """
+    Resolve the date range and time window a message refers to
+
+    Args:
+        text: Free-text message from the patient
+        today: Reference date (defaults to today in the clinic timezone)
+
+    Returns:
+        Dict with 'start_date'/'end_date' (YYYY-MM-DD, absent if no date was
+        mentioned), 'time_window' ((start, end) minutes from midnight, absent
+        if no time was mentioned), 'time_preference' and 'asap'
+    """
+    # Copy so callers can't mutate the cached result
+    return dict(_resolve(text.lower(), today or clinic_today()))
+
+@lru_cache(maxsize=1024)
+def _resolve(text: str, today: date) -> Dict:
+    result = {}
+    dates = _resolve_dates(text, today)
+    if dates:
+        start, end, label = dates
+        result["start_date"] = start.isoformat()
+        result["end_date"] = end.isoformat()
+        result["date_label"] = label
+    if _ASAP.search(text):
+        result["asap"] = True
+
+    window = _resolve_time(text)
+    if window:
+        start, end, label = window
+        result["time_window"] = (start, end)
+        result["time_preference"] = label if label in TIME_WINDOWS else time_bucket((start, end))
+    return result
@@ -0,0 +1,182 @@
+"""
+Tool for booking recurring appointment series
+"""
+import itertools
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+from dateutil.rrule import rrulestr
+from ..clinic_clock import clinic_today
+from ..api.calendly_integration import MockCalendlyAPI, calendly_api
+from ..models.schemas import BookingRequest, SeriesBookingRequest, SeriesUpdateRequest
+from ..models.records import format_time, parse_time
+
+MAX_SERIES_OCCURRENCES = 52
+
+class SeriesConflictError(ValueError):
+    """Occurrences of a series clash with the calendar, so nothing was changed"""
+
+def expand_occurrences(rule: str, start_date: str, start_time: str) -> List[str]:
+    """
+    Expand an RRULE (e.g. "FREQ=WEEKLY;COUNT=12") into occurrence dates
+
+    Returns:
+        Dates in YYYY-MM-DD format
+    """
+    rule = rule.strip()
+    if rule.upper().startswith("RRULE:"):
+        rule = rule[len("RRULE:"):]
+    if "COUNT=" not in rule.upper() and "UNTIL=" not in rule.upper():
+        raise ValueError("Recurrence must be bounded with COUNT or UNTIL")
+
+    dtstart = datetime.strptime(f"{start_date} {start_time}", "%Y-%m-%d %H:%M")
+    occurrences = list(itertools.islice(rrulestr(rule, dtstart=dtstart), MAX_SERIES_OCCURRENCES + 1))
+    if len(occurrences) > MAX_SERIES_OCCURRENCES:
+        raise ValueError(f"Series may have at most {MAX_SERIES_OCCURRENCES} occurrences")
+    if not occurrences:
+        raise ValueError("Recurrence produces no occurrences")
+
+    return [occurrence.strftime("%Y-%m-%d") for occurrence in occurrences]
+
+def suggest_alternatives(api: MockCalendlyAPI, request: BookingRequest, limit: int = 3) -> List[str]:
+    """Closest free start times on the same day as a conflicting occurrence"""
+    wanted = parse_time(request.start_time)
+    starts = sorted(api.get_free_starts(request.date, request.appointment_type), key=lambda start: abs(start - wanted))
+    return [format_time(start) for start in starts[:limit]]
+
+class SeriesManager:
+    """Books, modifies and cancels recurring series on top of MockCalendlyAPI"""
+
+    def __init__(self, api: MockCalendlyAPI):
+        self.api = api
+
+    def book_series(self, request: SeriesBookingRequest) -> Dict:
+        """
+        Book every occurrence of a recurrence in one batch
+
+        all_or_nothing books nothing if any occurrence conflicts; best_effort
+        books the free occurrences and returns alternatives for the rest.
+        """
+        dates = expand_occurrences(request.rrule, request.start_date, request.start_time)
+        booking_requests = [
+            BookingRequest(
+                appointment_type=request.appointment_type,
+                date=occurrence_date,
+                start_time=request.start_time,
+                patient=request.patient,
+                reason=request.reason
+            )
+            for occurrence_date in dates
+        ]
+
+        series_id = f"SER-{uuid.uuid4().hex[:8]}"
+        # Checked and booked in one store transaction, so no other worker
+        # can take a slot between the check and the writes
+        results = self.api.bulk_book(
+            booking_requests,
+            series_id=series_id,
+            all_or_nothing=request.mode == "all_or_nothing"
+        )
+        conflicts = {
+            i: result["error"]
+            for i, result in enumerate(results)
+            if not result["success"] and not result.get("skipped")
+        }
+        if conflicts and request.mode == "all_or_nothing":
+            details = "; ".join(conflicts[i] for i in sorted(conflicts))
+            raise SeriesConflictError(f"Series not booked, {len(conflicts)} occurrence(s) conflict: {details}")
+
+        booked = [
+            {"date": booking_request.date, "booking_id": result["booking_id"]}
+            for booking_request, result in zip(booking_requests, results)
+            if result["success"]
+        ]
+
+        return {
+            "series_id": series_id,
+            "booked": booked,
+            "conflicts": [
+                {
+                    "date": booking_requests[i].date,
+                    "error": conflicts[i],
+                    "alternatives": suggest_alternatives(self.api, booking_requests[i])
+                }
+                for i in sorted(conflicts)
+            ]
+        }
+
+    def get_series(self, series_id: str) -> Optional[Dict]:
+        """
+        Get a series with its current occurrences
+
+        Series aren't stored separately: they are read back from the bookings
+        tagged with their series_id, so every worker sharing the booking store
+        sees the same series. Once all its occurrences are cancelled or
+        archived a series is no longer found.
+        """
+        occurrences = self.api.series_bookings(series_id)
+        if not occurrences:
+            return None
+        latest = occurrences[-1]
+        return {
+            "series_id": series_id,
+            "appointment_type": latest["appointment_type"],
+            "start_time": latest["start_time"],
+            "patient": latest["patient"],
+            "booking_ids": [booking["booking_id"] for booking in occurrences],
+            "status": "active",
+            "occurrences": occurrences
+        }
+
+    def update_series(self, series_id: str, update: SeriesUpdateRequest) -> Dict:
+        """
+        Change the start time and/or type of all occurrences on or after from_date,
+        atomically: either every occurrence moves or none does
+        """
+        upcoming = self._upcoming(series_id, update.from_date)
+        if not upcoming:
+            raise ValueError("Series has no upcoming occurrences to modify")
+
+        new_requests = [
+            BookingRequest(
+                appointment_type=update.appointment_type or booking["appointment_type"],
+                date=booking["date"],
+                start_time=update.start_time or booking["start_time"],
+                patient=booking["patient"],
+                reason=booking["reason"]
+            )
+            for booking in upcoming
+        ]
+        conflicts = self.api.reschedule_batch([
+            (booking["booking_id"], new_request)
+            for booking, new_request in zip(upcoming, new_requests)
+        ])
+        if conflicts:
+            details = "; ".join(conflicts[i] for i in sorted(conflicts))
+            raise SeriesConflictError(f"Series not modified, {len(conflicts)} occurrence(s) conflict: {details}")
+
+        return self.get_series(series_id)
+
+    def cancel_series(self, series_id: str, from_date: Optional[str] = None) -> Dict:
+        """Cancel all occurrences on or after from_date (defaults to today)"""
+        cancelled = [
+            booking["booking_id"]
+            for booking in self._upcoming(series_id, from_date)
+            if self.api.cancel_appointment(booking["booking_id"])
+        ]
+        return {"series_id": series_id, "cancelled": cancelled}
+
+    def _upcoming(self, series_id: str, from_date: Optional[str]) -> List[Dict]:
+        """
+        Current bookings of a series dated on or after from_date
+
+        Raises:
+            KeyError: the series has no current bookings
+        """
+        occurrences = self.api.series_bookings(series_id)
+        if not occurrences:
+            raise KeyError(series_id)
+        from_date = from_date or clinic_today().strftime("%Y-%m-%d")
+        return [booking for booking in occurrences if booking["date"] >= from_date]
+
+series_manager = SeriesManager(calendly_api)
@@ -0,0 +1,164 @@
+"""
+Slot ranking engine for suggestions
+Scores candidate slots by how much they fragment the day, how well they match
+the patient's time preference and how early they are, then keeps the top-k.
+"""
+import heapq
+import math
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+from ..clinic_clock import clinic_today
+from ..api.calendly_integration import (
+    APPOINTMENT_DURATIONS,
+    BUSINESS_HOURS,
+    SLOT_INTERVAL_MINUTES,
+    calendly_api
+)
+from ..models.schemas import AppointmentType
+from ..models.records import format_time
+from .availability_tool import get_time_bucket
+
+FRAGMENTATION_WEIGHT = 1.0
+PREFERENCE_WEIGHT = 3.0
+EARLINESS_WEIGHT = 0.25  # per day
+
+DAY_START = BUSINESS_HOURS["start"] * 60
+DAY_END = BUSINESS_HOURS["end"] * 60
+
+def _free_blocks(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Complement of the occupied intervals within business hours"""
+    blocks = []
+    cursor = DAY_START
+    for start, end in intervals:
+        if start > cursor:
+            blocks.append((cursor, min(start, DAY_END)))
+        cursor = max(cursor, end)
+    if cursor < DAY_END:
+        blocks.append((cursor, DAY_END))
+    return blocks
+
+def _fits(block_start: int, block_end: int, duration: int) -> int:
+    """How many back-to-back appointments of a duration fit in a block on the slot grid"""
+    first = math.ceil((block_start - DAY_START) / SLOT_INTERVAL_MINUTES) * SLOT_INTERVAL_MINUTES + DAY_START
+    if block_end - first < duration:
+        return 0
+    step = math.ceil(duration / SLOT_INTERVAL_MINUTES) * SLOT_INTERVAL_MINUTES
+    return (block_end - first - duration) // step + 1
+
+def block_value(block_start: int, block_end: int, demand: Dict[str, float]) -> float:
+    """Demand-weighted capacity of a free block"""
+    return sum(
+        weight * _fits(block_start, block_end, APPOINTMENT_DURATIONS[appointment_type])
+        for appointment_type, weight in demand.items()
+    )
+
+def fragmentation_cost(
+    start: int,
+    duration: int,
+    blocks: List[Tuple[int, int]],
+    demand: Dict[str, float]
+) -> Optional[float]:
+    """
+    Capacity lost by placing an appointment at start, or None if it doesn't fit
+    """
+    end = start + duration
+    for block_start, block_end in blocks:
+        if block_start <= start and end <= block_end:
+            before = block_value(block_start, block_end, demand)
+            after = block_value(block_start, start, demand) + block_value(end, block_end, demand)
+            return before - after
+    return None
+
+def demand_mix(start_date: date, num_days: int) -> Dict[str, float]:
+    """
+    Estimate the share of demand per appointment type from bookings in the window
+    (Laplace-smoothed so unseen types still count)
+    """
+    counts = {appointment_type: 1.0 for appointment_type in APPOINTMENT_DURATIONS}
+    first = start_date.toordinal()
+    for record in calendly_api.day_records(first, first + num_days - 1):
+        counts[record.appointment_type] += 1
+    total = sum(counts.values())
+    return {appointment_type: count / total for appointment_type, count in counts.items()}
+
+def _score_day(
+    check_date: date,
+    day_offset: int,
+    appointment_type: AppointmentType,
+    time_pref: str,
+    demand: Dict[str, float],
+    time_window: Optional[Tuple[int, int]] = None
+) -> Iterator[Tuple[float, Dict]]:
+    """Yield (score, candidate) for every free slot of one day"""
+    date_str = check_date.strftime("%Y-%m-%d")
+    free_starts = calendly_api.get_free_starts(date_str, appointment_type)
+    if not free_starts:
+        return
+
+    blocks = _free_blocks(calendly_api.get_booked_intervals(date_str, appointment_type))
+    duration = APPOINTMENT_DURATIONS[appointment_type]
+
+    if time_window:
+        free_starts = [start for start in free_starts if time_window[0] <= start < time_window[1]]
+
+    for start in free_starts:
+        cost = fragmentation_cost(start, duration, blocks, demand)
+        if cost is None:
+            # Overlaps an appointment that started earlier
+            continue
+
+        matches = not time_pref or get_time_bucket(start // 60) in time_pref
+        score = (
+            FRAGMENTATION_WEIGHT * cost
+            + PREFERENCE_WEIGHT * (0 if matches else 1)
+            + EARLINESS_WEIGHT * (day_offset + start / 1440)
+        )
+        yield score, {
+            "date": date_str,
+            "day": check_date.strftime("%A"),
+            "time": format_time(start),
+            "matches_preference": matches,
+            "fragmentation_cost": round(cost, 3),
+            "score": round(score, 3)
+        }
+
+def rank_slots(
+    appointment_type: AppointmentType = "consultation",
+    time_pref: str = "",
+    start_date: Optional[date] = None,
+    num_days: int = 7,
+    top_k: int = 5,
+    max_per_day: int = 2,
+    time_window: Optional[Tuple[int, int]] = None
+) -> List[Dict]:
+    """
+    Rank free slots over a multi-day window and return the best top_k
+
+    Args:
+        appointment_type: Type of appointment
+        time_pref: Time preference (morning/afternoon/evening), may be empty
+        start_date: First day of the window (defaults to today)
+        num_days: Number of days in the window
+        top_k: Number of slots to return
+        max_per_day: Cap per day so suggestions span several days
+        time_window: Only consider slots starting in this (start, end) minute range
+
+    Returns:
+        Candidate slots ordered best first
+    """
+    start_date = start_date or clinic_today()
+    time_pref = (time_pref or "").lower()
+    demand = demand_mix(start_date, num_days)
+
+    def per_day_best() -> Iterator[Tuple[float, int, Dict]]:
+        for offset in range(num_days):
+            day = heapq.nsmallest(
+                max_per_day,
+                _score_day(start_date + timedelta(days=offset), offset, appointment_type, time_pref, demand, time_window),
+                key=lambda item: item[0]
+            )
+            for score, candidate in day:
+                yield score, offset, candidate
+
+    best = heapq.nsmallest(top_k, per_day_best(), key=lambda item: (item[0], item[1]))
+    return [candidate for _, _, candidate in best]
@@ -0,0 +1,240 @@
+"""
+Waitlist and automatic backfill of cancelled slots
+"""
+import heapq
+import os
+import threading
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from ..api.calendly_integration import MockCalendlyAPI, calendly_api
+from ..models.schemas import BookingRequest, WaitlistRequest
+from ..notifications.queue import enqueue_waitlist_offer
+from .availability_tool import get_time_bucket
+
+TIME_BUCKETS = ["morning", "afternoon", "evening"]
+ANY_BUCKET = "any"
+
+class WaitlistManager:
+    """
+    Keeps waitlist entries indexed by (date, time bucket) so a freed slot is
+    matched by looking at a couple of FIFO queues instead of scanning every entry.
+    """
+
+    def __init__(
+        self,
+        api: MockCalendlyAPI,
+        hold_minutes: int = 15,
+        on_offer: Optional[Callable[[Dict, Dict], None]] = None
+    ):
+        self.api = api
+        self.hold_minutes = hold_minutes
+        self.on_offer = on_offer
+        self.entries: Dict[str, Dict] = {}
+        self.holds: Dict[str, Dict] = {}
+        self._index: Dict[Tuple[str, str], Deque[str]] = {}
+        self._hold_expiry: List[Tuple[datetime, str]] = []
+        self._sequence = 0
+        self._lock = threading.RLock()
+        api.add_listener(self._on_booking_event)
+
+    def add_entry(self, request: WaitlistRequest) -> Dict:
+        """
+        Register a patient on the waitlist
+        """
+        start = datetime.strptime(request.start_date, "%Y-%m-%d").date()
+        end = datetime.strptime(request.end_date, "%Y-%m-%d").date()
+        if end < start:
+            raise ValueError("end_date must not be before start_date")
+
+        time_pref = (request.time_preference or "").lower()
+        buckets = [bucket for bucket in TIME_BUCKETS if bucket in time_pref] or [ANY_BUCKET]
+
+        with self._lock:
+            self._sequence += 1
+            entry_id = f"WL-{uuid.uuid4().hex[:8]}"
+            entry = {
+                "entry_id": entry_id,
+                "appointment_type": request.appointment_type,
+                "patient": request.patient.dict(),
+                "start_date": request.start_date,
+                "end_date": request.end_date,
+                "time_preference": request.time_preference,
+                "reason": request.reason,
+                "status": "waiting",
+                "hold": None,
+                "_sequence": self._sequence,
+                "_offered": set()
+            }
+            self.entries[entry_id] = entry
+
+            current = start
+            while current <= end:
+                date_str = current.strftime("%Y-%m-%d")
+                for bucket in buckets:
+                    self._index.setdefault((date_str, bucket), deque()).append(entry_id)
+                current += timedelta(days=1)
+
+        return self._public(entry)
+
+    def remove_entry(self, entry_id: str) -> bool:
+        """Remove a patient from the waitlist, releasing any hold they have"""
+        with self._lock:
+            entry = self.entries.get(entry_id)
+            if entry is None or entry["status"] == "removed":
+                return False
+            if entry["hold"]:
+                self._release(entry["hold"]["hold_id"], reoffer=True)
+            entry["status"] = "removed"
+            return True
+
+    def get_entry(self, entry_id: str) -> Optional[Dict]:
+        """Get a waitlist entry"""
+        self.expire_holds()
+        entry = self.entries.get(entry_id)
+        return self._public(entry) if entry else None
+
+    def on_slot_freed(self, target_date: str, start_time: str) -> Optional[Dict]:
+        """
+        Offer a freed slot to the first matching waitlisted patient
+
+        Returns:
+            The hold that was placed, or None if nobody matched
+        """
+        with self._lock:
+            slot_key = f"{target_date}_{start_time}"
+            bucket = get_time_bucket(int(start_time.split(":")[0]))
+
+            entry = self._find_match(target_date, bucket, start_time, slot_key)
+            if entry is None:
+                return None
+
+            hold_id = f"HOLD-{uuid.uuid4().hex[:8]}"
+            expires_at = datetime.now() + timedelta(minutes=self.hold_minutes)
+            try:
+                self.api.place_hold(target_date, start_time, hold_id, expires_at, entry["appointment_type"])
+            except ValueError:
+                return None
+
+            hold = {
+                "hold_id": hold_id,
+                "entry_id": entry["entry_id"],
+                "date": target_date,
+                "start_time": start_time,
+                "expires_at": expires_at.isoformat(timespec="seconds")
+            }
+            self.holds[hold_id] = hold
+            entry["hold"] = hold
+            entry["status"] = "held"
+            entry["_offered"].add(slot_key)
+            heapq.heappush(self._hold_expiry, (expires_at, hold_id))
+
+            if self.on_offer:
+                try:
+                    self.on_offer(self._public(entry), hold)
+                except Exception as e:
+                    print(f"⚠️ Warning: Could not notify waitlist entry {entry['entry_id']}: {e}")
+            return hold
+
+    def confirm_hold(self, hold_id: str) -> Dict:
+        """
+        Book the held slot for the waitlisted patient
+
+        Returns:
+            Booking details
+        """
+        self.expire_holds()
+        with self._lock:
+            hold = self.holds.get(hold_id)
+            if hold is None:
+                raise ValueError(f"Hold {hold_id} not found or expired")
+            entry = self.entries[hold["entry_id"]]
+
+            booking_request = BookingRequest(
+                appointment_type=entry["appointment_type"],
+                date=hold["date"],
+                start_time=hold["start_time"],
+                patient=entry["patient"],
+                reason=entry["reason"],
+                hold_id=hold_id
+            )
+            booking_response = self.api.book_appointment(booking_request)
+
+            del self.holds[hold_id]
+            entry["hold"] = None
+            entry["status"] = "booked"
+            return booking_response.details
+
+    def decline_hold(self, hold_id: str) -> bool:
+        """Decline a held slot; the slot goes to the next matching patient"""
+        with self._lock:
+            if hold_id not in self.holds:
+                return False
+            self._release(hold_id, reoffer=True)
+            return True
+
+    def expire_holds(self, now: Optional[datetime] = None):
+        """Release expired holds and re-offer their slots"""
+        now = now or datetime.now()
+        with self._lock:
+            while self._hold_expiry and self._hold_expiry[0][0] <= now:
+                _, hold_id = heapq.heappop(self._hold_expiry)
+                if hold_id in self.holds:
+                    self._release(hold_id, reoffer=True)
+
+    def _release(self, hold_id: str, reoffer: bool):
+        """Drop a hold, put its patient back to waiting and optionally re-offer the slot"""
+        hold = self.holds.pop(hold_id)
+        entry = self.entries[hold["entry_id"]]
+        entry["hold"] = None
+        if entry["status"] == "held":
+            entry["status"] = "waiting"
+        self.api.release_hold(hold["date"], hold["start_time"], hold_id)
+        if reoffer:
+            self.on_slot_freed(hold["date"], hold["start_time"])
+
+    def _find_match(self, target_date: str, bucket: str, start_time: str, slot_key: str) -> Optional[Dict]:
+        """Pick the earliest-registered waiting entry from the bucket and 'any' queues"""
+        best = None
+        for key in ((target_date, bucket), (target_date, ANY_BUCKET)):
+            queue = self._index.get(key)
+            if not queue:
+                continue
+
+            # Entries that are gone for good are dropped from the head lazily
+            while queue and self.entries[queue[0]]["status"] in ("removed", "booked"):
+                queue.popleft()
+
+            for entry_id in queue:
+                entry = self.entries[entry_id]
+                if best is not None and entry["_sequence"] > best["_sequence"]:
+                    break
+                if entry["status"] != "waiting" or slot_key in entry["_offered"]:
+                    continue
+                if not self.api.is_slot_available(target_date, start_time, entry["appointment_type"]):
+                    continue
+                best = entry
+                break
+        return best
+
+    def _on_booking_event(self, event: str, booking: Dict):
+        """Backfill slots freed by cancellations and reschedules"""
+        if event == "cancelled":
+            self.expire_holds()
+            self.on_slot_freed(booking["date"], booking["start_time"])
+        elif event == "rescheduled":
+            previous = booking["previous"]
+            if (previous["date"], previous["start_time"]) != (booking["date"], booking["start_time"]):
+                self.expire_holds()
+                self.on_slot_freed(previous["date"], previous["start_time"])
+
+    def _public(self, entry: Dict) -> Dict:
+        """Strip internal bookkeeping fields"""
+        return {key: value for key, value in entry.items() if not key.startswith("_")}
+
+waitlist_manager = WaitlistManager(
+    calendly_api,
+    hold_minutes=int(os.getenv("WAITLIST_HOLD_MINUTES", 15)),
+    on_offer=enqueue_waitlist_offer
+)
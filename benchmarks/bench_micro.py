@@ -0,0 +1,24 @@
+"""
+pytest-benchmark entry point for the micro-benchmarks
+
+    pip install pytest-benchmark
+    pytest benchmarks/bench_micro.py --benchmark-json=bench.json
+"""
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("pytest_benchmark")
+
+from benchmarks.micro import bench_api, get_benchmarks, populate_bookings, use_bench_api
+
+API = bench_api()
+populate_bookings(API)
+BENCHMARKS = get_benchmarks(API)
+
+@pytest.mark.parametrize("name", sorted(BENCHMARKS))
+def test_micro(benchmark, name):
+    with use_bench_api(API):
+        benchmark(BENCHMARKS[name])
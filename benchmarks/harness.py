@@ -0,0 +1,66 @@
+"""
+Timing helpers shared by the micro-benchmarks and the load generator
+"""
+import json
+import math
+import statistics
+import time
+from typing import Callable, Dict, List, Optional
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def summarize(samples: List[float], elapsed: Optional[float] = None) -> Dict[str, float]:
+    """Latency percentiles (milliseconds) and throughput for a set of samples (seconds)"""
+    elapsed = elapsed if elapsed is not None else sum(samples)
+    return {
+        "count": len(samples),
+        "mean_ms": statistics.fmean(samples) * 1000 if samples else 0.0,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "rps": len(samples) / elapsed if elapsed else 0.0
+    }
+
+def measure(fn: Callable[[], object], iterations: int = 200, warmup: int = 10) -> Dict[str, float]:
+    """Call fn repeatedly and summarize the per-call latency"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - call_started)
+    return summarize(samples, time.perf_counter() - started)
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float = 0.2, metric: str = "p95_ms") -> List[str]:
+    """
+    Flag benchmarks whose metric got worse than baseline by more than threshold
+
+    Returns:
+        Human-readable regression messages (empty if none)
+    """
+    regressions = []
+    for name, stats in results.items():
+        reference = baseline.get(name, {}).get(metric)
+        if not reference:
+            continue
+        change = (stats[metric] - reference) / reference
+        if change > threshold:
+            regressions.append(f"{name}: {metric} {reference:.3f} -> {stats[metric]:.3f} (+{change:.0%})")
+    return regressions
+
+def load_json(path: str) -> Dict:
+    with open(path) as f:
+        return json.load(f)
+
+def save_json(path: str, data: Dict):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
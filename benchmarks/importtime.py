@@ -0,0 +1,98 @@
+"""
+Import-time profile of the API process (cold start)
+
+Runs `python -X importtime` in fresh interpreters and reports the cumulative
+import time of the app plus the heaviest modules it pulled in.
+
+    python -m benchmarks.importtime
+    python -m benchmarks.importtime --module backend.main --runs 10 --top 20
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import summarize
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# "import time:       self [us] |  cumulative | imported package"
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+# What cold start looks like with and without the deferred LLM/RAG stack loaded
+SCENARIOS = {
+    "import_api": ("backend.main", {}),
+    "import_api_calendar_only": ("backend.main", {"ENABLE_AGENT": "false"}),
+    "import_api_with_llm_stack": ("backend.main, backend.llm.gateway, openai, httpx, langchain_text_splitters", {})
+}
+
+def parse_importtime(output: str) -> List[Dict]:
+    """Rows of -X importtime output as dicts (times in microseconds)"""
+    rows = []
+    for line in output.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append({
+                "module": module,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": (len(indent) - 1) // 2
+            })
+    return rows
+
+def run_once(modules: str, env: Optional[Dict[str, str]] = None) -> List[Dict]:
+    """Import modules in a fresh interpreter and return the parsed profile"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modules}"],
+        cwd=REPO_ROOT,
+        env={**os.environ, **(env or {})},
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return parse_importtime(completed.stderr)
+
+def total_seconds(rows: List[Dict]) -> float:
+    """Time spent in top-level imports (nested ones are included in their parents)"""
+    return sum(row["cumulative_us"] for row in rows if row["depth"] == 0) / 1e6
+
+def heaviest(rows: List[Dict], top: int = 15) -> List[Dict]:
+    """Top-level packages by self time summed over their modules"""
+    packages: Dict[str, int] = {}
+    for row in rows:
+        package = row["module"].split(".")[0]
+        packages[package] = packages.get(package, 0) + row["self_us"]
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [{"package": package, "ms": us / 1000} for package, us in ranked]
+
+def profile(runs: int = 5, scenarios: Optional[Dict] = None) -> Dict[str, Dict]:
+    """Summaries per scenario, plus the heaviest packages of the last run"""
+    results = {}
+    for name, (modules, env) in (scenarios or SCENARIOS).items():
+        samples = []
+        for _ in range(runs):
+            rows = run_once(modules, env)
+            samples.append(total_seconds(rows))
+        results[name] = {**summarize(samples), "heaviest": heaviest(rows)}
+    return results
+
+def print_report(results: Dict[str, Dict], top: int = 10):
+    for name, stats in results.items():
+        print(f"\n{name}: p50 {stats['p50_ms']:.1f} ms, p95 {stats['p95_ms']:.1f} ms")
+        for item in stats["heaviest"][:top]:
+            print(f"  {item['package']:<32}{item['ms']:>9.1f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import-time profile of the API")
+    parser.add_argument("--module", help="Profile these comma-separated modules instead of the default scenarios")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    scenarios = {"import_custom": (args.module, {})} if args.module else None
+    print_report(profile(args.runs, scenarios), args.top)
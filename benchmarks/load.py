@@ -0,0 +1,108 @@
+"""
+Asyncio load generator for the FastAPI app
+Runs in-process through ASGITransport (or against --url) with the LLM
+replaced by the local stub server, and reports latency percentiles and RPS.
+"""
+import asyncio
+import itertools
+import os
+import time
+import uuid
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+import httpx
+from .harness import summarize
+
+Scenario = Tuple[str, str, str, Optional[dict]]
+
+CHAT_MESSAGES = [
+    "I need to see the doctor",
+    "What insurance do you accept?",
+    "Can I book an appointment tomorrow afternoon?",
+    "Where are you located and is there parking?",
+]
+
+def default_scenarios() -> List[Scenario]:
+    """(name, method, path, json body) requests cycled by the workers"""
+    from backend.clinic_clock import clinic_today
+    tomorrow = (clinic_today() + timedelta(days=1)).strftime("%Y-%m-%d")
+    scenarios: List[Scenario] = [
+        ("health", "GET", "/health", None),
+        ("availability", "GET", f"/api/calendly/availability?date={tomorrow}&appointment_type=consultation", None),
+    ]
+    for message in CHAT_MESSAGES:
+        scenarios.append(("chat", "POST", "/api/chat", {"message": message}))
+    return scenarios
+
+def start_stub_llm(delay: float = 0.0):
+    """Start the stub LLM and point the app's gateway at it (before the app creates it)"""
+    from backend.llm.stub_server import StubServer, StubState
+    server = StubServer(StubState(delay=delay)).start()
+    os.environ["OPENAI_API_KEY"] = os.environ.get("OPENAI_API_KEY") or "stub-key"
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    return server
+
+async def run_load(
+    concurrency: int = 20,
+    total_requests: int = 500,
+    scenarios: Optional[List[Scenario]] = None,
+    url: Optional[str] = None
+) -> Dict[str, Dict]:
+    """
+    Fire total_requests requests from `concurrency` workers
+
+    Returns:
+        Stats per scenario name plus an "all" entry
+    """
+    scenarios = scenarios or default_scenarios()
+    if url:
+        client = httpx.AsyncClient(base_url=url, timeout=60)
+    else:
+        # Measure pipeline capacity rather than the per-client rate limits
+        # (export CHAT_RATE_* / CHAT_BURST_* to load test the limiter itself)
+        for name in ("CHAT_RATE_PER_CLIENT", "CHAT_BURST_PER_CLIENT", "CHAT_RATE_PER_CONVERSATION", "CHAT_BURST_PER_CONVERSATION"):
+            os.environ.setdefault(name, "1000000")
+        from backend.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+    counter = itertools.count()
+    samples: Dict[str, List[float]] = {}
+    failures: Dict[str, int] = {}
+    rejections: Dict[str, int] = {}
+
+    async def worker():
+        conversation_id = uuid.uuid4().hex
+        while True:
+            index = next(counter)
+            if index >= total_requests:
+                return
+            name, method, path, body = scenarios[index % len(scenarios)]
+            if body is not None and name == "chat":
+                body = {**body, "conversation_id": conversation_id}
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                ok = response.status_code < 400
+                if response.status_code == 429:
+                    rejections[name] = rejections.get(name, 0) + 1
+            except httpx.HTTPError:
+                ok = False
+            samples.setdefault(name, []).append(time.perf_counter() - started)
+            if not ok:
+                failures[name] = failures.get(name, 0) + 1
+
+    async with client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    results = {}
+    for name, values in samples.items():
+        results[f"load_{name}"] = {
+            **summarize(values, elapsed), "errors": failures.get(name, 0), "rejected": rejections.get(name, 0)
+        }
+    all_samples = [value for values in samples.values() for value in values]
+    results["load_all"] = {
+        **summarize(all_samples, elapsed), "errors": sum(failures.values()), "rejected": sum(rejections.values())
+    }
+    return results
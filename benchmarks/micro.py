@@ -0,0 +1,74 @@
+"""
+Micro-benchmarks for the scheduler, slot suggestions and FAQ retrieval
+They run against a private in-memory calendar (see use_bench_api), so the
+fake bookings never reach the configured booking store.
+"""
+import os
+import random
+import tempfile
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Callable, Dict, Iterator
+from backend.api.calendly_integration import APPOINTMENT_DURATIONS, MockCalendlyAPI, calendly_api
+from backend.clinic_clock import clinic_today
+from backend.models.schemas import BookingRequest
+from backend.state import MemoryBookingStore
+from backend.tools import availability_tool, slot_ranking
+from backend.tools.availability_tool import check_availability, suggest_slots
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+# Modules whose tools read the calendar through a module-level calendly_api
+_TOOL_MODULES = (availability_tool, slot_ranking)
+
+def bench_api() -> MockCalendlyAPI:
+    """In-memory calendar with the clinic's resources and no listeners"""
+    return MockCalendlyAPI(MemoryBookingStore(), calendly_api.capacity)
+
+@contextmanager
+def use_bench_api(api: MockCalendlyAPI) -> Iterator[MockCalendlyAPI]:
+    """Point the availability and suggestion tools at `api` for the duration of the block"""
+    previous = [module.calendly_api for module in _TOOL_MODULES]
+    for module in _TOOL_MODULES:
+        module.calendly_api = api
+    try:
+        yield api
+    finally:
+        for module, original in zip(_TOOL_MODULES, previous):
+            module.calendly_api = original
+
+def populate_bookings(api: MockCalendlyAPI, days: int = 14, occupancy: float = 0.5, seed: int = 42) -> int:
+    """Book roughly `occupancy` of the half-hour starts over the next `days` days"""
+    rng = random.Random(seed)
+    patient = {"name": "Bench Patient", "email": "bench@example.com", "phone": "+1-555-0199"}
+    requests = []
+    for offset in range(days):
+        day = (clinic_today() + timedelta(days=offset)).strftime("%Y-%m-%d")
+        for minutes in range(9 * 60, 17 * 60, 30):
+            if rng.random() < occupancy:
+                requests.append(BookingRequest(
+                    appointment_type=rng.choice(list(APPOINTMENT_DURATIONS)),
+                    date=day,
+                    start_time=f"{minutes // 60:02d}:{minutes % 60:02d}",
+                    patient=patient
+                ))
+    return sum(result["success"] for result in api.bulk_book(requests))
+
+def build_vector_store():
+    """FAQ store loaded with the clinic info in a throwaway directory"""
+    from backend.rag.vector_store import FAQVectorStore
+    store = FAQVectorStore(persist_directory=tempfile.mkdtemp(prefix="bench-vectordb-"))
+    store.load_clinic_info(os.path.join(DATA_DIR, "clinic_info.json"))
+    return store
+
+def get_benchmarks(api: MockCalendlyAPI) -> Dict[str, Callable[[], object]]:
+    """Name -> zero-argument callable (run the tool ones inside use_bench_api(api))"""
+    tomorrow = (clinic_today() + timedelta(days=1)).strftime("%Y-%m-%d")
+    store = build_vector_store()
+    return {
+        "get_available_slots": lambda: api.get_available_slots(tomorrow, "consultation"),
+        "check_availability_7d": lambda: check_availability("consultation", None, 7),
+        "suggest_slots_asap": lambda: suggest_slots({"time_preference": "afternoon", "date_preference": "asap"}, "consultation", 7),
+        "suggest_slots_date": lambda: suggest_slots({"date_preference": tomorrow}, "specialist", 7),
+        "faq_search": lambda: store.search("what insurance do you accept", top_k=3),
+    }
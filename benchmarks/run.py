@@ -0,0 +1,102 @@
+"""
+Benchmark runner: import-time profile, micro-benchmarks and/or load test,
+JSON output, baseline comparison
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+"""
+import argparse
+import asyncio
+import os
+import platform
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import compare, load_json, measure, save_json
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run scheduling agent benchmarks")
+    parser.add_argument("--skip-micro", action="store_true", help="Skip micro-benchmarks")
+    parser.add_argument("--skip-load", action="store_true", help="Skip the HTTP load test")
+    parser.add_argument("--skip-import", action="store_true", help="Skip the import-time (cold start) profile")
+    parser.add_argument("--import-runs", type=int, default=5, help="Fresh interpreters per import scenario")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--llm-delay", type=float, default=0.05, help="Stub LLM latency in seconds")
+    parser.add_argument("--cassette", help="Replay LLM calls from this cassette instead of the stub server")
+    parser.add_argument("--replay-latency", default="recorded", help="Latency model for replay, e.g. recorded, fixed:0.3, lognormal:0.8,0.5")
+    parser.add_argument("--url", help="Load test a running server instead of the in-process app")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--baseline", help="Compare against this results JSON")
+    parser.add_argument("--save-baseline", help="Write results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed p95 regression (fraction)")
+    args = parser.parse_args(argv)
+
+    # The stub must be configured before anything creates the LLM gateway
+    stub = None
+    if args.cassette:
+        os.environ["LLM_CASSETTE_MODE"] = "replay"
+        os.environ["LLM_CASSETTE"] = args.cassette
+        os.environ["LLM_REPLAY_LATENCY"] = args.replay_latency
+    elif not args.skip_load and not args.url:
+        from benchmarks.load import start_stub_llm
+        stub = start_stub_llm(args.llm_delay)
+
+    results = {}
+    if not args.skip_import:
+        from benchmarks.importtime import print_report, profile
+        import_results = profile(args.import_runs)
+        print_report(import_results)
+        results.update(import_results)
+
+    if not args.skip_micro:
+        from benchmarks.micro import bench_api, get_benchmarks, populate_bookings, use_bench_api
+        api = bench_api()
+        populate_bookings(api)
+        with use_bench_api(api):
+            for name, fn in get_benchmarks(api).items():
+                results[name] = measure(fn, iterations=args.iterations)
+
+    if not args.skip_load:
+        from benchmarks.load import run_load
+        results.update(asyncio.run(run_load(args.concurrency, args.requests, url=args.url)))
+
+    if stub:
+        stub.stop()
+
+    print(f"{'benchmark':<28}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rps':>12}")
+    for name, stats in results.items():
+        print(f"{name:<28}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}{stats['rps']:>12.1f}")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "llm_delay": args.llm_delay,
+            "cassette": args.cassette,
+            "replay_latency": args.replay_latency if args.cassette else None
+        },
+        "results": results
+    }
+    if args.output:
+        save_json(args.output, report)
+    if args.save_baseline:
+        save_json(args.save_baseline, report)
+
+    if args.baseline:
+        regressions = compare(results, load_json(args.baseline)["results"], args.threshold)
+        if regressions:
+            print("\n❌ Regressions against baseline:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print("\n✅ No regressions against baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
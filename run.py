@@ -1,15 +1,43 @@
 """
 Main entry point for running the Medical Appointment Scheduling Agent
+
+Development (single process, auto-reload):
+    python run.py
+Production (several workers, no reloader):
+    python run.py --prod --workers 8
 """
+import argparse
 import os
 import sys
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from backend.main import app
 import uvicorn
 
 if __name__ == "__main__":
-    port = int(os.getenv("BACKEND_PORT", 8000))
-    uvicorn.run("backend.main:app", host="0.0.0.0", port=port, reload=True)
+    parser = argparse.ArgumentParser(description="Run the scheduling agent API")
+    parser.add_argument("--prod", action="store_true", help="Production mode: no reloader, multiple workers")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+                        help="Worker processes in production mode (default: WEB_CONCURRENCY or CPU count)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("BACKEND_PORT", 8000)))
+    args = parser.parse_args()
+
+    if not args.prod:
+        uvicorn.run("backend.main:app", host=args.host, port=args.port, reload=True)
+        sys.exit(0)
+
+    if args.workers > 1 and os.getenv("STATE_BACKEND", "memory") in ("memory", "journal"):
+        # Workers are separate processes; in-memory (or single-writer journal) state would diverge between them
+        os.environ["STATE_BACKEND"] = "sqlite"
+        print(f"ℹ️ Using STATE_BACKEND=sqlite ({os.getenv('STATE_DB_PATH', './data/state.db')}) for {args.workers} workers")
 
+    uvicorn.run(
+        "backend.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        reload=False,
+        log_level="warning",
+        access_log=False
+    )
@@ -0,0 +1,30 @@
+"""
+Fixtures shared by the test modules
+"""
+import sys
+import os
+from datetime import date
+from typing import Union
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.models.schemas import BookingRequest
+
+@pytest.fixture
+def patient() -> dict:
+    """Patient for bookings whose patient details don't matter to the test"""
+    return {"name": "Test Patient", "email": "patient@example.com", "phone": "+1-555-0100"}
+
+@pytest.fixture
+def book(patient):
+    """book(api, day, start_time="09:00", appointment_type="consultation") -> booking ID"""
+    def book(api, day: Union[str, date], start_time: str = "09:00", appointment_type: str = "consultation") -> str:
+        return api.book_appointment(BookingRequest(
+            appointment_type=appointment_type,
+            date=day.isoformat() if isinstance(day, date) else day,
+            start_time=start_time,
+            patient=patient
+        )).booking_id
+    return book
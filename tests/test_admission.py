@@ -0,0 +1,104 @@
+"""
+Test cases for chat admission control
+"""
+import sys
+import os
+import asyncio
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.api.admission import (
+    PRIORITY_DEFAULT, PRIORITY_MID_BOOKING, AdmissionController, AdmissionRejected, RateLimiter
+)
+
+def test_rate_limiter_refills():
+    """Test token bucket burst, rejection and refill"""
+    limiter = RateLimiter(per_minute=60, burst=2)
+
+    assert limiter.check("client", now=100.0) == 0
+    assert limiter.check("client", now=100.0) == 0
+    assert limiter.check("client", now=100.0) == pytest.approx(1.0)
+    assert limiter.check("other", now=100.0) == 0
+    assert limiter.check("client", now=101.0) == 0
+    print("✅ Rate limiter test passed")
+
+def test_rate_limit_keys_ignore_client_choices():
+    """Test that new conversation IDs share one bucket per client address"""
+    from types import SimpleNamespace
+    from backend.api.chat import _conversation_key
+    from backend.state import MemoryConversationStore
+
+    agent = SimpleNamespace(conversations=MemoryConversationStore())
+    agent.conversations.append("known", "user", "Hello")
+
+    assert _conversation_key(agent, "10.0.0.1", "known") == "known"
+    assert _conversation_key(agent, "10.0.0.1", "random-1") == "10.0.0.1:new"
+    assert _conversation_key(agent, "10.0.0.1", "random-2") == "10.0.0.1:new"
+    assert _conversation_key(agent, "10.0.0.1", None) == "10.0.0.1:new"
+    print("✅ Rate limit key test passed")
+
+def test_queue_prioritizes_and_sheds():
+    """Test that mid-booking turns jump the queue and displace new ones when full"""
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=2, queue_timeout=5)
+        order = []
+
+        async def turn(name, priority):
+            try:
+                async with controller.slot(priority):
+                    order.append(name)
+                    await asyncio.sleep(0.01)
+            except AdmissionRejected as e:
+                order.append(f"rejected:{name}:{e.retry_after}")
+
+        first = asyncio.create_task(turn("running", PRIORITY_DEFAULT))
+        await asyncio.sleep(0)
+        tasks = [asyncio.create_task(turn("new-1", PRIORITY_DEFAULT))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(turn("new-2", PRIORITY_DEFAULT)))
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(turn("booking", PRIORITY_MID_BOOKING)))
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(turn("new-3", PRIORITY_DEFAULT)))
+        await asyncio.gather(first, *tasks)
+        return order, controller
+
+    order, controller = asyncio.run(scenario())
+
+    assert order[0] == "running"
+    rejected = sorted(entry.split(":")[1] for entry in order if entry.startswith("rejected:"))
+    assert rejected == ["new-2", "new-3"]
+    assert order.index("booking") < order.index("new-1")
+    assert controller.in_flight == 0 and controller.queue_depth() == 0
+    print("✅ Admission priority test passed")
+
+def test_cancelled_waiters_do_not_leak_slots():
+    """Test that a waiter cancelled before or right after the handoff leaves no trace"""
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=4, queue_timeout=5)
+        await controller.acquire()
+
+        early = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+        early.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await early
+        assert controller.queue_depth() == 0
+
+        handed_off = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+        controller.release()
+        handed_off.cancel()
+        try:
+            await handed_off
+            # Some Python versions still admit it; then the caller owns the slot
+            controller.release()
+        except asyncio.CancelledError:
+            pass
+        return controller
+
+    controller = asyncio.run(scenario())
+    assert (controller.in_flight, controller.queue_depth()) == (0, 0)
+    print("✅ Admission cancellation test passed")
@@ -4,18 +4,20 @@ Test cases for the Medical Appointment Scheduling Agent
 import pytest
 import sys
 import os
-from datetime import date, timedelta
+from datetime import timedelta
+from types import SimpleNamespace
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from backend.clinic_clock import clinic_today
 from backend.api.calendly_integration import calendly_api
 from backend.tools.availability_tool import check_availability, suggest_slots
 from backend.tools.booking_tool import book_appointment
 
 def test_availability_check():
     """Test availability checking"""
-    tomorrow = (date.today() + timedelta(days=1)).strftime("%Y-%m-%d")
+    tomorrow = (clinic_today() + timedelta(days=1)).strftime("%Y-%m-%d")
     result = check_availability("consultation", tomorrow)
     
     assert "date" in result or "available_dates" in result
@@ -34,7 +36,7 @@ def test_slot_suggestions():
 
 def test_booking():
     """Test appointment booking"""
-    tomorrow = (date.today() + timedelta(days=1)).strftime("%Y-%m-%d")
+    tomorrow = (clinic_today() + timedelta(days=1)).strftime("%Y-%m-%d")
     
     result = book_appointment(
         appointment_type="consultation",
@@ -52,13 +54,47 @@ def test_booking():
 
 def test_calendly_api_availability():
     """Test Calendly API availability endpoint"""
-    tomorrow = (date.today() + timedelta(days=1)).strftime("%Y-%m-%d")
+    tomorrow = (clinic_today() + timedelta(days=1)).strftime("%Y-%m-%d")
     availability = calendly_api.get_available_slots(tomorrow, "consultation")
     
     assert availability.date == tomorrow
     assert isinstance(availability.available_slots, list)
     print("✅ Calendly API availability test passed")
 
+class RecordingLLM:
+    """Returns a fixed reply and keeps the messages of every completion"""
+
+    def __init__(self, reply: str):
+        self.reply = reply
+        self.requests = []
+
+    def chat_completion(self, **kwargs):
+        self.requests.append(kwargs)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.reply))])
+
+def test_mixed_turn_uses_one_completion(monkeypatch):
+    """Test that FAQ context and prefetched slots are inlined into a single generation"""
+    from backend.agent import scheduling_agent
+    from backend.rag import faq_rag
+
+    llm = RecordingLLM("We accept most major insurance plans, and here are some open times.")
+    monkeypatch.setattr(scheduling_agent, "get_llm_gateway", lambda: llm)
+    monkeypatch.setattr(faq_rag, "get_llm_gateway", lambda: llm)
+    monkeypatch.setenv("ENABLE_RAG", "true")
+    rag = faq_rag.FAQRAG()
+    rag.vector_store.load_clinic_info(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "clinic_info.json"))
+    monkeypatch.setattr(faq_rag, "_faq_rag", rag)
+
+    agent = scheduling_agent.SchedulingAgent()
+    result = agent.process_message("What insurance do you accept? I'd like to book an appointment", "mixed-turn-test")
+
+    assert result["intent"] == "both"
+    assert len(llm.requests) == 1
+    context = llm.requests[0]["messages"][-1]["content"]
+    assert "Relevant Clinic Information" in context
+    assert "Available slots found" in context
+    print("✅ Single completion test passed")
+
 if __name__ == "__main__":
     print("Running tests...")
     test_availability_check()
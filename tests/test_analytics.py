@@ -0,0 +1,116 @@
+"""
+Test cases for booking analytics
+"""
+import sys
+import os
+import random
+import time
+import pytest
+from datetime import date, datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.clinic_clock import clinic_today
+from backend.api.calendly_integration import APPOINTMENT_DURATIONS, MockCalendlyAPI
+from backend.api.capacity import CapacityModel
+from backend.models.records import BookingRecord, minute_stamp
+from backend.state import MemoryBookingStore
+from backend.tools.analytics_tool import (
+    BookingAnalytics,
+    BookingColumns,
+    date_range,
+    demand_vs_capacity,
+    lead_time_histogram,
+    utilization_heatmap
+)
+
+MONDAY = date(2030, 1, 7)
+
+def _record(number, day: date, start: int, appointment_type="consultation", lead_days=None):
+    created = None
+    if lead_days is not None:
+        created = minute_stamp(datetime(day.year, day.month, day.day) - timedelta(days=lead_days)) + start
+    return BookingRecord(
+        f"APPT-{number}", appointment_type, day.toordinal(), start, APPOINTMENT_DURATIONS[appointment_type],
+        "Stats Patient", "stats@example.com", "+1-555-0149", created=created
+    )
+
+def test_metrics_on_known_bookings():
+    """Test heatmap, lead times and demand against hand-computed values"""
+    capacity = CapacityModel({"provider": 1})
+    records = [
+        _record(1, MONDAY, 9 * 60, lead_days=1),
+        _record(2, MONDAY, 9 * 60 + 30, lead_days=10),
+        _record(3, MONDAY + timedelta(days=1), 10 * 60, "specialist", lead_days=40),
+        _record(4, MONDAY + timedelta(days=1), 11 * 60)
+    ]
+    columns = BookingColumns(records, APPOINTMENT_DURATIONS)
+    first, last = MONDAY.toordinal(), MONDAY.toordinal() + 6
+
+    heatmap = utilization_heatmap(columns, capacity, first, last)
+    assert heatmap["hours"] == list(range(9, 17))
+    assert heatmap["utilization"]["provider"][0][:2] == [1.0, 0.0]
+    assert heatmap["utilization"]["provider"][1][1:3] == [1.0, 0.5]
+
+    lead = lead_time_histogram(columns, first, last)
+    assert (lead["bookings"], lead["excluded"], lead["median_days"]) == (3, 1, 10.0)
+    assert [b["count"] for b in lead["bins"] if b["count"]] == [1, 1, 1]
+    assert lead_time_histogram(columns, first, last, "specialist")["bookings"] == 1
+
+    api = MockCalendlyAPI(MemoryBookingStore(), capacity)
+    demand = demand_vs_capacity(columns, capacity, first, first, api._slot_starts)
+    assert demand["consultation"]["booked"] == 2
+    assert demand["consultation"]["bookable_slots"] == 16
+    assert demand["consultation"]["open_slots"] == 14
+    assert demand["specialist"]["open_slots"] == 13
+    print("✅ Analytics metrics test passed")
+
+def test_results_cached_until_booking_change(book):
+    """Test that a repeated range is served from cache and a booking invalidates it"""
+    api = MockCalendlyAPI(MemoryBookingStore())
+    analytics = BookingAnalytics(api)
+    day = (clinic_today() + timedelta(days=2)).isoformat()
+
+    heatmap = analytics.heatmap(day, day)
+    assert analytics.heatmap(day, day) is heatmap
+    first = analytics.demand(day, day)
+
+    book(api, day)
+    waitlist = [{"status": "waiting", "appointment_type": "physical", "start_date": day, "end_date": day}]
+    second = analytics.demand(day, day, waitlist)
+    assert second["consultation"]["booked"] == first["consultation"]["booked"] + 1
+    assert second["physical"]["waitlisted"] == 1
+    assert analytics.lead_times(day, day)["bookings"] == 1
+    assert analytics.heatmap(day, day) is not heatmap
+
+    with pytest.raises(ValueError):
+        analytics.demand("0001-01-01", "9999-12-31")
+    first, last = date_range("2027-01-01", "2029-12-31")
+    assert last - first == 1095
+    print("✅ Analytics cache test passed")
+
+def test_multi_year_history_is_fast():
+    """Test that three years of bookings are analysed in well under a second"""
+    rng = random.Random(7)
+    first_day = date(2027, 1, 1)
+    types = list(APPOINTMENT_DURATIONS)
+    records = [
+        _record(i, first_day + timedelta(days=rng.randrange(3 * 365)), rng.randrange(9 * 60, 16 * 60, 30),
+                rng.choice(types), lead_days=rng.randrange(60))
+        for i in range(200000)
+    ]
+    capacity = CapacityModel({"provider": 3, "exam_room": 4})
+    api = MockCalendlyAPI(MemoryBookingStore(), capacity)
+    first, last = first_day.toordinal(), first_day.toordinal() + 3 * 365 - 1
+
+    started = time.perf_counter()
+    columns = BookingColumns(records, APPOINTMENT_DURATIONS)
+    utilization_heatmap(columns, capacity, first, last)
+    lead_time_histogram(columns, first, last)
+    demand = demand_vs_capacity(columns, capacity, first, last, api._slot_starts)
+    elapsed = time.perf_counter() - started
+
+    assert sum(stats["booked"] for stats in demand.values()) == len(records)
+    assert elapsed < 1.0, elapsed
+    print(f"✅ Analytics performance test passed ({elapsed:.2f}s for {len(records)} bookings)")
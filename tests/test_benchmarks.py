@@ -0,0 +1,49 @@
+"""
+Test cases for the benchmark harness
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import compare, percentile, summarize
+
+def test_percentiles():
+    """Test nearest-rank percentiles"""
+    samples = [i / 1000 for i in range(1, 101)]
+    stats = summarize(samples, elapsed=1.0)
+
+    assert percentile(samples, 50) == 0.05
+    assert stats["p99_ms"] == 99.0
+    assert stats["rps"] == 100
+    print("✅ Percentile test passed")
+
+def test_baseline_comparison_flags_regressions():
+    """Test that only regressions past the threshold are reported"""
+    baseline = {"fast": {"p95_ms": 1.0}, "slow": {"p95_ms": 1.0}}
+    results = {"fast": {"p95_ms": 1.1}, "slow": {"p95_ms": 2.0}, "new": {"p95_ms": 5.0}}
+
+    regressions = compare(results, baseline, threshold=0.2)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith("slow:")
+    print("✅ Baseline comparison test passed")
+
+def test_importtime_parsing():
+    """Test parsing of -X importtime output"""
+    from benchmarks.importtime import heaviest, parse_importtime, total_seconds
+    output = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       100 |        100 |     fastapi.params",
+        "import time:       400 |        500 |   fastapi",
+        "import time:      1000 |       1500 | backend.main",
+        "import time:       200 |        200 | json"
+    ])
+
+    rows = parse_importtime(output)
+
+    assert [row["depth"] for row in rows] == [2, 1, 0, 0]
+    assert total_seconds(rows) == 0.0017
+    assert heaviest(rows, top=1) == [{"package": "backend", "ms": 1.0}]
+    print("✅ Import-time parsing test passed")
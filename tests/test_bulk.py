@@ -0,0 +1,99 @@
+"""
+Test cases for bulk booking import and export
+"""
+import json
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from backend.api.bulk import router as bulk_router
+from backend.tools import bulk_tool
+from backend.tools.bulk_tool import import_bookings, iter_export
+
+def _row(date, start_time, email="bulk@example.com"):
+    return {
+        "appointment_type": "consultation",
+        "date": date,
+        "start_time": start_time,
+        "patient": {"name": "Bulk Patient", "email": email, "phone": "+1-555-0101"}
+    }
+
+def test_import_reports_conflicts_per_row():
+    """Test chunked import with invalid and conflicting rows"""
+    rows = [
+        _row("2031-03-03", "09:00"),
+        _row("2031-03-03", "09:00"),
+        _row("2031-03-03", "10:00", email="not-an-email"),
+        _row("2031-03-03", "9am"),
+        _row("2031-03-03", "11:00"),
+    ]
+    summary = import_bookings(enumerate(rows, start=1), chunk_size=2)
+
+    assert summary["total"] == 5
+    assert summary["imported"] == 2
+    assert [error["line"] for error in summary["errors"]] == [2, 3, 4]
+    print("✅ Bulk import test passed")
+
+def test_import_summary_caps_errors(monkeypatch):
+    """Test that the summary counts every failure but keeps only the first errors"""
+    monkeypatch.setattr(bulk_tool, "MAX_REPORTED_ERRORS", 2)
+    summary = import_bookings(enumerate([{"_error": "bad"}] * 5, start=1))
+
+    assert summary["failed"] == 5
+    assert [error["line"] for error in summary["errors"]] == [1, 2]
+    print("✅ Bulk import error cap test passed")
+
+def test_export_round_trip():
+    """Test CSV and JSONL export streams"""
+    import_bookings(enumerate([_row("2031-04-07", "13:00")], start=1))
+
+    lines = list(iter_export("jsonl", "2031-04-07", "2031-04-07"))
+    assert len(lines) == 1
+    assert json.loads(lines[0])["start_time"] == "13:00"
+
+    csv_text = "".join(iter_export("csv", "2031-04-07", "2031-04-07"))
+    assert csv_text.splitlines()[0].startswith("booking_id,")
+    assert len(csv_text.splitlines()) == 2
+    print("✅ Bulk export test passed")
+
+def test_import_endpoint_streams_csv():
+    """Test the streaming CSV import endpoint"""
+    app = FastAPI()
+    app.include_router(bulk_router, prefix="/api/calendly")
+    client = TestClient(app)
+
+    body = (
+        "appointment_type,date,start_time,patient_name,patient_email,patient_phone\n"
+        "followup,2031-05-05,09:00,Ann,ann@example.com,555-0102\n"
+        "followup,2031-05-05,09:00,Bob,bob@example.com,555-0103\n"
+    )
+    response = client.post("/api/calendly/import", params={"format": "csv"}, content=body)
+
+    assert response.status_code == 200
+    assert response.json()["imported"] == 1
+    assert response.json()["errors"][0]["line"] == 3
+    print("✅ Bulk import endpoint test passed")
+
+def test_import_endpoint_keeps_quoted_newlines():
+    """Test that a quoted CSV field may span lines"""
+    app = FastAPI()
+    app.include_router(bulk_router, prefix="/api/calendly")
+    client = TestClient(app)
+
+    body = (
+        "appointment_type,date,start_time,patient_name,patient_email,patient_phone,reason\n"
+        'followup,2031-05-06,09:00,Ann,ann@example.com,555-0102,"Knee pain,\nsince March"\n'
+        "followup,2031-05-06,09:00,Bob,bob@example.com,555-0103,\n"
+        'followup,2031-05-06,10:00,Cy,cy@example.com,555-0104,"unterminated\n'
+    )
+    response = client.post("/api/calendly/import", params={"format": "csv"}, content=body)
+
+    assert response.json()["imported"] == 1
+    assert sorted(error["line"] for error in response.json()["errors"]) == [4, 5]
+    booking = next(iter_export("jsonl", "2031-05-06", "2031-05-06"))
+    assert json.loads(booking)["reason"] == "Knee pain,\nsince March"
+    print("✅ Bulk import quoted newline test passed")
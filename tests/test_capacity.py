@@ -0,0 +1,93 @@
+"""
+Test cases for capacity-aware scheduling
+"""
+import sys
+import os
+import time
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.api.calendly_integration import MockCalendlyAPI
+from backend.api.capacity import CapacityModel
+from backend.models.schemas import BookingRequest
+
+DAY = "2031-12-02"
+
+CLINIC = {
+    "resources": {"provider": 2, "exam_room": 2, "nurse": 1},
+    "appointment_resources": {
+        "consultation": {"provider": 1, "exam_room": 1},
+        "followup": {"nurse": 1},
+        "physical": {"provider": 1, "exam_room": 1, "nurse": 1},
+        "specialist": {"provider": 1, "exam_room": 1}
+    }
+}
+
+def test_duration_blocks_following_slots(book):
+    """Test that a long appointment occupies every slot it covers"""
+    api = MockCalendlyAPI()
+    book(api, DAY, "10:00", "specialist")
+
+    assert not api.is_slot_available(DAY, "10:30", "consultation")
+    assert api.is_slot_available(DAY, "11:00", "consultation")
+    assert api.get_booked_intervals(DAY, "consultation") == [(600, 660)]
+    print("✅ Duration-aware occupancy test passed")
+
+def test_parallel_rooms_and_shared_resources(book, patient):
+    """Test parallel providers and a scarce nurse shared by two appointment types"""
+    api = MockCalendlyAPI(capacity=CapacityModel.from_config(CLINIC))
+    book(api, DAY, "10:00", "consultation")
+    book(api, DAY, "10:00", "consultation")
+    with pytest.raises(ValueError):
+        book(api, DAY, "10:00", "consultation")
+
+    # Rooms are full, but a nurse-only follow-up still fits
+    assert api.is_slot_available(DAY, "10:00", "followup")
+    book(api, DAY, "14:00", "physical")
+    assert not api.is_slot_available(DAY, "14:30", "followup")
+    assert api.get_occupancy(DAY)["exam_room"] == pytest.approx((2 * 30 + 45) / (2 * 480), abs=1e-3)
+
+    conflicts = api.find_conflicts([
+        BookingRequest(appointment_type="physical", date=DAY, start_time="15:00", patient=patient),
+        BookingRequest(appointment_type="followup", date=DAY, start_time="15:00", patient=patient)
+    ])
+    assert list(conflicts) == [1]
+    print("✅ Parallel resources test passed")
+
+def test_overbooking_from_no_show_rates(book):
+    """Test that overbooking admits extra bookings only where no-shows justify it"""
+    config = {
+        "resources": {"provider": 5},
+        "overbooking": {"enabled": True, "max_ratio": 0.2, "no_show_rates": {"consultation": 0.2}}
+    }
+    api = MockCalendlyAPI(capacity=CapacityModel.from_config(config))
+    for _ in range(6):
+        book(api, DAY, "09:00", "consultation")
+    with pytest.raises(ValueError):
+        book(api, DAY, "09:00", "consultation")
+
+    for _ in range(5):
+        book(api, DAY, "13:00", "specialist")
+    with pytest.raises(ValueError):
+        book(api, DAY, "13:00", "specialist")
+    print("✅ Overbooking policy test passed")
+
+def test_week_horizon_stays_fast(book):
+    """Test multi-resource availability over a week with a busy calendar"""
+    api = MockCalendlyAPI(capacity=CapacityModel.from_config(CLINIC))
+    days = [f"2031-12-{day:02d}" for day in range(1, 8)]
+    for day in days:
+        for start_time in ("09:00", "10:00", "11:00", "14:00"):
+            book(api, day, start_time, "physical")
+
+    started = time.perf_counter()
+    for _ in range(100):
+        for appointment_type in ("consultation", "followup", "physical"):
+            for day in days:
+                api.get_free_starts(day, appointment_type)
+    per_week = (time.perf_counter() - started) / 300
+
+    assert per_week < 0.005
+    print("✅ Week horizon performance test passed")
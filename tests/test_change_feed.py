@@ -0,0 +1,96 @@
+"""
+Test cases for the booking change feed
+"""
+import sys
+import os
+import asyncio
+import threading
+import pytest
+from datetime import timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.clinic_clock import clinic_today
+from backend.api.calendly_integration import MockCalendlyAPI
+from backend.api.change_feed import ChangeFeed
+from backend.state import BookingArchive, MemoryBookingStore, SQLiteBookingStore
+
+DAY = (clinic_today() + timedelta(days=4)).isoformat()
+
+def test_deltas_and_paging(book):
+    """Test snapshot on first read, then only the changes after the cursor, page by page"""
+    api = MockCalendlyAPI(MemoryBookingStore())
+    existing = book(api, DAY, "09:00")
+
+    first = api.get_changes()
+    assert first["reset"] and [b["booking_id"] for b in first["bookings"]] == [existing]
+
+    moved = book(api, DAY, "10:00")
+    api.reschedule_appointment(moved, DAY, "11:00")
+    api.cancel_appointment(existing)
+
+    page = api.get_changes(first["cursor"], limit=2)
+    assert [(c["op"], c["event"]) for c in page["changes"]] == [("upsert", "booked"), ("upsert", "rescheduled")]
+    assert page["has_more"]
+    page = api.get_changes(page["cursor"], limit=2)
+    assert [(c["op"], c["booking_id"]) for c in page["changes"]] == [("delete", existing)]
+    assert not page["has_more"]
+    assert api.get_changes(page["cursor"])["changes"] == []
+
+    with pytest.raises(ValueError):
+        api.get_changes("not a cursor")
+    assert api.get_changes("0123abcd-1")["reset"]
+    print("✅ Change feed delta test passed")
+
+def test_expired_cursor_resyncs(book):
+    """Test that a cursor older than the retained window gets a snapshot"""
+    api = MockCalendlyAPI(MemoryBookingStore())
+    api.changes = ChangeFeed(retention=2)
+    cursor = api.get_changes()["cursor"]
+    ids = [book(api, DAY, f"{hour:02d}:00") for hour in (9, 10, 11)]
+
+    result = api.get_changes(cursor)
+    assert result["reset"]
+    assert sorted(b["booking_id"] for b in result["bookings"]) == sorted(ids)
+    print("✅ Change feed resync test passed")
+
+def test_long_poll_wakes_on_change(book):
+    """Test that a waiting reader returns as soon as a booking is made"""
+    api = MockCalendlyAPI(MemoryBookingStore())
+    cursor = api.get_changes()["cursor"]
+
+    async def poll():
+        assert not await api.changes.wait(cursor, 0.05)
+        threading.Timer(0.05, book, args=(api, DAY, "14:00")).start()
+        return await api.changes.wait(cursor, 5)
+
+    assert asyncio.run(poll())
+    assert api.get_changes(cursor)["changes"][0]["event"] == "booked"
+    print("✅ Change feed long-poll test passed")
+
+def test_cursors_work_on_every_worker(tmp_path, book):
+    """Test that with a shared store any worker continues a cursor from another"""
+    path = str(tmp_path / "state.db")
+    worker_a = MockCalendlyAPI(SQLiteBookingStore(path), archive=BookingArchive(str(tmp_path / "archive")))
+    worker_b = MockCalendlyAPI(SQLiteBookingStore(path))
+    past = book(worker_a, clinic_today() - timedelta(days=1))
+
+    first = worker_a.get_changes()
+    assert first["reset"] and [b["booking_id"] for b in first["bookings"]] == [past]
+
+    booked = book(worker_a, DAY, "09:00")
+    cancelled = book(worker_b, DAY, "10:00")
+    worker_b.reschedule_appointment(booked, DAY, "11:00")
+    worker_a.cancel_appointment(cancelled)
+    worker_a.archive_past()
+
+    page = worker_b.get_changes(first["cursor"], limit=1)
+    assert not page["reset"] and page["has_more"]
+    assert [(c["op"], c["booking_id"]) for c in page["changes"]] == [("upsert", booked)]
+    assert page["changes"][0]["booking"]["start_time"] == "11:00"
+    page = worker_a.get_changes(page["cursor"])
+    # The archived past booking is not reported as a cancellation
+    assert [(c["op"], c["event"], c["booking_id"]) for c in page["changes"]] == [("delete", "cancelled", cancelled)]
+    assert worker_b.get_changes(page["cursor"])["changes"] == []
+    print("✅ Change feed shared cursor test passed")
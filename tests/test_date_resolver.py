@@ -0,0 +1,61 @@
+"""
+Test cases for the natural-language date resolver
+"""
+import sys
+import os
+from datetime import date
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.api.calendly_integration import calendly_api
+from backend.models.schemas import BookingRequest
+from backend.tools import availability_tool
+from backend.tools.availability_tool import suggest_slots
+from backend.tools.date_resolver import resolve
+
+# A Monday
+TODAY = date(2031, 9, 1)
+
+def test_relative_phrases_resolve_to_dates():
+    """Test relative days, weekdays and week ranges"""
+    assert resolve("Can I come tomorrow?", TODAY)["start_date"] == "2031-09-02"
+    assert resolve("this thursday works", TODAY)["start_date"] == "2031-09-04"
+    assert resolve("next Tuesday", TODAY)["start_date"] == "2031-09-09"
+
+    this_week = resolve("sometime this week", TODAY)
+    assert (this_week["start_date"], this_week["end_date"]) == ("2031-09-01", "2031-09-07")
+    next_week = resolve("next week please", TODAY)
+    assert (next_week["start_date"], next_week["end_date"]) == ("2031-09-08", "2031-09-14")
+    print("✅ Relative date test passed")
+
+def test_explicit_dates_and_time_windows():
+    """Test explicit dates, clock times and parts of the day"""
+    assert resolve("on 9/15 at 2:30pm", TODAY)["time_window"] == (14 * 60 + 30, 15 * 60 + 30)
+    assert resolve("March 3rd", TODAY)["start_date"] == "2032-03-03"
+    assert resolve("2031-10-01", TODAY)["start_date"] == "2031-10-01"
+    assert resolve("between 2 and 4pm", TODAY)["time_window"] == (14 * 60, 16 * 60)
+
+    afternoon = resolve("next Tuesday afternoon", TODAY)
+    assert afternoon["start_date"] == "2031-09-09"
+    assert afternoon["time_preference"] == "afternoon"
+
+    # Words that only look like dates or times
+    assert resolve("I sat with my doctor about 2 weeks ago", TODAY) == {}
+    assert resolve("as soon as possible", TODAY) == {"asap": True}
+    print("✅ Explicit date and time test passed")
+
+def test_suggest_slots_queries_resolved_window(monkeypatch):
+    """Test that a phrase like 'wednesday after 3pm' only suggests slots in that window"""
+    monkeypatch.setattr(availability_tool, "clinic_today", lambda: TODAY)
+    patient = {"name": "Resolver Patient", "email": "resolver@example.com", "phone": "+1-555-0130"}
+    calendly_api.book_appointment(BookingRequest(
+        appointment_type="consultation", date="2031-09-03", start_time="15:00", patient=patient
+    ))
+
+    suggestions = suggest_slots({"date_preference": "wednesday after 3pm"}, "consultation")
+
+    assert suggestions
+    assert {slot["date"] for slot in suggestions} == {"2031-09-03"}
+    assert all(slot["time"] >= "15:30" for slot in suggestions)
+    print("✅ Resolved suggestion window test passed")
@@ -0,0 +1,96 @@
+"""
+Test cases for the journaled booking store
+"""
+import sys
+import os
+import threading
+import pytest
+from datetime import timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.clinic_clock import clinic_today
+from backend.api.calendly_integration import MockCalendlyAPI
+from backend.state import JournalBookingStore
+
+def _restart(directory, snapshot_every=1000):
+    return MockCalendlyAPI(JournalBookingStore(str(directory), snapshot_every=snapshot_every, fsync=False))
+
+def test_recovery_replays_bookings_and_cancellations(tmp_path, book):
+    """Test that a restarted API sees the same bookings and keeps numbering after them"""
+    day = (clinic_today() + timedelta(days=3)).isoformat()
+    api = _restart(tmp_path)
+    kept = book(api, day, "09:00")
+    cancelled = book(api, day, "09:30")
+    api.cancel_appointment(cancelled)
+    api.store.close()
+
+    recovered = _restart(tmp_path)
+    assert set(recovered.bookings) == {kept}
+    assert recovered.bookings[kept]["start_time"] == "09:00"
+    assert recovered.store.recovery["replayed"] == 3
+    assert book(recovered, day, "10:00") not in (kept, cancelled)
+    with pytest.raises(ValueError):
+        book(recovered, day, "09:00")
+    recovered.store.close()
+    print("✅ Journal recovery test passed")
+
+def test_snapshot_bounds_replay(tmp_path, book):
+    """Test that recovery starts from the latest snapshot instead of the full history"""
+    api = _restart(tmp_path, snapshot_every=4)
+    first = clinic_today() + timedelta(days=2)
+    ids = [book(api, (first + timedelta(days=i // 8)).isoformat(), f"{9 + i % 8:02d}:00") for i in range(20)]
+    api.store.close()
+    for thread in threading.enumerate():
+        if thread.name == "journal-snapshot":
+            thread.join()
+
+    recovered = _restart(tmp_path, snapshot_every=4)
+    assert set(recovered.bookings) == set(ids)
+    assert recovered.store.recovery["snapshot_seq"] > 0
+    assert recovered.store.recovery["replayed"] < 4
+    assert len([name for name in os.listdir(tmp_path) if name.startswith("snapshot-")]) == 1
+    recovered.store.close()
+    print("✅ Journal snapshot test passed")
+
+def test_concurrent_bookings_share_commits(tmp_path, book):
+    """Test that bookings from many threads are all durable and recovered"""
+    api = _restart(tmp_path)
+    day = clinic_today() + timedelta(days=5)
+    ids = []
+
+    def book_one(i):
+        ids.append(book(api, (day + timedelta(days=i // 8)).isoformat(), f"{9 + i % 8:02d}:00"))
+
+    threads = [threading.Thread(target=book_one, args=(i,)) for i in range(32)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    api.store.close()
+
+    recovered = _restart(tmp_path)
+    assert set(recovered.bookings) == set(ids) and len(ids) == 32
+    recovered.store.close()
+    print("✅ Journal group commit test passed")
+
+def test_torn_write_is_cut_before_new_entries(tmp_path, book):
+    """Test that bookings made after recovering from a torn write survive the next restart"""
+    day = (clinic_today() + timedelta(days=6)).isoformat()
+    api = _restart(tmp_path)
+    first = book(api, day, "09:00")
+    api.store.close()
+    # A crash mid-append leaves a partial line starting the next segment
+    with open(os.path.join(tmp_path, "journal-000000000002.log"), "w") as f:
+        f.write('{"seq": 2, "op": "put", "boo')
+
+    recovered = _restart(tmp_path)
+    assert set(recovered.bookings) == {first}
+    later = [book(recovered, day, "10:00"), book(recovered, day, "11:00")]
+    recovered.store.close()
+
+    restarted = _restart(tmp_path)
+    assert set(restarted.bookings) == {first, *later}
+    restarted.store.close()
+    print("✅ Journal torn write test passed")
@@ -0,0 +1,154 @@
+"""
+Test cases for the LLM gateway against the local stub server
+"""
+import sys
+import os
+import time
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.llm.gateway import CircuitBreaker, CircuitOpenError, LLMGateway
+from backend.llm.stub_server import StubServer, StubState
+
+MESSAGES = [{"role": "user", "content": "Hello"}]
+
+@pytest.fixture
+def stub():
+    server = StubServer(StubState()).start()
+    yield server
+    server.stop()
+
+def _gateway(stub, **kwargs):
+    kwargs.setdefault("backoff_base", 0.01)
+    return LLMGateway(api_key="test", base_url=stub.base_url, **kwargs)
+
+def test_retries_server_errors(stub):
+    """Test that 5xx responses are retried with backoff"""
+    stub.state.fail_first = 2
+    gateway = _gateway(stub, max_retries=2)
+
+    response = gateway.chat_completion(model="stub", messages=MESSAGES)
+
+    assert response.choices[0].message.content == stub.state.reply
+    assert stub.state.requests == 3
+    print("✅ LLM retry test passed")
+
+def test_circuit_breaker_fails_fast(stub):
+    """Test that the breaker opens and stops calling the provider"""
+    stub.state.fail_first = 100
+    gateway = _gateway(stub, max_retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+
+    for _ in range(2):
+        with pytest.raises(Exception):
+            gateway.chat_completion(model="stub", messages=MESSAGES)
+    with pytest.raises(CircuitOpenError):
+        gateway.chat_completion(model="stub", messages=MESSAGES)
+
+    assert stub.state.requests == 2
+    print("✅ Circuit breaker test passed")
+
+def test_retries_count_as_one_breaker_failure(stub):
+    """Test that a call's retries don't each count towards opening the breaker"""
+    stub.state.fail_first = 3
+    gateway = _gateway(stub, max_retries=2, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+
+    with pytest.raises(Exception):
+        gateway.chat_completion(model="stub", messages=MESSAGES)
+
+    assert stub.state.requests == 3
+    assert gateway.breaker.state == "closed"
+    print("✅ Circuit breaker retry count test passed")
+
+def test_long_retry_after_is_not_waited_out(stub):
+    """Test that a Retry-After beyond backoff_max fails the call at once"""
+    stub.state.fail_first = 1
+    stub.state.fail_status = 429
+    stub.state.retry_after = 60
+    gateway = _gateway(stub, max_retries=2, backoff_max=1.0)
+
+    started = time.monotonic()
+    with pytest.raises(Exception):
+        gateway.chat_completion(model="stub", messages=MESSAGES)
+
+    assert time.monotonic() - started < 1.0
+    assert stub.state.requests == 1
+    print("✅ LLM Retry-After cap test passed")
+
+def test_non_retryable_error_ends_half_open_trial(stub):
+    """Test that a 400 on the trial call closes the breaker instead of wedging it half-open"""
+    stub.state.fail_first = 2
+    gateway = _gateway(stub, max_retries=0, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.05))
+    with pytest.raises(Exception):
+        gateway.chat_completion(model="stub", messages=MESSAGES)
+    assert gateway.breaker.state == "open"
+
+    time.sleep(0.1)
+    stub.state.fail_status = 400
+    with pytest.raises(Exception) as error:
+        gateway.chat_completion(model="stub", messages=MESSAGES)
+    assert not isinstance(error.value, CircuitOpenError)
+
+    response = gateway.chat_completion(model="stub", messages=MESSAGES)
+    assert response.choices[0].message.content == stub.state.reply
+    print("✅ Circuit breaker half-open test passed")
+
+def test_hedging_cuts_tail_latency(stub):
+    """Test that a hedged request answers before a stalled one"""
+    stub.state.delays = [1.0, 0.0]
+    gateway = _gateway(stub, hedge_after=0.1)
+
+    started = time.monotonic()
+    gateway.chat_completion(model="stub", messages=MESSAGES)
+
+    assert time.monotonic() - started < 0.8
+    print("✅ Request hedging test passed")
+
+def test_record_then_replay_offline(stub, tmp_path):
+    """Test that recorded calls replay without the provider"""
+    from backend.llm.cassette import Cassette, CassetteMissError, LatencyModel, RecordReplay
+    path = str(tmp_path / "cassette.jsonl")
+    messages = [{"role": "user", "content": "Today is 2031-01-02, any slots?"}]
+
+    recorder = _gateway(stub, record_replay=RecordReplay("record", Cassette(path)))
+    recorded = recorder.chat_completion(model="stub", messages=messages)
+
+    player = LLMGateway(
+        api_key="replay",
+        base_url="http://127.0.0.1:9/v1",
+        record_replay=RecordReplay("replay", Cassette(path), LatencyModel("fixed:0.05"))
+    )
+    started = time.monotonic()
+    next_day = [{"role": "user", "content": "Today is 2031-01-03, any slots?"}]
+    replayed = player.chat_completion(model="stub", messages=next_day)
+
+    assert replayed.choices[0].message.content == recorded.choices[0].message.content
+    assert replayed.usage.total_tokens == recorded.usage.total_tokens
+    assert time.monotonic() - started >= 0.05
+    assert stub.state.requests == 1
+    with pytest.raises(CassetteMissError):
+        player.chat_completion(model="stub", messages=MESSAGES)
+    print("✅ LLM record/replay test passed")
+
+def test_static_prompt_prefix_counts_cached_tokens(stub):
+    """Test that different conversations share a cacheable prompt prefix"""
+    from backend.agent.prompts import STATIC_PREFIX, build_messages
+    from backend.monitoring.metrics import LLM_PROMPT_TOKENS
+    gateway = _gateway(stub)
+
+    first = build_messages([{"role": "user", "content": "I need a checkup"}])
+    second = build_messages(
+        [{"role": "user", "content": "Do you take Aetna?"}],
+        faq_context="We accept Aetna."
+    )
+    assert first[0] == second[0] and first[0]["content"] == STATIC_PREFIX
+    assert second[-1]["role"] == "system" and "We accept Aetna." in second[-1]["content"]
+
+    gateway.chat_completion(call="prefix_test", model="stub", messages=first)
+    gateway.chat_completion(call="prefix_test", model="stub", messages=second)
+
+    cached = LLM_PROMPT_TOKENS.value(call="prefix_test", model="stub", cache="cached")
+    assert cached == len(STATIC_PREFIX.split())
+    assert LLM_PROMPT_TOKENS.value(call="prefix_test", model="stub", cache="uncached") > 0
+    print("✅ Prompt prefix caching test passed")
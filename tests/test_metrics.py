@@ -0,0 +1,39 @@
+"""
+Test cases for metrics and request IDs
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.monitoring.metrics import Histogram
+
+def test_metrics_endpoint_and_request_id():
+    """Test that requests are tagged and counted"""
+    client = TestClient(app)
+
+    response = client.get("/health", headers={"X-Request-ID": "req-123"})
+    assert response.headers["x-request-id"] == "req-123"
+
+    body = client.get("/metrics").text
+    assert 'http_requests_total{method="GET",route="/health",status="200"}' in body
+    assert "# TYPE agent_stage_seconds histogram" in body
+    assert "calendly_bookings " in body
+    print("✅ Metrics endpoint test passed")
+
+def test_histogram_buckets_are_cumulative():
+    """Test histogram rendering"""
+    histogram = Histogram("test_seconds", "Test", ("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="a")
+    histogram.observe(0.5, stage="a")
+    histogram.observe(5.0, stage="a")
+
+    lines = histogram.render()
+    assert 'test_seconds_bucket{stage="a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{stage="a",le="1.0"} 2' in lines
+    assert 'test_seconds_bucket{stage="a",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{stage="a"} 3' in lines
+    print("✅ Histogram test passed")
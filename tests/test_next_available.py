@@ -0,0 +1,52 @@
+"""
+Test cases for the next-available index
+"""
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.clinic_clock import clinic_today
+from backend.api import next_available
+from backend.api.calendly_integration import MockCalendlyAPI
+from backend.state import MemoryBookingStore
+
+def _fill_day(book, api, day: str):
+    """Book a day solid with one-hour appointments"""
+    return [book(api, day, f"{hour:02d}:00", "specialist") for hour in range(9, 17)]
+
+def test_index_follows_bookings_and_cancellations(book):
+    """Test that booking out a day moves the answer and a cancellation brings it back"""
+    api = MockCalendlyAPI(MemoryBookingStore())
+    today = clinic_today().isoformat()
+    tomorrow = (clinic_today() + timedelta(days=1)).isoformat()
+
+    assert api.get_next_available("consultation")["date"] == today
+    ids = _fill_day(book, api, today)
+    assert api.get_next_available("consultation") == {
+        "appointment_type": "consultation", "date": tomorrow, "start_time": "09:00", "duration_minutes": 30
+    }
+
+    api.cancel_appointment(ids[5])
+    assert api.get_next_available("consultation")["date"] == today
+    assert api.get_next_available("consultation")["start_time"] == "14:00"
+    assert api.get_next_available("consultation", "morning")["date"] == tomorrow
+
+    api.place_hold(tomorrow, "09:00", "hold-1", datetime.now() + timedelta(minutes=5))
+    assert api.get_next_available("followup", "morning")["start_time"] == "09:30"
+    print("✅ Next-available index test passed")
+
+def test_index_rolls_over_days(monkeypatch, book):
+    """Test that the horizon moves forward when the date changes"""
+    api = MockCalendlyAPI(MemoryBookingStore())
+    today = clinic_today()
+    tomorrow = today + timedelta(days=1)
+    _fill_day(book, api, tomorrow.isoformat())
+    assert api.get_next_available("specialist")["date"] == today.isoformat()
+
+    monkeypatch.setattr(next_available, "clinic_today", lambda: tomorrow)
+    assert api.get_next_available("specialist")["date"] == (tomorrow + timedelta(days=1)).isoformat()
+    assert api.next_available._free_days[("specialist", "any")][0] == tomorrow.toordinal() + 1
+    print("✅ Next-available rollover test passed")
@@ -0,0 +1,101 @@
+"""
+Test cases for the notification job queue
+"""
+import json
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.notifications.queue import NotificationQueue
+from backend.notifications.senders import FileSender, NotificationSender
+
+class FlakySender(NotificationSender):
+    """Fails a fixed number of times before succeeding"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.sent = []
+
+    def send(self, recipient, subject, body):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("gateway unavailable")
+        self.sent.append(recipient)
+
+def test_file_sender_delivery(tmp_path):
+    """Test that queued messages reach the file outbox"""
+    outbox = str(tmp_path / "outbox.jsonl")
+    queue = NotificationQueue({"email": FileSender(outbox, "email")})
+
+    queue.enqueue("email", "patient@example.com", "Confirmed", "See you soon")
+    assert queue.drain(timeout=5)
+    queue.stop()
+
+    with open(outbox) as f:
+        record = json.loads(f.readline())
+    assert record["to"] == "patient@example.com"
+    print("✅ Notification delivery test passed")
+
+def test_retry_with_backoff():
+    """Test that failed sends are retried until they succeed"""
+    sender = FlakySender(failures=2)
+    queue = NotificationQueue({"sms": sender}, base_delay=0.01, max_delay=0.05)
+
+    job_id = queue.enqueue("sms", "+1-555-0140", "Reminder", "Tomorrow at 10:00")
+    assert queue.drain(timeout=5)
+    queue.stop()
+
+    assert sender.sent == ["+1-555-0140"]
+    assert queue.jobs[job_id]["attempts"] == 3
+    print("✅ Notification retry test passed")
+
+def test_pending_jobs_survive_restart(tmp_path):
+    """Test that persisted jobs are reloaded by a new queue"""
+    db_path = str(tmp_path / "notifications.db")
+    first = NotificationQueue({}, db_path=db_path)
+    first._ensure_started = lambda: None  # simulate a crash before delivery
+    first.enqueue("email", "later@example.com", "Confirmed", "Body")
+
+    sender = FlakySender(failures=0)
+    second = NotificationQueue({"email": sender}, db_path=db_path)
+    second.start()
+    assert second.drain(timeout=5)
+    second.stop()
+
+    assert sender.sent == ["later@example.com"]
+    print("✅ Notification persistence test passed")
+
+def test_shared_jobs_are_sent_once(tmp_path):
+    """Test that processes sharing the database don't both deliver a reloaded job"""
+    db_path = str(tmp_path / "notifications.db")
+    first = NotificationQueue({}, db_path=db_path)
+    first._ensure_started = lambda: None
+    job_ids = [first.enqueue("email", f"patient{i}@example.com", "Confirmed", "Body") for i in range(5)]
+
+    sender = FlakySender(failures=0)
+    workers = [NotificationQueue({"email": sender}, db_path=db_path) for _ in range(3)]
+    for queue in workers:
+        assert set(queue.jobs) == set(job_ids)
+        queue.start()
+    for queue in workers:
+        assert queue.drain(timeout=5)
+        queue.stop()
+
+    assert sorted(sender.sent) == [f"patient{i}@example.com" for i in range(5)]
+    print("✅ Notification claim test passed")
+
+def test_finished_jobs_are_pruned():
+    """Test that only the most recent finished jobs stay in memory"""
+    sender = FlakySender(failures=0)
+    queue = NotificationQueue({"email": sender}, keep_finished=2)
+
+    job_ids = [queue.enqueue("email", f"patient{i}@example.com", "Confirmed", "Body") for i in range(5)]
+    assert queue.drain(timeout=5)
+    queue.stop()
+
+    assert len(sender.sent) == 5
+    assert len(queue.jobs) == 2 and set(queue.jobs) <= set(job_ids)
+    assert queue.stats() == {"sent": 2}
+    print("✅ Notification pruning test passed")
@@ -0,0 +1,41 @@
+"""
+Test cases for the compact booking representation
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.api.calendly_integration import MockCalendlyAPI
+from backend.models.records import BookingRecord, format_time, parse_date, parse_time
+
+def test_record_round_trip(patient):
+    """Test that records convert to and from the public booking dict"""
+    details = {
+        "booking_id": "APPT-2031-001", "appointment_type": "physical", "date": "2031-11-04",
+        "start_time": "13:30", "patient": patient, "reason": "Annual",
+        "duration_minutes": 45, "status": "confirmed", "series_id": "SER-1"
+    }
+
+    record = BookingRecord.from_dict(details)
+
+    assert (record.start, record.end) == (810, 855)
+    assert record.day == parse_date("2031-11-04")
+    assert record.to_dict() == details
+    assert not hasattr(record, "__dict__")
+    assert format_time(parse_time("09:05")) == "09:05"
+    print("✅ Booking record round-trip test passed")
+
+def test_public_shapes_at_the_boundary(book):
+    """Test that the API still exposes dicts and string times"""
+    api = MockCalendlyAPI()
+    booking_id = book(api, "2031-11-04", "10:00")
+
+    assert api.bookings[booking_id]["start_time"] == "10:00"
+    assert list(api.bookings) == [booking_id]
+    assert 600 not in api.get_free_starts("2031-11-04")
+    free = [slot.start_time for slot in api.get_available_slots("2031-11-04").available_slots]
+    assert "10:00" not in free and "10:30" in free
+    assert api.get_booked_intervals("2031-11-04") == [(600, 630)]
+    print("✅ Public booking shape test passed")
@@ -0,0 +1,71 @@
+"""
+Test cases for the model cascade router
+"""
+import sys
+import os
+from types import SimpleNamespace
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.agent.scheduling_agent import offers_only
+from backend.llm.router import TASK_CONFIRMATION, TASK_FAQ, TASK_TRIAGE, ModelRouter, classify
+from backend.monitoring.metrics import LLM_COST, LLM_ROUTE_CALLS
+
+class FakeGateway:
+    """Replies per model and records which models were called"""
+
+    def __init__(self, replies):
+        self.replies = replies
+        self.models = []
+
+    def chat_completion(self, call, model, **kwargs):
+        self.models.append(model)
+        usage = SimpleNamespace(prompt_tokens=1000, completion_tokens=100)
+        choice = SimpleNamespace(message=SimpleNamespace(content=self.replies[model]), finish_reason="stop")
+        return SimpleNamespace(choices=[choice], usage=usage)
+
+def _turn(user, context=""):
+    messages = [{"role": "system", "content": "prefix"}, {"role": "user", "content": user}]
+    if context:
+        messages.append({"role": "system", "content": context})
+    return messages
+
+def test_classification():
+    """Test that FAQ and confirmation turns go small and symptoms go large"""
+    assert classify("faq", _turn("Do you take Aetna?")) == TASK_FAQ
+    assert classify("main", _turn("10:30 works", "Tool Results:\nBooking progress (stage: details)")) == TASK_CONFIRMATION
+    assert classify("main", _turn("Where do I park?", "FAQ Context (use if...)")) == TASK_FAQ
+    assert classify("main", _turn("I've had chest pain since Monday", "Tool Results:\nBooking progress")) == TASK_TRIAGE
+    assert classify("main", _turn("Hello")) == TASK_TRIAGE
+    print("✅ Router classification test passed")
+
+def test_invalid_small_reply_escalates():
+    """Test escalation when the small model offers a time that isn't available"""
+    gateway = FakeGateway({"small": "How about 11:15 AM?", "large": "How about 10:30 AM?"})
+    router = ModelRouter(gateway, small_model="small", large_model="large")
+    escalations = LLM_ROUTE_CALLS.value(route="small", task=TASK_CONFIRMATION, outcome="escalated_invalid")
+
+    response = router.chat_completion(
+        call="main",
+        messages=_turn("Any time tomorrow", "Tool Results:\nAvailable slots found: [...]"),
+        validate=offers_only({"10:30", "14:00"})
+    )
+
+    assert response.choices[0].message.content == "How about 10:30 AM?"
+    assert gateway.models == ["small", "large"]
+    assert LLM_ROUTE_CALLS.value(route="small", task=TASK_CONFIRMATION, outcome="escalated_invalid") == escalations + 1
+    print("✅ Router escalation test passed")
+
+def test_valid_small_reply_and_cost():
+    """Test that a valid small-model reply is used as is and its cost recorded"""
+    gateway = FakeGateway({"gpt-4o-mini": "We accept Aetna.", "large": "unused"})
+    router = ModelRouter(gateway, large_model="large")
+    cost = LLM_COST.value(route="small", task=TASK_FAQ, model="gpt-4o-mini")
+
+    router.chat_completion(call="faq", messages=_turn("Do you take Aetna?"))
+
+    assert gateway.models == ["gpt-4o-mini"]
+    expected = (1000 * 0.15 + 100 * 0.60) / 1e6
+    assert abs(LLM_COST.value(route="small", task=TASK_FAQ, model="gpt-4o-mini") - cost - expected) < 1e-12
+    print("✅ Router cost test passed")
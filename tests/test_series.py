@@ -0,0 +1,102 @@
+"""
+Test cases for recurring appointment series
+"""
+import sys
+import os
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.api.calendly_integration import MockCalendlyAPI
+from backend.models.schemas import BookingRequest, SeriesBookingRequest, SeriesUpdateRequest
+from backend.state import SQLiteBookingStore
+from backend.tools.series_tool import SeriesConflictError, SeriesManager, expand_occurrences
+
+def _series_request(patient, mode="all_or_nothing", start_date="2031-09-02", start_time="10:00"):
+    return SeriesBookingRequest(
+        appointment_type="followup", start_date=start_date, start_time=start_time,
+        rrule="FREQ=WEEKLY;COUNT=4", patient=patient, mode=mode
+    )
+
+def test_expand_occurrences():
+    """Test RRULE expansion"""
+    assert expand_occurrences("RRULE:FREQ=WEEKLY;COUNT=3", "2031-09-02", "10:00") == [
+        "2031-09-02", "2031-09-09", "2031-09-16"
+    ]
+    with pytest.raises(ValueError):
+        expand_occurrences("FREQ=WEEKLY", "2031-09-02", "10:00")
+    print("✅ RRULE expansion test passed")
+
+def test_all_or_nothing_and_best_effort(book, patient):
+    """Test both booking modes when one occurrence conflicts"""
+    api = MockCalendlyAPI()
+    manager = SeriesManager(api)
+    book(api, "2031-09-16", "10:00", "followup")
+
+    with pytest.raises(SeriesConflictError):
+        manager.book_series(_series_request(patient))
+    assert len(api.bookings) == 1
+
+    results = api.bulk_book(
+        [BookingRequest(appointment_type="followup", date=day, start_time="10:00", patient=patient)
+         for day in ("2031-09-09", "2031-09-16")],
+        all_or_nothing=True
+    )
+    assert [result["success"] for result in results] == [False, False]
+    assert results[0].get("skipped") and not results[1].get("skipped")
+    assert len(api.bookings) == 1
+
+    result = manager.book_series(_series_request(patient, "best_effort"))
+    assert len(result["booked"]) == 3
+    assert result["conflicts"][0]["date"] == "2031-09-16"
+    assert result["conflicts"][0]["alternatives"][0] in ("09:30", "10:30")
+    print("✅ Series booking modes test passed")
+
+def test_update_and_cancel_series(book, patient):
+    """Test moving and cancelling upcoming occurrences"""
+    api = MockCalendlyAPI()
+    manager = SeriesManager(api)
+    series_id = manager.book_series(_series_request(patient))["series_id"]
+
+    book(api, "2031-09-16", "14:00", "followup")
+    with pytest.raises(SeriesConflictError):
+        manager.update_series(series_id, SeriesUpdateRequest(start_time="14:00", from_date="2031-09-01"))
+    assert {booking["start_time"] for booking in manager.get_series(series_id)["occurrences"]} == {"10:00"}
+
+    updated = manager.update_series(series_id, SeriesUpdateRequest(start_time="15:00", from_date="2031-09-01"))
+    assert {booking["start_time"] for booking in updated["occurrences"]} == {"15:00"}
+    assert api.is_slot_available("2031-09-02", "10:00")
+
+    cancelled = manager.cancel_series(series_id, from_date="2031-09-10")
+    assert len(cancelled["cancelled"]) == 2
+    print("✅ Series update and cancel test passed")
+
+def test_occurrences_off_schedule_conflict(patient):
+    """Test that occurrences outside hours, off the slot grid or in the past are not booked"""
+    api = MockCalendlyAPI()
+    manager = SeriesManager(api)
+
+    for start_date, start_time in (("2031-09-02", "17:00"), ("2031-09-02", "10:10"), ("2020-09-01", "10:00")):
+        with pytest.raises(SeriesConflictError):
+            manager.book_series(_series_request(patient, start_date=start_date, start_time=start_time))
+    assert len(api.bookings) == 0
+
+    result = manager.book_series(_series_request(patient, "best_effort", start_time="08:00"))
+    assert result["booked"] == [] and len(result["conflicts"]) == 4
+    print("✅ Series schedule checks test passed")
+
+def test_series_shared_between_workers(tmp_path, patient):
+    """Test that a series booked by one worker is found and changed by another"""
+    path = str(tmp_path / "bookings.db")
+    worker_a = SeriesManager(MockCalendlyAPI(SQLiteBookingStore(path)))
+    worker_b = SeriesManager(MockCalendlyAPI(SQLiteBookingStore(path)))
+    series_id = worker_a.book_series(_series_request(patient))["series_id"]
+
+    assert len(worker_b.get_series(series_id)["occurrences"]) == 4
+    worker_b.update_series(series_id, SeriesUpdateRequest(start_time="11:00", from_date="2031-09-01"))
+    assert {booking["start_time"] for booking in worker_a.get_series(series_id)["occurrences"]} == {"11:00"}
+
+    worker_a.cancel_series(series_id, from_date="2031-09-01")
+    assert worker_b.get_series(series_id) is None
+    print("✅ Shared series test passed")
@@ -0,0 +1,64 @@
+"""
+Test cases for single-flight request coalescing
+"""
+import sys
+import os
+import threading
+import time
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.singleflight import SingleFlight
+from backend.monitoring.metrics import COALESCED
+from backend.rag.faq_rag import normalize_question
+
+def _run_concurrently(flight, key, fn, callers=5):
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(flight.do(key, fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return results, errors
+
+def test_concurrent_calls_share_one_execution():
+    """Test that identical concurrent calls run the function once"""
+    flight = SingleFlight("test_shared")
+    calls = []
+
+    def slow_lookup():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"available_dates": {}}
+
+    results, errors = _run_concurrently(flight, ("consultation", None, 7), slow_lookup)
+
+    assert not errors and len(calls) == 1
+    assert len(results) == 5 and all(result is results[0] for result in results)
+    assert COALESCED.value(name="test_shared", role="follower") == 4
+    # Nothing is cached after the flight lands
+    assert flight.do(("consultation", None, 7), lambda: "fresh") == "fresh"
+    print("✅ Single-flight sharing test passed")
+
+def test_errors_reach_every_caller():
+    """Test that the leader's exception is raised in all waiting callers"""
+    flight = SingleFlight("test_errors")
+
+    def failing():
+        time.sleep(0.2)
+        raise RuntimeError("provider down")
+
+    results, errors = _run_concurrently(flight, "key", failing, callers=3)
+
+    assert not results and len(errors) == 3
+    assert normalize_question("  What insurance do you ACCEPT? ") == normalize_question("what insurance do you accept")
+    print("✅ Single-flight error propagation test passed")
@@ -0,0 +1,49 @@
+"""
+Test cases for slot ranking
+"""
+import sys
+import os
+from datetime import date
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.api.calendly_integration import calendly_api
+from backend.models.schemas import BookingRequest
+from backend.tools.slot_ranking import demand_mix, fragmentation_cost, rank_slots
+
+def test_short_visit_fills_gap_instead_of_splitting_day():
+    """Test that a followup is placed in a 30 minute gap before a free hour"""
+    patient = {"name": "Rank Patient", "email": "rank@example.com", "phone": "+1-555-0120"}
+    for appointment_type, start_time in [("specialist", "09:00"), ("consultation", "10:30")]:
+        calendly_api.book_appointment(BookingRequest(
+            appointment_type=appointment_type, date="2031-07-07", start_time=start_time, patient=patient
+        ))
+
+    ranked = rank_slots("followup", "", start_date=date(2031, 7, 7), num_days=1, top_k=3, max_per_day=3)
+
+    assert ranked[0]["time"] == "10:00"
+    assert len({slot["time"] for slot in ranked}) == 3
+    mix = demand_mix(date(2031, 7, 6), 2)
+    assert mix["specialist"] == mix["consultation"] == 2 / 6
+    print("✅ Slot ranking gap test passed")
+
+def test_fragmentation_cost_prefers_block_edges():
+    """Test that splitting a free block costs more than using its edge"""
+    demand = {"consultation": 0.5, "specialist": 0.5}
+    blocks = [(9 * 60, 12 * 60)]
+
+    edge = fragmentation_cost(9 * 60, 60, blocks, demand)
+    middle = fragmentation_cost(10 * 60 + 30, 60, blocks, demand)
+
+    assert edge < middle
+    assert fragmentation_cost(11 * 60 + 30, 60, blocks, demand) is None
+    print("✅ Fragmentation cost test passed")
+
+def test_preference_outranks_earliness():
+    """Test that afternoon preference wins over an earlier morning slot"""
+    ranked = rank_slots("consultation", "afternoon", start_date=date(2031, 7, 8), num_days=2, top_k=2)
+
+    assert all(slot["matches_preference"] for slot in ranked)
+    assert ranked[0]["date"] == "2031-07-08"
+    print("✅ Preference ranking test passed")
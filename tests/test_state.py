@@ -0,0 +1,56 @@
+"""
+Test cases for state shared between worker processes
+"""
+import sys
+import os
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.api.calendly_integration import MockCalendlyAPI
+from backend.state import SQLiteBookingStore, SQLiteConversationStore
+
+DAY = "2031-10-07"
+
+def test_workers_share_bookings(tmp_path, book):
+    """Test that two API instances over one store see each other's changes"""
+    path = str(tmp_path / "state.db")
+    worker_a = MockCalendlyAPI(SQLiteBookingStore(path))
+    worker_b = MockCalendlyAPI(SQLiteBookingStore(path))
+
+    first = book(worker_a, DAY, "10:00")
+    with pytest.raises(ValueError):
+        book(worker_b, DAY, "10:00")
+    second = book(worker_b, DAY, "11:00")
+    assert first != second
+
+    available = [slot.start_time for slot in worker_a.get_available_slots(DAY).available_slots]
+    assert "10:00" not in available and "11:00" not in available
+
+    worker_b.reschedule_appointment(first, DAY, "14:00")
+    assert worker_a.get_booking(first)["start_time"] == "14:00"
+    assert worker_a.is_slot_available(DAY, "10:00")
+
+    assert worker_a.cancel_appointment(second)
+    assert worker_b.get_booking(second) is None
+    assert len(list(worker_b.iter_bookings())) == 1
+    print("✅ Shared booking store test passed")
+
+def test_workers_share_conversations(tmp_path):
+    """Test that any worker can continue a conversation"""
+    path = str(tmp_path / "state.db")
+    worker_a = SQLiteConversationStore(path)
+    worker_b = SQLiteConversationStore(path)
+
+    worker_a.append("conv-1", "user", "I need a checkup")
+    worker_a.append("conv-1", "assistant", "draft")
+    worker_b.replace_last("conv-1", "Sure, when works for you?")
+    worker_b.append("conv-1", "user", "Tomorrow morning")
+
+    assert [msg["content"] for msg in worker_a.get("conv-1")] == [
+        "I need a checkup", "Sure, when works for you?", "Tomorrow morning"
+    ]
+    assert "conv-1" in worker_b and "conv-2" not in worker_b
+    assert len(worker_a) == 1
+    print("✅ Shared conversation store test passed")
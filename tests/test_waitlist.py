@@ -0,0 +1,60 @@
+"""
+Test cases for the waitlist and slot backfill
+"""
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.api.calendly_integration import MockCalendlyAPI
+from backend.models.schemas import WaitlistRequest
+from backend.tools.waitlist_tool import WaitlistManager
+
+DAY = "2031-06-02"
+
+def _waitlist(manager, patient, name, time_preference=None):
+    return manager.add_entry(WaitlistRequest(
+        appointment_type="consultation", patient={**patient, "name": name},
+        start_date=DAY, end_date=DAY, time_preference=time_preference
+    ))
+
+def test_cancellation_offers_slot_to_matching_entry(book, patient):
+    """Test that a cancelled morning slot goes to the first morning waiter"""
+    api = MockCalendlyAPI()
+    manager = WaitlistManager(api)
+    booking_id = book(api, DAY, "10:00")
+
+    afternoon = _waitlist(manager, patient, "Afternoon", "afternoon")
+    morning = _waitlist(manager, patient, "Morning", "morning")
+
+    api.cancel_appointment(booking_id)
+
+    assert manager.get_entry(afternoon["entry_id"])["status"] == "waiting"
+    hold = manager.get_entry(morning["entry_id"])["hold"]
+    assert hold["start_time"] == "10:00"
+    assert not api.is_slot_available(DAY, "10:00")
+
+    details = manager.confirm_hold(hold["hold_id"])
+    assert details["patient"]["name"] == "Morning"
+    assert manager.get_entry(morning["entry_id"])["status"] == "booked"
+    print("✅ Waitlist backfill test passed")
+
+def test_expired_hold_moves_to_next_entry(book, patient):
+    """Test that an expired hold is re-offered to the next patient"""
+    api = MockCalendlyAPI()
+    manager = WaitlistManager(api)
+    booking_id = book(api, DAY, "14:00")
+
+    first = _waitlist(manager, patient, "First")
+    second = _waitlist(manager, patient, "Second", "afternoon")
+    api.cancel_appointment(booking_id)
+    first_hold = manager.get_entry(first["entry_id"])["hold"]
+    manager.hold_minutes = 60
+
+    manager.expire_holds(now=datetime.fromisoformat(first_hold["expires_at"]) + timedelta(seconds=1))
+
+    assert manager.get_entry(first["entry_id"])["status"] == "waiting"
+    assert manager.get_entry(second["entry_id"])["hold"]["start_time"] == "14:00"
+    print("✅ Waitlist hold expiry test passed")